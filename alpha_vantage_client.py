@@ -0,0 +1,239 @@
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from load import ALPHA_VANTAGE_API_KEY
+from metrics import upstream
+
+# Endpoint and quota (free tier: 5 calls/minute, 25 calls/day)
+ALPHA_VANTAGE_URL = os.getenv("ALPHA_VANTAGE_URL", "https://www.alphavantage.co/query")
+CALLS_PER_MINUTE = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+CALLS_PER_DAY = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_DAY", "25"))
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0   # seconds
+BACKOFF_CAP = 60.0
+POOL_SIZE = 4
+
+# Request priorities: lower runs first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+
+class AlphaVantageError(RuntimeError):
+    """Alpha Vantage rejected the request (bad symbol, bad key, ...)."""
+
+
+class QuotaExceeded(AlphaVantageError):
+    """The daily call quota is used up; retrying today will not help."""
+
+
+class Throttled(AlphaVantageError):
+    """Alpha Vantage asked us to slow down; the call may be retried."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `capacity` calls, refilled at capacity/`period`."""
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def refund(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def drain(self):
+        with self._lock:
+            self._refill()
+            self.tokens = 0.0
+
+    def wait_time(self):
+        """Seconds until the next token is available."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+
+def backoff(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def check_payload(payload):
+    """Raise for Alpha Vantage's in-body errors (it answers them with HTTP 200)."""
+    if "Error Message" in payload:
+        raise AlphaVantageError(payload["Error Message"])
+    message = payload.get("Note") or payload.get("Information")
+    if message and len(payload) == 1:
+        # The per-minute note also quotes the daily figure ("5 calls per minute
+        # and 500 calls per day"): only a message without a minute rate is the daily cap
+        if "per minute" not in message and ("per day" in message or "daily" in message):
+            raise QuotaExceeded(message)
+        raise Throttled(message)
+    return payload
+
+
+class AlphaVantageClient:
+    """
+    Shared Alpha Vantage client: one pooled HTTP session, per-minute and
+    per-day token buckets, jittered retries on throttling, and a priority
+    queue so interactive calls overtake background refreshes.
+    """
+
+    def __init__(self, api_key=ALPHA_VANTAGE_API_KEY, base_url=ALPHA_VANTAGE_URL,
+                 calls_per_minute=CALLS_PER_MINUTE, calls_per_day=CALLS_PER_DAY,
+                 workers=2, max_retries=MAX_RETRIES, session=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.minute = TokenBucket(calls_per_minute, 60.0)
+        self.day = TokenBucket(calls_per_day, 86400.0)
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._counts = {"calls": 0, "retries": 0, "throttled": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._run, name=f"alpha-vantage-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def _count(self, key):
+        with self._lock:
+            self._counts[key] += 1
+
+    def _acquire(self):
+        """Take one call from both buckets, or return seconds to wait."""
+        if not self.day.try_acquire():
+            raise QuotaExceeded(f"Daily quota of {self.day.capacity} calls used up")
+        if not self.minute.try_acquire():
+            self.day.refund()
+            return self.minute.wait_time()
+        return 0.0
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            priority, order, attempt, params, future = item
+            if future.cancelled():
+                continue
+            try:
+                delay = self._acquire()
+            except QuotaExceeded as e:
+                future.set_exception(e)
+                continue
+            if delay:
+                # Back in line: a more urgent request may run first
+                self._queue.put(item)
+                time.sleep(min(delay, 1.0))
+                continue
+            self._call(item)
+
+    def _retry_later(self, item):
+        priority, order, attempt, params, future = item
+        self._count("retries")
+        timer = threading.Timer(backoff(attempt), self._queue.put,
+                                args=((priority, order, attempt + 1, params, future),))
+        timer.daemon = True
+        timer.start()
+
+    def _call(self, item):
+        priority, order, attempt, params, future = item
+        try:
+            self._count("calls")
+            with upstream("alpha_vantage"):
+                response = self.session.get(self.base_url, params={**params, "apikey": self.api_key},
+                                            timeout=REQUEST_TIMEOUT)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise Throttled(f"HTTP {response.status_code}")
+            response.raise_for_status()
+            future.set_result(check_payload(response.json()))
+        except QuotaExceeded as e:
+            self.day.drain()
+            future.set_exception(e)
+        except (Throttled, requests.ConnectionError, requests.Timeout) as e:
+            self._count("throttled" if isinstance(e, Throttled) else "errors")
+            if attempt >= self.max_retries:
+                future.set_exception(e)
+            else:
+                self._retry_later(item)
+        except Exception as e:
+            self._count("errors")
+            future.set_exception(e)
+
+    def submit(self, params, priority=INTERACTIVE):
+        """Queue one API call; returns a Future resolving to the JSON payload."""
+        future = Future()
+        self._queue.put((priority, next(self._order), 0, dict(params), future))
+        return future
+
+    def query(self, params, priority=INTERACTIVE, timeout=None):
+        return self.submit(params, priority).result(timeout)
+
+    def daily(self, symbol, outputsize="compact", priority=INTERACTIVE):
+        """One TIME_SERIES_DAILY page as a DataFrame sorted by date."""
+        payload = self.query({"function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": outputsize},
+                             priority)
+        series = payload.get("Time Series (Daily)")
+        if series is None:
+            raise AlphaVantageError(f"Invalid API response: {payload}")
+        frame = pd.DataFrame.from_dict(series, orient="index").astype(float)
+        frame.index = pd.to_datetime(frame.index)
+        return frame.sort_index()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            **counts,
+            "queued": self._queue.qsize(),
+            "minute_tokens": round(self.minute.tokens, 2),
+            "day_tokens": round(self.day.tokens, 2),
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client (created on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AlphaVantageClient()
+        return _client
+
+
+def download_daily(symbol, outputsize="compact", priority=INTERACTIVE):
+    """`download` callable for sync.sync_alpha_vantage using the shared client."""
+    return get_client().daily(symbol, outputsize, priority)
@@ -0,0 +1,195 @@
+import time
+
+from flask import Flask, Response, request, jsonify, g
+
+import metrics
+import portfolio
+
+from data_layer import (fetch_stock_payload, fetch_indicators_payload, fetch_news_payload, search_payload,
+                        index_report_payload, history_cache, news_feed, prefetcher, parse_symbols,
+                        stream_request_error, stream_stock_payloads, screen_payload, portfolio_payload,
+                        start_background, STREAM_MEDIA_TYPES)
+
+# Flask App: python api.py (or any WSGI server: api:flask_app)
+flask_app = Flask(__name__)
+
+# WSGI servers import flask_app without running main(): start the
+# background refreshers on the first request instead
+_background_started = False
+
+@flask_app.before_request
+def start_background_once():
+    global _background_started
+    if not _background_started:
+        _background_started = True
+        start_background()
+
+
+# Request metrics; send `X-Trace: 1` (or ?trace=1) for a Server-Timing breakdown
+@flask_app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    if request.headers.get('X-Trace') or request.args.get('trace'):
+        g.trace_token = metrics.start_trace()
+
+
+@flask_app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.observe_request(route, request.method, response.status_code,
+                            time.perf_counter() - g.request_start, response.calculate_content_length())
+    token = g.pop('trace_token', None)
+    if token is not None:
+        response.headers['Server-Timing'] = metrics.end_trace(token)
+    return response
+
+
+@flask_app.teardown_request
+def end_request_trace(exc):
+    # after_request is skipped on unhandled errors; don't leak the trace
+    token = g.pop('trace_token', None)
+    if token is not None:
+        metrics.end_trace(token)
+
+# Flask routes
+@flask_app.route('/stock', methods=['GET'])
+def get_stock():
+    """API endpoint to fetch stock data."""
+    symbol = request.args.get('symbol', '').upper()
+    fmt = request.args.get('format', 'records')
+    period = request.args.get('period', '1mo')
+    # start/end (and intraday intervals) are served from the columnar store
+    start = request.args.get('start')
+    end = request.args.get('end')
+    interval = request.args.get('interval', '1d')
+    # ?since=<version> (0 at first) polls live bar deltas instead
+    since = request.args.get('since')
+    
+    if not symbol:
+        return jsonify({"error": "Stock symbol is required"}), 400
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "'since' must be an integer bar version"}), 400
+    
+    body, media_type, status = fetch_stock_payload(symbol, fmt, period, start, end, interval, since)
+    response = Response(body, status=status, mimetype=media_type)
+    stats = history_cache.stats()
+    response.headers['X-Cache-Hits'] = str(stats['hits'])
+    response.headers['X-Cache-Misses'] = str(stats['misses'])
+    return response
+
+
+@flask_app.route('/stocks/stream', methods=['GET'])
+def get_stocks_stream():
+    """
+    Fetch many symbols concurrently and stream each one's 'columns' payload
+    as soon as it is ready: NDJSON by default, server-sent events with
+    ?mode=sse or `Accept: text/event-stream`. Errors are sent inline.
+    """
+    symbols = parse_symbols(request.args.get('symbols'))
+    accepts_sse = 'text/event-stream' in request.headers.get('Accept', '')
+    mode = request.args.get('mode') or ('sse' if accepts_sse else 'ndjson')
+    period = request.args.get('period', '1mo')
+    interval = request.args.get('interval', '1d')
+
+    error = stream_request_error(symbols, mode, period, interval)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    records = stream_stock_payloads(symbols, mode, period, request.args.get('start'), request.args.get('end'), interval)
+    response = Response(records, mimetype=STREAM_MEDIA_TYPES[mode])
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a proxy hold lines back
+    return response
+
+
+@flask_app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics."""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@flask_app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters for sizing the stock history cache."""
+    return jsonify(history_cache.stats())
+
+
+@flask_app.route('/indicators', methods=['GET'])
+def get_indicators():
+    """API endpoint for technical indicators over one or more symbols."""
+    body, media_type, status = fetch_indicators_payload(
+        request.args.get('symbols', ''),
+        request.args.get('indicators'),
+        request.args.get('period', '1y'),
+    )
+    return Response(body, status=status, mimetype=media_type)
+
+
+@flask_app.route('/portfolio/risk', methods=['GET'])
+def get_portfolio_risk():
+    """Volatility, VaR, beta and optimized weights for a basket, e.g. /portfolio/risk?symbols=AAPL,MSFT&weights=0.6,0.4."""
+    body, media_type, status = portfolio_payload(
+        request.args.get('symbols', ''),
+        request.args.get('weights'),
+        request.args.get('period', '5y'),
+        request.args.get('benchmark', portfolio.BENCHMARK),
+        request.args.get('optimize'),
+        request.args.get('matrix', '0') not in ('0', 'false', ''),
+    )
+    return Response(body, status=status, mimetype=media_type)
+
+
+@flask_app.route('/news', methods=['GET'])
+def get_news():
+    return jsonify(fetch_news_payload())
+
+
+@flask_app.route('/news/history', methods=['GET'])
+def get_news_history():
+    """Deduplicated rolling headline history, newest first."""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({'history': news_feed.history(limit), 'status': news_feed.status()})
+
+
+@flask_app.route('/prefetch/status', methods=['GET'])
+def get_prefetch_status():
+    """Prefetch queue depth and per-symbol staleness."""
+    return jsonify(prefetcher.status())
+
+
+@flask_app.route('/screen', methods=['GET'])
+def get_screen():
+    """Fundamentals screener, e.g. /screen?where=pe<20,market_cap>10B&sort=-dividend_yield."""
+    payload, status = screen_payload(
+        request.args.get('where'), request.args.get('sort'),
+        request.args.get('limit', 50, type=int), request.args.get('fields'),
+    )
+    return jsonify(payload), status
+
+
+@flask_app.route('/search', methods=['GET'])
+def get_search():
+    """Semantic search over indexed headlines and report sections."""
+    payload, status = search_payload(
+        request.args.get('q'), request.args.get('k', 10, type=int), request.args.get('kind')
+    )
+    return jsonify(payload), status
+
+
+@flask_app.route('/search/reports', methods=['POST'])
+def post_search_report():
+    """Add a generated report to the search index."""
+    payload, status = index_report_payload(request.get_json(silent=True))
+    return jsonify(payload), status
+
+
+def main():
+    start_background()
+    flask_app.run(port=5000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response as FastAPIResponse, StreamingResponse
+
+from data_layer import (fetch_stock_payload, fetch_indicators_payload, fetch_news_payload, search_payload,
+                        index_report_payload, flush_search_index, history_cache, news_feed, prefetcher,
+                        parse_symbols, stream_request_error, stream_record, stream_frame, stream_summary,
+                        screen_payload, portfolio_payload, live_feed, start_background, STREAM_MEDIA_TYPES,
+                        STREAM_WORKERS)
+from singleflight import SingleFlight
+import metrics
+import portfolio
+import wire
+
+@asynccontextmanager
+async def lifespan(app):
+    news_feed.start()
+    start_background()
+    try:
+        yield
+    finally:
+        if live_feed is not None:
+            await asyncio.to_thread(live_feed.stop)
+        await asyncio.to_thread(prefetcher.stop)
+        await asyncio.to_thread(news_feed.stop)
+        await asyncio.to_thread(flush_search_index)
+
+# FastAPI App (async): uvicorn asgi:fastapi_app
+fastapi_app = FastAPI(lifespan=lifespan)
+# Concurrent requests for the same symbol share one upstream fetch
+inflight = SingleFlight()
+
+@fastapi_app.middleware('http')
+async def record_request_metrics(request, call_next):
+    """Route latency/status/size metrics; `X-Trace: 1` (or ?trace=1) adds Server-Timing."""
+    start = time.perf_counter()
+    tracing = request.headers.get('x-trace') or request.query_params.get('trace')
+    token = metrics.start_trace() if tracing else None
+    try:
+        response = await call_next(request)
+    finally:
+        timing = metrics.end_trace(token) if token is not None else None
+    route = getattr(request.scope.get('route'), 'path', 'unmatched')
+    size = response.headers.get('content-length')
+    metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - start,
+                            int(size) if size is not None else None)
+    if timing is not None:
+        response.headers['Server-Timing'] = timing
+    return response
+
+
+# FastAPI routes (async)
+@fastapi_app.get('/stock')
+async def get_stock_async(symbol: str = Query(''), format: str = Query('records'), period: str = Query('1mo'),
+                          start: str = Query(None), end: str = Query(None), interval: str = Query('1d'),
+                          since: int = Query(None)):
+    """API endpoint to fetch stock data."""
+    symbol = symbol.strip().upper()
+
+    if not symbol:
+        return JSONResponse({"error": "Stock symbol is required"}, status_code=400)
+
+    if since is not None:
+        # Live bar deltas: no upstream call to share, but subscribing and
+        # encoding take locks and CPU, so still off the event loop
+        body, media_type, status = await asyncio.to_thread(fetch_stock_payload, symbol, format, period, start, end,
+                                                           interval, since)
+        return FastAPIResponse(body, status_code=status, media_type=media_type)
+
+    # yfinance is blocking, so run it off the event loop
+    body, media_type, status = await inflight.do(
+        ('stock', symbol, format, period, start, end, interval), asyncio.to_thread,
+        fetch_stock_payload, symbol, format, period, start, end, interval
+    )
+    return FastAPIResponse(body, status_code=status, media_type=media_type)
+
+
+@fastapi_app.get('/stocks/stream')
+async def get_stocks_stream_async(request: Request, symbols: str = Query(''), mode: str = Query(None),
+                                  period: str = Query('1mo'), start: str = Query(None), end: str = Query(None),
+                                  interval: str = Query('1d')):
+    """Many symbols fetched concurrently, each streamed (NDJSON or SSE) as soon as it is ready."""
+    symbols = parse_symbols(symbols)
+    mode = mode or ('sse' if 'text/event-stream' in request.headers.get('accept', '') else 'ndjson')
+    error = stream_request_error(symbols, mode, period, interval)
+    if error:
+        return JSONResponse(error[0], status_code=error[1])
+
+    semaphore = asyncio.Semaphore(STREAM_WORKERS)
+
+    async def fetch(symbol):
+        # Shares in-flight fetches with /stock?format=columns for the same symbol
+        async with semaphore:
+            key = ('stock', symbol, 'columns', period, start, end, interval)
+            try:
+                body, _, status = await inflight.do(key, asyncio.to_thread, fetch_stock_payload,
+                                                    symbol, 'columns', period, start, end, interval)
+            except Exception as e:
+                body, status = wire.encode_json({"error": f"Error fetching data: {str(e)}"}), 500
+            return symbol, body, status
+
+    async def records():
+        started = time.perf_counter()
+        errors = 0
+        tasks = [asyncio.ensure_future(fetch(symbol)) for symbol in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                symbol, body, status = await next_done
+                errors += status != 200
+                yield stream_frame(stream_record(symbol, body, status), mode)
+            yield stream_frame(stream_summary(len(symbols), errors, started), mode, event='done')
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(records(), media_type=STREAM_MEDIA_TYPES[mode], headers=headers)
+
+
+@fastapi_app.get('/news')
+async def get_news_async():
+    # Only blocks (once) on a cold cache; afterwards this is a memory read
+    return await inflight.do(('news',), asyncio.to_thread, fetch_news_payload)
+
+
+@fastapi_app.get('/news/history')
+async def get_news_history_async(limit: int = Query(50)):
+    """Deduplicated rolling headline history, newest first."""
+    return {'history': news_feed.history(limit), 'status': news_feed.status()}
+
+
+@fastapi_app.get('/indicators')
+async def get_indicators_async(symbols: str = Query(''), names: str = Query(None, alias='indicators'),
+                               period: str = Query('1y')):
+    """API endpoint for technical indicators over one or more symbols."""
+    body, media_type, status = await inflight.do(
+        ('indicators', symbols, names, period),
+        asyncio.to_thread, fetch_indicators_payload, symbols, names, period,
+    )
+    return FastAPIResponse(body, status_code=status, media_type=media_type)
+
+
+@fastapi_app.get('/portfolio/risk')
+async def get_portfolio_risk_async(symbols: str = Query(''), weights: str = Query(None), period: str = Query('5y'),
+                                   benchmark: str = Query(portfolio.BENCHMARK), optimize: str = Query(None),
+                                   matrix: bool = Query(False)):
+    """Volatility, VaR, beta and optimized weights for a basket, e.g. /portfolio/risk?symbols=AAPL,MSFT&weights=0.6,0.4."""
+    body, media_type, status = await inflight.do(
+        ('portfolio', symbols, weights, period, benchmark, optimize, matrix),
+        asyncio.to_thread, portfolio_payload, symbols, weights, period, benchmark, optimize, matrix,
+    )
+    return FastAPIResponse(body, status_code=status, media_type=media_type)
+
+
+@fastapi_app.get('/prefetch/status')
+async def get_prefetch_status_async():
+    """Prefetch queue depth and per-symbol staleness."""
+    return await asyncio.to_thread(prefetcher.status)
+
+
+@fastapi_app.get('/screen')
+async def get_screen_async(where: str = Query(None), sort: str = Query(None), limit: int = Query(50),
+                           fields: str = Query(None)):
+    """Fundamentals screener, e.g. /screen?where=pe<20,market_cap>10B&sort=-dividend_yield."""
+    # In memory after the first call; only a refreshed snapshot is re-read from disk
+    payload, status = await asyncio.to_thread(screen_payload, where, sort, limit, fields)
+    return JSONResponse(payload, status_code=status)
+
+
+@fastapi_app.get('/search')
+async def get_search_async(q: str = Query(''), k: int = Query(10), kind: str = Query(None)):
+    """Semantic search over indexed headlines and report sections."""
+    payload, status = await asyncio.to_thread(search_payload, q, k, kind)
+    return JSONResponse(payload, status_code=status)
+
+
+@fastapi_app.post('/search/reports')
+async def post_search_report_async(document: dict):
+    """Add a generated report to the search index."""
+    payload, status = await asyncio.to_thread(index_report_payload, document)
+    return JSONResponse(payload, status_code=status)
+
+
+@fastapi_app.get('/metrics')
+async def get_metrics_async():
+    """Prometheus metrics."""
+    return FastAPIResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@fastapi_app.get('/cache/stats')
+async def get_cache_stats_async():
+    """Hit/miss counters for the history cache and request coalescing."""
+    return {**history_cache.stats(), 'coalescing': inflight.stats()}
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(fastapi_app, port=8000)
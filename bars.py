@@ -0,0 +1,490 @@
+import abc
+import argparse
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from metrics import upstream
+
+# Bar resolutions kept live, finest first; each must divide the next
+RESOLUTIONS = {"1m": 60_000, "5m": 300_000, "1h": 3_600_000, "1d": 86_400_000}  # milliseconds
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+# Closed bars remembered per symbol and resolution
+BAR_HISTORY = int(os.getenv("BAR_HISTORY", "1000"))
+# Daily bars start at midnight in this time zone
+BAR_TZ = os.getenv("BAR_TZ", "America/New_York")
+# "" (off), "simulated" (random walk) or "poll" (Yahoo last price)
+LIVE_FEED = os.getenv("LIVE_FEED", "")
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", "5"))  # seconds
+LIVE_SIM_RATE = float(os.getenv("LIVE_SIM_RATE", "50"))  # ticks per second per symbol
+LIVE_SIM_SPREAD = 0.0004  # simulated bid/ask spread, as a fraction of price
+
+BAR_FIELDS = ("Open", "High", "Low", "Close", "Volume", "Ticks")
+
+
+class IncrementalIndicators:
+    """
+    Streaming versions of the indicators.py defaults (same parameters and
+    warm-up rules), updated once per closed bar in O(1).
+    """
+
+    OUTPUTS = ("sma", "ema", "rsi", "macd", "macd_signal", "macd_hist",
+               "bb_mid", "bb_upper", "bb_lower", "volatility", "drawdown")
+    WINDOW, SPAN, RSI_WINDOW, NUM_STD = 20, 20, 14, 2.0
+    FAST, SLOW, SIGNAL = 12, 26, 9
+    TRADING_DAYS = 252
+
+    __slots__ = ("count", "prev", "window", "sum", "sumsq", "returns", "rsum", "rsumsq",
+                 "ema", "fast", "slow", "signal", "gain", "loss", "diffs", "peak")
+
+    def __init__(self):
+        self.count, self.prev, self.diffs = 0, None, 0
+        self.window, self.sum, self.sumsq = deque(), 0.0, 0.0
+        self.returns, self.rsum, self.rsumsq = deque(), 0.0, 0.0
+        self.ema = self.fast = self.slow = self.signal = self.gain = self.loss = self.peak = None
+
+    def copy(self):
+        other = IncrementalIndicators.__new__(IncrementalIndicators)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.window, other.returns = deque(self.window), deque(self.returns)
+        return other
+
+    def update(self, close):
+        self.count += 1
+        self.window.append(close)
+        self.sum += close
+        self.sumsq += close * close
+        if len(self.window) > self.WINDOW:
+            old = self.window.popleft()
+            self.sum -= old
+            self.sumsq -= old * old
+
+        def step(value, alpha):
+            return close if value is None else value + alpha * (close - value)
+
+        self.ema = step(self.ema, 2.0 / (self.SPAN + 1))
+        self.fast = step(self.fast, 2.0 / (self.FAST + 1))
+        self.slow = step(self.slow, 2.0 / (self.SLOW + 1))
+        line = self.fast - self.slow
+        self.signal = line if self.signal is None else self.signal + 2.0 / (self.SIGNAL + 1) * (line - self.signal)
+        self.peak = close if self.peak is None else max(self.peak, close)
+
+        if self.prev is not None:
+            delta = close - self.prev
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            self.gain = gain if self.gain is None else self.gain + (gain - self.gain) / self.RSI_WINDOW
+            self.loss = loss if self.loss is None else self.loss + (loss - self.loss) / self.RSI_WINDOW
+            self.diffs += 1
+            ret = math.log(close / self.prev) if close > 0 and self.prev > 0 else 0.0
+            self.returns.append(ret)
+            self.rsum += ret
+            self.rsumsq += ret * ret
+            if len(self.returns) > self.WINDOW:
+                old = self.returns.popleft()
+                self.rsum -= old
+                self.rsumsq -= old * old
+        self.prev = close
+
+    def values(self):
+        """Current outputs as a tuple in OUTPUTS order (NaN while warming up)."""
+        nan = float("nan")
+        if self.count == 0:
+            return (nan,) * len(self.OUTPUTS)
+        full = len(self.window) == self.WINDOW
+        mid = self.sum / self.WINDOW if full else nan
+        std = math.sqrt(max(self.sumsq / self.WINDOW - mid * mid, 0.0)) if full else nan
+        if self.diffs >= self.RSI_WINDOW:
+            rsi = 100.0 if self.loss == 0 and self.gain > 0 else (
+                nan if self.loss == 0 else 100.0 - 100.0 / (1.0 + self.gain / self.loss))
+        else:
+            rsi = nan
+        if len(self.returns) == self.WINDOW:
+            n = self.WINDOW
+            variance = max((self.rsumsq - self.rsum * self.rsum / n) / (n - 1), 0.0)
+            volatility = math.sqrt(variance * self.TRADING_DAYS)
+        else:
+            volatility = nan
+        line = self.fast - self.slow
+        return (
+            mid,
+            self.ema if self.count >= self.SPAN else nan,
+            rsi,
+            line, self.signal, line - self.signal,
+            mid, mid + self.NUM_STD * std, mid - self.NUM_STD * std,
+            volatility,
+            self.prev / self.peak - 1.0,
+        )
+
+    def peek(self, close):
+        """Outputs as if the forming bar closed at `close`, without committing it."""
+        other = self.copy()
+        other.update(close)
+        return other.values()
+
+
+class _SymbolBars:
+    __slots__ = ("bars", "closed", "indicators", "version", "quote")
+
+    def __init__(self, levels, history):
+        # Level 0: the forming bar [start, open, high, low, close, volume, ticks, end].
+        # Higher levels: the closed lower bars folded so far (without the forming one).
+        self.bars = [None] * levels
+        self.closed = [deque(maxlen=history) for _ in range(levels)]
+        self.indicators = [IncrementalIndicators() for _ in range(levels)]
+        self.version = 0    # bumped on every tick; clients ask for changes since a version
+        self.quote = None
+
+
+class BarEngine:
+    """
+    Live OHLCV bars at several resolutions from a stream of trades.
+
+    A trade touches only the forming finest bar (a few compares and adds).
+    When it rolls over, the closed bar is folded into the next resolution's
+    partial bar, cascading upward only when that one closes too, so every
+    trade is O(1). Coarser forming bars are assembled on read. Indicators
+    advance once per closed bar. Trades older than the forming bar are
+    counted and dropped.
+    """
+
+    def __init__(self, resolutions=RESOLUTIONS, history=BAR_HISTORY, tz=BAR_TZ, on_bar=None):
+        self.intervals = list(resolutions)
+        self.widths = list(resolutions.values())
+        self.history = history
+        self.on_bar = on_bar  # on_bar(symbol, interval, bar tuple) for each closed bar
+        self.tz = ZoneInfo(tz) if tz else None
+        self._offset_hour, self._offset = None, 0  # UTC offset (ms), looked up once per hour
+        self.late = 0
+        self._symbols = {}
+        self._lock = threading.Lock()
+
+    def symbols(self):
+        with self._lock:
+            return list(self._symbols)
+
+    def _state(self, symbol):
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolBars(len(self.widths), self.history)
+        return state
+
+    def on_trade(self, symbol, ts, price, size=0.0):
+        """One trade: epoch-ms timestamp, price, size."""
+        with self._lock:
+            self._trade(symbol, ts, price, size)
+
+    def on_trades(self, trades):
+        """A batch of (symbol, ts, price, size) trades under one lock acquisition."""
+        with self._lock:
+            symbols = self._symbols
+            for symbol, ts, price, size in trades:
+                state = symbols.get(symbol)
+                if state is not None:
+                    bar = state.bars[0]
+                    if bar is not None and bar[0] <= ts < bar[7]:
+                        # Hot path, inlined: update the forming bar
+                        state.version += 1
+                        bar[4] = price
+                        if price > bar[2]:
+                            bar[2] = price
+                        elif price < bar[3]:
+                            bar[3] = price
+                        bar[5] += size
+                        bar[6] += 1
+                        continue
+                self._trade(symbol, ts, price, size)
+
+    def on_quote(self, symbol, ts, bid, ask):
+        """Latest bid/ask; reported with the bars but not aggregated."""
+        with self._lock:
+            state = self._state(symbol)
+            state.quote = (ts, bid, ask)
+            state.version += 1
+
+    def _bucket(self, ts, width):
+        """Start of the bar holding `ts`: intraday bars align to local clock time, daily ones to local midnight."""
+        if self.tz is None:
+            return ts - ts % width
+        if width >= DAY_MS:
+            local = datetime.fromtimestamp(ts / 1000, self.tz).replace(hour=0, minute=0, second=0, microsecond=0)
+            return int(local.timestamp() * 1000)
+        hour = ts // HOUR_MS
+        if hour != self._offset_hour:
+            offset = datetime.fromtimestamp(ts / 1000, self.tz).utcoffset()
+            self._offset_hour, self._offset = hour, int(offset.total_seconds() * 1000)
+        return ts - (ts + self._offset) % width
+
+    def _trade(self, symbol, ts, price, size):
+        state = self._state(symbol)
+        state.version += 1
+        bar = state.bars[0]
+        if bar is not None and ts < bar[7]:
+            if ts < bar[0]:
+                self.late += 1
+                return
+            bar[4] = price
+            if price > bar[2]:
+                bar[2] = price
+            elif price < bar[3]:
+                bar[3] = price
+            bar[5] += size
+            bar[6] += 1
+            return
+
+        start = self._bucket(ts, self.widths[0])
+        state.bars[0] = [start, price, price, price, price, size, 1, start + self.widths[0]]
+        closed = self._close(symbol, state, 0, bar) if bar is not None else None
+        for level in range(1, len(self.widths)):
+            partial = state.bars[level]
+            if closed is not None:
+                if partial is None:
+                    partial = state.bars[level] = [self._bucket(closed[0], self.widths[level]), *closed[1:7]]
+                else:
+                    partial[2] = max(partial[2], closed[2])
+                    partial[3] = min(partial[3], closed[3])
+                    partial[4] = closed[4]
+                    partial[5] += closed[5]
+                    partial[6] += closed[6]
+            closed = None
+            if partial is not None and partial[0] != self._bucket(ts, self.widths[level]):
+                state.bars[level] = None
+                closed = self._close(symbol, state, level, partial)
+            if closed is None:
+                break
+
+    def _close(self, symbol, state, level, bar):
+        indicators = state.indicators[level]
+        indicators.update(bar[4])
+        closed = (*bar[:7], state.version, indicators.values())
+        state.closed[level].append(closed)
+        if self.on_bar is not None:
+            self.on_bar(symbol, self.intervals[level], closed)
+        return closed
+
+    def _forming(self, state, level):
+        """The forming bar at `level`: its folded partial plus the finer forming bars."""
+        bar = state.bars[0]
+        if bar is None:
+            return None
+        bar = bar[:7]
+        for lower in range(1, level + 1):
+            partial = state.bars[lower]
+            if partial is None:
+                bar[0] = self._bucket(bar[0], self.widths[lower])
+            else:
+                bar = [partial[0], partial[1], max(partial[2], bar[2]), min(partial[3], bar[3]), bar[4],
+                       partial[5] + bar[5], partial[6] + bar[6]]
+        return bar
+
+    def delta(self, symbol, interval="1m", since=0):
+        """
+        Bars of one resolution changed after version `since` (0: all kept
+        history), the forming bar last, each with its indicator values.
+        Clients upsert rows by bar start and pass back `version`.
+        """
+        level = self.intervals.index(interval)
+        with self._lock:
+            state = self._symbols.get(symbol)
+            if state is None:
+                return None
+            rows = []
+            for closed in reversed(state.closed[level]):
+                if closed[7] <= since:
+                    break
+                rows.append(list(closed[:7]) + list(closed[8]))
+            rows.reverse()
+            forming = self._forming(state, level) if state.version > since else None
+            if forming is not None:
+                rows.append(forming + list(state.indicators[level].peek(forming[4])))
+            version, quote = state.version, state.quote
+
+        columns = list(zip(*rows)) if rows else [()] * (7 + len(IncrementalIndicators.OUTPUTS))
+        nan_to_none = lambda values: [None if v != v else v for v in values]
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "version": version,
+            "since": since,
+            "index": list(columns[0]),
+            "tz": BAR_TZ,
+            "columns": {name: list(values) for name, values in zip(BAR_FIELDS, columns[1:7])},
+            "indicators": {name: nan_to_none(values)
+                           for name, values in zip(IncrementalIndicators.OUTPUTS, columns[7:])},
+            "quote": dict(zip(("ts", "bid", "ask"), quote)) if quote else None,
+        }
+
+    def stats(self):
+        with self._lock:
+            return {"symbols": len(self._symbols), "late_trades": self.late,
+                    "trades": sum(s.version for s in self._symbols.values())}
+
+
+#########################
+# Feeds
+#########################
+
+class _Feed(abc.ABC):
+    """Background thread pushing trades for a set of symbols into an engine."""
+
+    name = "feed"
+
+    def __init__(self, engine, symbols=(), interval=1.0):
+        self.engine = engine
+        self.interval = interval
+        self._symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, symbol):
+        """Start feeding a symbol (no-op if already fed)."""
+        symbol = symbol.strip().upper()
+        with self._lock:
+            if symbol not in self._symbols:
+                self._symbols.append(symbol)
+        self.start()
+
+    def symbols(self):
+        with self._lock:
+            return list(self._symbols)
+
+    @abc.abstractmethod
+    def poll(self):
+        """Push one round of trades for the subscribed symbols into the engine."""
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Live {self.name} feed failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        with self._lock:
+            if not self._symbols or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"live-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+class SimulatedFeed(_Feed):
+    """Random-walk trades at `rate` per second per symbol, plus a bid/ask around the last one, for local testing."""
+
+    name = "simulated"
+
+    def __init__(self, engine, symbols=(), rate=LIVE_SIM_RATE, interval=0.1, seed=0):
+        super().__init__(engine, symbols, interval)
+        self.rate = rate
+        self._random = random.Random(seed)
+        self._prices = {}
+        self._last = None
+
+    def trades(self, symbols, count, start_ms, step_ms=1):
+        """`count` trades per symbol, `step_ms` apart, as (symbol, ts, price, size)."""
+        gauss, randint = self._random.gauss, self._random.randint
+        batch = []
+        for i in range(count):
+            ts = start_ms + i * step_ms
+            for symbol in symbols:
+                price = self._prices.get(symbol, 100.0) * math.exp(gauss(0.0, 0.0005))
+                self._prices[symbol] = price
+                batch.append((symbol, ts, price, randint(1, 500)))
+        return batch
+
+    def poll(self):
+        now = int(time.time() * 1000)
+        elapsed = (now - self._last) / 1000 if self._last else self.interval
+        self._last = now
+        count = max(1, int(self.rate * elapsed))
+        step = max(1, int(elapsed * 1000 / count))
+        symbols = self.symbols()
+        self.engine.on_trades(self.trades(symbols, count, now - count * step, step))
+        for symbol in symbols:
+            half = self._prices[symbol] * LIVE_SIM_SPREAD / 2
+            self.engine.on_quote(symbol, now, self._prices[symbol] - half, self._prices[symbol] + half)
+
+
+class PollingFeed(_Feed):
+    """
+    Yahoo's last price for each symbol every `interval` seconds, recorded as
+    a trade sized by the growth of the day's volume since the last poll.
+    Yahoo's fast quote carries no bid/ask, so this feed reports no quotes.
+    """
+
+    name = "poll"
+
+    def __init__(self, engine, symbols=(), interval=LIVE_POLL_INTERVAL):
+        super().__init__(engine, symbols, interval)
+        self._volume = {}
+
+    def poll(self):
+        import yfinance as yf
+
+        for symbol in self.symbols():
+            with upstream("yfinance"):
+                info = yf.Ticker(symbol).fast_info
+                price, volume = info["lastPrice"], info["lastVolume"]
+            if price is None:
+                continue
+            previous = self._volume.get(symbol)
+            self._volume[symbol] = volume
+            size = max(volume - previous, 0) if previous is not None and volume is not None else 0
+            self.engine.on_trade(symbol, int(time.time() * 1000), float(price), float(size))
+
+
+def make_feed(engine, kind=LIVE_FEED, symbols=()):
+    """The configured live feed (None when LIVE_FEED is unset)."""
+    if not kind:
+        return None
+    if kind == "simulated":
+        return SimulatedFeed(engine, symbols)
+    if kind == "poll":
+        return PollingFeed(engine, symbols)
+    raise ValueError("LIVE_FEED must be '', 'simulated' or 'poll'")
+
+
+def benchmark(ticks=1_000_000, symbols=100, batch=10_000):
+    """Single-thread ingest throughput over simulated trades (ticks per second)."""
+    engine = BarEngine()
+    names = [f"SYM{i}" for i in range(symbols)]
+    feed = SimulatedFeed(engine, names)
+    # Trades 1s apart per symbol: 1m, 5m and 1h bars roll over; 1M ticks over
+    # 100 symbols span under 3 hours, so the 1d bar stays forming
+    trades = feed.trades(names, ticks // symbols, int(pd.Timestamp("2026-01-05 14:30", tz="UTC").value // 1_000_000), 1000)
+    start = time.perf_counter()
+    for i in range(0, len(trades), batch):
+        engine.on_trades(trades[i:i + batch])
+    elapsed = time.perf_counter() - start
+    delta_start = time.perf_counter()
+    engine.delta(names[0], "1m", since=engine.delta(names[0], "1m")["version"] - 100)
+    return {
+        "ticks": len(trades),
+        "seconds": round(elapsed, 3),
+        "ticks_per_second": round(len(trades) / elapsed),
+        "delta_ms": round((time.perf_counter() - delta_start) * 1000, 3),
+        "bars_1m": len(engine._symbols[names[0]].closed[0]),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tick-to-bar aggregation.")
+    parser.add_argument("--ticks", type=int, default=1_000_000)
+    parser.add_argument("--symbols", type=int, default=100)
+    args = parser.parse_args()
+    print(benchmark(args.ticks, args.symbols))
@@ -0,0 +1,652 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Recorded (or synthesized) upstream responses replayed by the stubs
+FIXTURES_DIR = os.getenv("BENCH_FIXTURES_DIR", os.path.join(ROOT, "bench_fixtures"))
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", os.path.join(ROOT, "bench_results"))
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "JPM", "XOM", "JNJ",
+           "XLK", "XLV", "XLI", "XLF", "XRT"]
+HISTORY_YEARS = 10
+HEADLINES = 50
+# A change beyond this fraction counts as a regression in --compare
+REGRESSION_THRESHOLD = 0.2
+
+BENCHMARKS = ("import", "fetch_stock_data", "serialization", "api_stock", "api_news", "asgi_stock", "stocks_stream",
+              "alpha_vantage", "indicators", "forecast", "streamlit_prep", "columnar", "screen", "bars",
+              "portfolio")
+
+
+#########################
+# Fixtures
+#########################
+
+def _fixture(name):
+    return os.path.join(FIXTURES_DIR, name)
+
+
+def synthesize_fixtures(symbols=SYMBOLS, years=HISTORY_YEARS, seed=0):
+    """Deterministic stand-ins for recorded Yahoo, Alpha Vantage and news responses."""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    index = pd.bdate_range(end="2026-10-16", periods=252 * years, tz="America/New_York")
+    for i, symbol in enumerate(symbols):
+        path = _fixture(f"yahoo_{symbol}.pkl")
+        if os.path.exists(path):
+            continue
+        rng = np.random.default_rng(seed + i)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+        spread = np.abs(rng.normal(0, 0.01, len(index))) * close
+        history = pd.DataFrame({
+            "Open": close + rng.normal(0, 0.3, len(index)),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        }, index=index)
+        history.index.name = "Date"
+        history.to_pickle(path)
+
+        series = {
+            date.strftime("%Y-%m-%d"): {
+                "1. open": f"{row.Open:.4f}", "2. high": f"{row.High:.4f}", "3. low": f"{row.Low:.4f}",
+                "4. close": f"{row.Close:.4f}", "5. volume": str(int(row.Volume)),
+            }
+            for date, row in history.iloc[::-1].iterrows()
+        }
+        with open(_fixture(f"alpha_vantage_{symbol}.json"), "w") as f:
+            json.dump({"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}, f)
+
+    if not os.path.exists(_fixture("news.html")):
+        items = "\n".join(f"<article><h2>Markets update {i}: stocks move on earnings and rates</h2><p>Body {i}</p></article>"
+                          for i in range(HEADLINES))
+        with open(_fixture("news.html"), "w") as f:
+            f.write(f"<html><body>{items}</body></html>")
+
+
+def record_fixtures(symbols=SYMBOLS, news_url=None):
+    """Replace the fixtures with live Yahoo / Alpha Vantage / news responses."""
+    import requests
+    import yfinance as yf
+    from load import ALPHA_VANTAGE_API_KEY
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for symbol in symbols:
+        yf.Ticker(symbol).history(period=f"{HISTORY_YEARS}y").to_pickle(_fixture(f"yahoo_{symbol}.pkl"))
+        if ALPHA_VANTAGE_API_KEY:
+            payload = requests.get("https://www.alphavantage.co/query", timeout=30, params={
+                "function": "TIME_SERIES_DAILY", "symbol": symbol, "outputsize": "full", "apikey": ALPHA_VANTAGE_API_KEY,
+            }).json()
+            with open(_fixture(f"alpha_vantage_{symbol}.json"), "w") as f:
+                json.dump(payload, f)
+    if news_url:
+        with open(_fixture("news.html"), "w", encoding="utf-8") as f:
+            f.write(requests.get(news_url, timeout=30).text)
+
+
+def load_history(symbol):
+    return pd.read_pickle(_fixture(f"yahoo_{symbol.upper()}.pkl"))
+
+
+#########################
+# Upstream stubs
+#########################
+
+_PERIODS = {"1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3), "6mo": pd.DateOffset(months=6),
+            "1y": pd.DateOffset(years=1), "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5)}
+
+
+def _slice(history, period=None, start=None):
+    if start is not None:
+        return history[history.index >= pd.Timestamp(start, tz=history.index.tz)]
+    if period in _PERIODS:
+        return history[history.index >= history.index.max() - _PERIODS[period]]
+    return history
+
+
+class StubTicker:
+    """yfinance.Ticker replaying a fixture instead of calling Yahoo."""
+
+    def __init__(self, symbol, *args, **kwargs):
+        self.symbol = symbol.upper()
+
+    def history(self, period="1mo", interval="1d", start=None, **kwargs):
+        return _slice(load_history(self.symbol), period, start).copy()
+
+    @property
+    def info(self):
+        close = load_history(self.symbol)["Close"]
+        return {"symbol": self.symbol, "currentPrice": float(close.iloc[-1]), "marketCap": float(close.iloc[-1]) * 1e9}
+
+
+def _stub_download(symbols, period="1mo", interval="1d", group_by="column", **kwargs):
+    symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+    return pd.concat({s: StubTicker(s).history(period) for s in symbols}, axis=1)
+
+
+def install_yahoo_stub():
+    """Route every `import yfinance` in the code under test to the fixtures."""
+    stub = types.ModuleType("yfinance")
+    stub.Ticker = StubTicker
+    stub.download = _stub_download
+    sys.modules["yfinance"] = stub
+
+
+class _UpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Local Alpha Vantage query endpoint and news page (with ETag support).
+    Tests can queue raw /query payloads in `scripted` (served before the
+    fixtures), hold every /query response until `hold` is set, and read the
+    received query parameters, in order, from `queries`.
+    """
+
+    scripted = []
+    hold = None
+    queries = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/query":
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            type(self).queries.append(params)
+            if self.hold is not None:
+                self.hold.wait(10)
+            if self.scripted:
+                return self._send(200, json.dumps(type(self).scripted.pop(0)).encode())
+            path = _fixture(f"alpha_vantage_{params.get('symbol', '').upper()}.json")
+            if not os.path.exists(path):
+                return self._send(200, b'{"Error Message": "Invalid API call."}')
+            with open(path) as f:
+                payload = json.load(f)
+            if params.get("outputsize") != "full":
+                series = payload["Time Series (Daily)"]
+                payload = {**payload, "Time Series (Daily)": dict(list(series.items())[:100])}
+            return self._send(200, json.dumps(payload).encode())
+        if url.path == "/news":
+            with open(_fixture("news.html"), "rb") as f:
+                body = f.read()
+            etag = f'"{len(body)}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304)
+            return self._send(200, body, "text/html", {"ETag": etag})
+        self._send(404)
+
+
+def start_upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _UpstreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def isolate_environment(upstream_url):
+    """
+    Point the code under test at the stubs and a throwaway cache. Must run
+    before the project modules are imported (they read these at import).
+    """
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    os.environ.update({
+        "STOCK_CACHE_DIR": os.path.join(workdir, "cache"),
+        "SEARCH_INDEX_DIR": os.path.join(workdir, "search"),
+        "NEWS_SOURCES": f"{upstream_url}/news",
+        "ALPHA_VANTAGE_URL": f"{upstream_url}/query",
+        "ALPHA_VANTAGE_API_KEY": "bench",
+        "ALPHA_VANTAGE_CALLS_PER_MINUTE": "1000000",
+        "ALPHA_VANTAGE_CALLS_PER_DAY": "1000000",
+        "WATCHLIST": "",
+        "WATCHLISTS_FILE": "",
+    })
+    install_yahoo_stub()
+    return workdir
+
+
+#########################
+# Measurement helpers
+#########################
+
+def summarize(samples):
+    """Latency summary (milliseconds) of a list of durations in seconds."""
+    ms = np.asarray(samples) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "min_ms": round(float(ms.min()), 3),
+    }
+
+
+def timed(fn, repeat, *args, **kwargs):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def load_test(call, requests_total, concurrency):
+    """Run `call(i)` requests_total times from `concurrency` threads; throughput + latency."""
+    samples = [0.0] * requests_total
+
+    def one(i):
+        start = time.perf_counter()
+        call(i)
+        samples[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests_total)))
+    elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "requests_per_second": round(requests_total / elapsed, 1), **summarize(samples)}
+
+
+#########################
+# Benchmarks
+#########################
+
+def bench_import(scale):
+    import bench_import
+    result = bench_import.check("api", runs=3 if scale < 1 else 5)
+    return {"api_import_seconds": result["seconds"], "forbidden_loaded": result["forbidden_loaded"]}
+
+
+def bench_fetch_stock_data(scale):
+    import data_layer
+    from cache import HistoryCache
+
+    symbols = SYMBOLS
+    cold = timed(lambda: [data_layer.fetch_stock_data(s) for s in symbols], 1)
+    warm = timed(data_layer.fetch_stock_data, int(200 * scale) or 1, symbols[0])
+    # Fresh memory tier over the same store: every lookup is a disk hit
+    disk_cache = HistoryCache(data_layer.download_stock_history, store=data_layer.history_cache.store)
+    disk = timed(lambda: [disk_cache.memory.clear(), disk_cache.get(symbols[0])], int(50 * scale) or 1)
+    cold["per_symbol_ms"] = round(cold["mean_ms"] / len(symbols), 3)
+    return {"cold_upstream": cold, "disk_hit": disk, "memory_hit": warm}
+
+
+def bench_serialization(scale):
+    import wire
+
+    data = load_history(SYMBOLS[0])
+    repeat = int(20 * scale) or 1
+    results = {}
+
+    def stdlib_records():
+        frame = data.copy()
+        frame.index = frame.index.astype(str)
+        return json.dumps(frame.to_dict()).encode()
+
+    results["stdlib_to_dict"] = {**timed(stdlib_records, repeat), "bytes": len(stdlib_records())}
+    for fmt in wire.available_formats():
+        body, _ = wire.encode(data, fmt)
+        results[f"encode_{fmt}"] = {**timed(wire.encode, repeat, data, fmt), "bytes": len(body)}
+        results[f"decode_{fmt}"] = timed(wire.decode, repeat, body, fmt)
+    results["rows"] = len(data)
+    return results
+
+
+def _flask_server():
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import api
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, api.flask_app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def _http_load(path_for, scale, concurrency=8):
+    import requests
+
+    server, base = _flask_server()
+    local = threading.local()
+
+    def call(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        session.get(f"{base}{path_for(i)}", timeout=60).raise_for_status()
+
+    try:
+        # Warm-up pass fills caches and connection pools
+        load_test(call, concurrency, concurrency)
+        return load_test(call, int(400 * scale) or concurrency, concurrency)
+    finally:
+        server.shutdown()
+
+
+def bench_api_stock(scale):
+    return {fmt: _http_load(lambda i, fmt=fmt: f"/stock?symbol={SYMBOLS[i % len(SYMBOLS)]}&period=1y&format={fmt}", scale)
+            for fmt in ("records", "columns")}
+
+
+def bench_api_news(scale):
+    return _http_load(lambda i: "/news", scale)
+
+
+def bench_asgi_stock(scale, concurrency=32):
+    import httpx
+    import asgi
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi.fastapi_app)
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one(i):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get("/stock", params={"symbol": SYMBOLS[i % len(SYMBOLS)], "period": "1y",
+                                                                  "format": "columns"})
+                    response.raise_for_status()
+                    return time.perf_counter() - start
+
+            await asyncio.gather(*(one(i) for i in range(concurrency)))
+            total = int(400 * scale) or concurrency
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(one(i) for i in range(total)))
+            elapsed = time.perf_counter() - start
+        return {"concurrency": concurrency, "requests_per_second": round(total / elapsed, 1),
+                "coalesced": asgi.inflight.stats()["coalesced"], **summarize(samples)}
+
+    return asyncio.run(run())
+
+
+def bench_stocks_stream(scale, period="1y"):
+    """Whole watchlist: sequential /stock calls vs one /stocks/stream (time to first row and total)."""
+    import requests
+
+    server, base = _flask_server()
+    session = requests.Session()
+    repeat = int(10 * scale) or 1
+
+    def sequential():
+        for symbol in SYMBOLS:
+            session.get(f"{base}/stock", params={"symbol": symbol, "period": period, "format": "columns"},
+                        timeout=60).raise_for_status()
+
+    first_row = []
+
+    def stream():
+        start = time.perf_counter()
+        params = {"symbols": ",".join(SYMBOLS), "period": period}
+        with session.get(f"{base}/stocks/stream", params=params, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            for i, line in enumerate(response.iter_lines()):
+                if i == 0:
+                    first_row.append(time.perf_counter() - start)
+
+    try:
+        sequential()  # warm-up
+        results = {"symbols": len(SYMBOLS), "sequential": timed(sequential, repeat), "stream": timed(stream, repeat)}
+        results["stream_first_row"] = summarize(first_row)
+        return results
+    finally:
+        server.shutdown()
+
+
+def bench_alpha_vantage(scale):
+    from alpha_vantage_client import AlphaVantageClient
+
+    client = AlphaVantageClient()
+    return {
+        "daily_compact": timed(client.daily, int(50 * scale) or 1, SYMBOLS[0], "compact"),
+        "daily_full": timed(client.daily, int(10 * scale) or 1, SYMBOLS[0], "full"),
+    }
+
+
+def bench_indicators(scale):
+    import indicators
+
+    rows, tickers = 2520, int(500 * scale) or 10
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (rows, tickers)), axis=0)),
+                          index=pd.bdate_range(end="2026-10-16", periods=rows),
+                          columns=[f"T{i}" for i in range(tickers)])
+    return {"rows": rows, "tickers": tickers, "all_indicators": timed(indicators.compute_indicators, 3, prices)}
+
+
+def bench_forecast(scale):
+    import forecast
+
+    prices = load_history(SYMBOLS[0])["Close"]
+    paths = int(100_000 * scale) or 1000
+    return {
+        "paths": paths,
+        "run_forecast_gbm": timed(forecast.run_forecast, 3, prices, n_paths=paths),
+        "simulate_bootstrap_1y": timed(forecast.simulate, 3, prices, 252, n_paths=paths, method="bootstrap"),
+    }
+
+
+def bench_streamlit_prep(scale):
+    import wire
+    from downsample import chart_frame
+
+    fmt = wire.available_formats()[0]
+    body, _ = wire.encode(load_history(SYMBOLS[0]), fmt)
+
+    def prepare():
+        data = wire.decode(body, fmt)
+        return chart_frame(data, ["sma", "ema", "bollinger"])
+
+    return {"format": fmt, "decode_and_chart": timed(prepare, int(20 * scale) or 1)}
+
+
+def bench_columnar(scale):
+    import wire
+    from columnar import ColumnarStore, to_epoch_ms
+
+    # Years of minute bars, as stock.history(interval="1m") would return them
+    rows = int(2_000_000 * scale) or 10_000
+    rng = np.random.default_rng(0)
+    index = pd.date_range(end="2026-10-16 16:00", periods=rows, freq="min", tz="America/New_York", name="Datetime")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, rows)))
+    frame = pd.DataFrame({"Open": close, "High": close * 1.001, "Low": close * 0.999, "Close": close,
+                          "Volume": rng.integers(0, 10_000, rows)}, index=index)
+
+    store = ColumnarStore(tempfile.mkdtemp(prefix="bench-columnar-"))
+    write = timed(store.write, 1, "BENCH@1m", frame)
+    series = store.open("BENCH@1m")
+    start, end = to_epoch_ms(index[rows // 2]), to_epoch_ms(index[rows // 2] + pd.Timedelta(days=1))
+    day = frame.loc[index[rows // 2]:index[rows // 2] + pd.Timedelta(days=1)]
+    return {
+        "rows": rows,
+        "frame_bytes": int(frame.memory_usage(index=True).sum()),
+        "disk_bytes": sum(os.path.getsize(os.path.join(store.path("BENCH@1m"), f))
+                          for f in os.listdir(store.path("BENCH@1m"))),
+        "write_all": write,
+        "append_bar": timed(lambda: store.write("BENCH@1m", frame.iloc[-1:]), int(50 * scale) or 1),
+        "open": timed(store.open, int(200 * scale) or 1, "BENCH@1m"),
+        "slice_day_columns": timed(lambda: wire.encode_json(series.to_columns(start, end)), int(200 * scale) or 1),
+        "frame_day_columns": timed(wire.encode, int(200 * scale) or 1, day, "columns"),
+    }
+
+
+def bench_screen(scale):
+    from screener import FIELDS, Screener, parse_conditions, parse_sort
+
+    rows = int(10_000 * scale) or 1000
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({field: rng.lognormal(3, 1.5, rows) for field in FIELDS},
+                        index=[f"S{i:05d}" for i in range(rows)])
+    data.loc[data.sample(frac=0.1, random_state=0).index, "pe"] = np.nan
+    screener = Screener(data)
+    conditions, sort = parse_conditions("pe<20, market_cap>50"), parse_sort("-dividend_yield")
+    return {
+        "symbols": rows,
+        "build_indexes": timed(Screener, 3, data),
+        "filter_and_sort": timed(screener.screen, int(200 * scale) or 1, conditions, sort),
+        "multi_key_sort": timed(screener.screen, int(200 * scale) or 1, conditions, parse_sort("-dividend_yield,pe")),
+        "pandas_query": timed(lambda: data[(data.pe < 20) & (data.market_cap > 50)]
+                              .sort_values("dividend_yield", ascending=False).head(50), int(200 * scale) or 1),
+    }
+
+
+def bench_bars(scale):
+    import bars
+
+    # Target: 100k ticks/s on one core
+    return bars.benchmark(ticks=int(1_000_000 * scale) or 100_000)
+
+
+def bench_portfolio(scale):
+    import portfolio
+
+    # Target: 500 assets x 10 years in under a second
+    assets, days = int(500 * scale) or 50, 2520
+    rng = np.random.default_rng(0)
+    market = rng.normal(0.0003, 0.01, (days, 1))
+    returns = market * rng.uniform(0.5, 1.5, assets) + rng.normal(0, 0.015, (days, assets))
+    index = pd.bdate_range(end="2026-10-16", periods=days)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index,
+                          columns=[f"A{i:03d}" for i in range(assets)])
+    benchmark = pd.Series(100 * np.exp(np.cumsum(market[:, 0])), index=index)
+    return {
+        "assets": assets,
+        "days": days,
+        "analyze": timed(portfolio.analyze, 3, prices, None, benchmark),
+        "min_variance": timed(portfolio.analyze, 3, prices, None, benchmark, "min_variance"),
+        "risk_parity": timed(portfolio.analyze, 3, prices, None, benchmark, "risk_parity"),
+    }
+
+
+def run(names=BENCHMARKS, scale=1.0):
+    synthesize_fixtures()
+    server, upstream = start_upstream()
+    workdir = isolate_environment(upstream)
+    results = {}
+    try:
+        for name in names:
+            print(f"- {name} ...", file=sys.stderr, flush=True)
+            start = time.perf_counter()
+            try:
+                results[name] = globals()[f"bench_{name}"](scale)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            results[name]["wall_seconds"] = round(time.perf_counter() - start, 3)
+    finally:
+        server.shutdown()
+    return {"meta": metadata(scale, workdir), "results": results}
+
+
+def metadata(scale, workdir):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=ROOT).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scale": scale,
+        "workdir": workdir,
+    }
+
+
+#########################
+# Comparing runs
+#########################
+
+def _metrics(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _metrics(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Relative change of the headline metrics shared by two runs: median
+    latencies, throughputs and import time (means and tails are too noisy
+    to gate on). Returns (rows, regressions).
+    """
+    old = dict(_metrics(baseline["results"]))
+    rows, regressions = [], []
+    for key, new_value in _metrics(current["results"]):
+        old_value = old.get(key)
+        higher_is_better = key.endswith("per_second")
+        if not old_value or not key.endswith(("p50_ms", "per_second", "import_seconds")):
+            continue
+        change = (new_value - old_value) / old_value
+        worse = -change if higher_is_better else change
+        rows.append((key, old_value, new_value, change))
+        if worse > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the data, API and UI-preparation paths.")
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on iterations / problem sizes")
+    parser.add_argument("--out", help="Results file (default: bench_results/<commit>-<time>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--record", action="store_true", help="Record live fixtures first (needs network)")
+    parser.add_argument("--news-url", help="Page to record as the news fixture")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures(news_url=args.news_url)
+
+    report = run(args.only, args.scale)
+    out = args.out
+    if out is None:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        out = os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'nogit'}-{stamp}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(baseline, report, args.threshold)
+        for key, old_value, new_value, change in rows:
+            flag = "  <-- regression" if key in regressions else ""
+            print(f"{key:60s} {old_value:>12.3f} -> {new_value:>12.3f} ({change:+.1%}){flag}")
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Cold-start budget for importing the API module (seconds, median of runs)
+IMPORT_BUDGET = float(os.getenv("IMPORT_BUDGET", "1.0"))
+# Packages the Flask API must not load at import time
+API_FORBIDDEN = ("streamlit", "plotly", "matplotlib", "yfinance", "faiss", "bs4", "fastapi", "uvicorn", "celery")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(module, python=sys.executable):
+    """
+    Import `module` in a fresh interpreter under `-X importtime`.
+    Returns [(name, self µs, cumulative µs, depth)] in report order.
+    """
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    profile = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            profile.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return profile
+
+
+def total_seconds(profile):
+    """Total import time: the sum of the top-level imports' cumulative times."""
+    return sum(cumulative for _, _, cumulative, depth in profile if depth == 0) / 1e6
+
+
+def loaded(profile, packages):
+    """Which of `packages` (or their submodules) the import pulled in."""
+    names = {name for name, _, _, _ in profile}
+    return [p for p in packages if any(n == p or n.startswith(p + ".") for n in names)]
+
+
+def check(module="api", budget=IMPORT_BUDGET, forbidden=API_FORBIDDEN, runs=5, top=10):
+    """Median cold import time over `runs` fresh interpreters, checked against the budget."""
+    profiles = [import_profile(module) for _ in range(runs)]
+    seconds = statistics.median(total_seconds(p) for p in profiles)
+    heaviest = sorted((p for p in profiles[-1] if p[3] <= 1), key=lambda p: p[2], reverse=True)[:top]
+    return {
+        "module": module,
+        "seconds": round(seconds, 3),
+        "budget": budget,
+        "heaviest": [(name, round(cumulative / 1e6, 3)) for name, _, cumulative, _ in heaviest],
+        "forbidden_loaded": loaded(profiles[-1], forbidden),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if the API's cold import exceeds its time budget.")
+    parser.add_argument("--module", default="api")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET, help="Seconds")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list")
+    parser.add_argument("--allow", nargs="*", default=[], help="Forbidden packages to allow anyway")
+    args = parser.parse_args(argv)
+
+    forbidden = [p for p in API_FORBIDDEN if p not in args.allow]
+    result = check(args.module, args.budget, forbidden, args.runs, args.top)
+    print(f"import {result['module']}: {result['seconds']:.3f}s (budget {result['budget']:.3f}s)")
+    for name, seconds in result["heaviest"]:
+        print(f"  {seconds:8.3f}s  {name}")
+
+    failed = False
+    if result["seconds"] > result["budget"]:
+        print("FAIL: over the import-time budget")
+        failed = True
+    if result["forbidden_loaded"]:
+        print(f"FAIL: loaded at import time: {', '.join(result['forbidden_loaded'])}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
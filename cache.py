@@ -0,0 +1,192 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, in-process locks only
+    fcntl = None
+
+try:
+    import pyarrow  # noqa: F401  (enables the Parquet engine in pandas)
+    STORE_FORMAT = "parquet"
+except ImportError:
+    STORE_FORMAT = "pickle"
+
+# Cache configuration (override through the environment)
+CACHE_DIR = os.getenv("STOCK_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".stock_cache"))
+CACHE_TTL = float(os.getenv("STOCK_CACHE_TTL", "900"))  # seconds
+CACHE_SIZE = int(os.getenv("STOCK_CACHE_SIZE", "256"))  # symbols kept in memory
+
+
+def _safe_name(symbol):
+    """Turn a ticker (e.g. ^GSPC, BRK-B) into a safe file name."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", symbol.strip().upper())
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on `path` (created if missing), across processes."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a per-key TTL."""
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskStore:
+    """On-disk columnar store with one file per ticker that survives restarts."""
+
+    def __init__(self, root=CACHE_DIR, fmt=STORE_FORMAT):
+        self.root = root
+        self.fmt = fmt
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol):
+        return os.path.join(self.root, f"{_safe_name(symbol)}.{self.fmt}")
+
+    def age(self, symbol):
+        """Seconds since the ticker file was last written, or None if absent."""
+        try:
+            return time.time() - os.path.getmtime(self.path(symbol))
+        except OSError:
+            return None
+
+    def load(self, symbol):
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            if self.fmt == "parquet":
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception:
+            # A truncated or corrupt file is treated as a miss
+            return None
+
+    def save(self, symbol, data):
+        path = self.path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if self.fmt == "parquet":
+            data.to_parquet(tmp_path)
+        else:
+            data.to_pickle(tmp_path)
+        os.replace(tmp_path, path)  # atomic, so readers never see a partial file
+
+
+class HistoryCache:
+    """
+    Two-tier cache in front of a price-history loader.
+    Lookups go memory -> disk -> upstream; upstream is only hit on a miss
+    or when both cached copies are older than the TTL.
+    """
+
+    def __init__(self, loader, store=None, memory=None, ttl=CACHE_TTL):
+        self.loader = loader
+        self.ttl = ttl
+        self.store = store if store is not None else DiskStore()
+        self.memory = memory if memory is not None else TTLCache(ttl=ttl)
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stale_served": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def lookup(self, symbol):
+        """Return (data, source) where source is 'memory', 'disk' or 'upstream'."""
+        symbol = symbol.strip().upper()
+
+        data = self.memory.get(symbol)
+        if data is not None:
+            self._count("memory_hits")
+            return data, "memory"
+
+        age = self.store.age(symbol)
+        if age is not None and age < self.ttl:
+            data = self.store.load(symbol)
+            if data is not None:
+                self._count("disk_hits")
+                self.memory.set(symbol, data, ttl=self.ttl - age)
+                return data, "disk"
+
+        self._count("misses")
+        try:
+            data = self.loader(symbol)
+        except Exception:
+            # Upstream failed: fall back to a stale disk copy if we have one
+            stale = self.store.load(symbol) if age is not None else None
+            if stale is None:
+                raise
+            self._count("stale_served")
+            return stale, "stale"
+
+        if not data.empty:
+            self.store.save(symbol, data)
+            self.memory.set(symbol, data)
+        return data, "upstream"
+
+    def get(self, symbol):
+        return self.lookup(symbol)[0]
+
+    def invalidate(self, symbol):
+        self.memory.invalidate(symbol.strip().upper())
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        total = hits + counts["misses"]
+        counts["hits"] = hits
+        counts["hit_ratio"] = round(hits / total, 4) if total else 0.0
+        counts["memory_entries"] = len(self.memory)
+        return counts
@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, _safe_name, file_lock
+
+# One directory per series: meta.json plus one raw array file per field
+COLUMNAR_DIR = os.getenv("COLUMNAR_DIR", os.path.join(CACHE_DIR, "columnar"))
+# dtype for price fields; float32 halves memory and disk against float64
+PRICE_DTYPE = os.getenv("COLUMNAR_PRICE_DTYPE", "float32")
+INTEGER_FIELDS = ("Volume",)
+
+
+def epoch_ms(index):
+    """Epoch milliseconds (UTC) of a DatetimeIndex."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ms").asi8
+
+
+def to_epoch_ms(value, tz=None, end=False):
+    """
+    A user-supplied date/time (string, Timestamp, epoch ms) as epoch ms;
+    naive times are taken in `tz`. With `end`, a bare date means the end
+    of that day, so ranges are inclusive.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    stamp = pd.Timestamp(value)
+    if end and isinstance(value, str) and len(value.strip()) == 10:
+        stamp += pd.Timedelta(days=1) - pd.Timedelta(milliseconds=1)
+    if stamp.tzinfo is None and tz:
+        stamp = stamp.tz_localize(tz)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert("UTC").tz_localize(None)
+    return stamp.value // 1_000_000
+
+
+class ColumnarSeries:
+    """
+    Read-only, memory-mapped view of one stored series. Slicing a date
+    range is a binary search on the index plus array views: no rows are
+    read until they are used, and processes mapping the same files share
+    the OS page cache.
+    """
+
+    def __init__(self, root, meta):
+        self.meta = meta
+        self.rows = meta["rows"]
+        self.tz = meta.get("tz")
+        generation = meta["generation"]
+        self.index = self._map(os.path.join(root, f"index.{generation}.bin"), "int64")
+        self.columns = {
+            field: self._map(os.path.join(root, f"{_safe_name(field)}.{generation}.bin"), dtype)
+            for field, dtype in meta["fields"].items()
+        }
+
+    def _map(self, path, dtype):
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(self.rows,))
+
+    def __len__(self):
+        return self.rows
+
+    def bounds(self, start=None, end=None):
+        """Row range [lo, hi) with start <= timestamp <= end (epoch ms, either optional)."""
+        lo = 0 if start is None else int(np.searchsorted(self.index, start, side="left"))
+        hi = self.rows if end is None else int(np.searchsorted(self.index, end, side="right"))
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None):
+        """(index, {field: values}) views over a time range; nothing is copied."""
+        lo, hi = self.bounds(start, end)
+        return self.index[lo:hi], {field: values[lo:hi] for field, values in self.columns.items()}
+
+    def to_columns(self, start=None, end=None):
+        """Payload in wire's 'columns' shape, built directly on the mapped arrays."""
+        index, columns = self.slice(start, end)
+        return {
+            "index": np.asarray(index),
+            "tz": self.tz,
+            "columns": {field: np.asarray(values) for field, values in columns.items()},
+        }
+
+    def to_frame(self, start=None, end=None):
+        """The range as a DataFrame (this one copies)."""
+        index, columns = self.slice(start, end)
+        frame = pd.DataFrame({field: np.array(values) for field, values in columns.items()},
+                             index=pd.to_datetime(np.array(index), unit="ms", utc=True))
+        if self.tz:
+            frame.index = frame.index.tz_convert(self.tz)
+        frame.index.name = self.meta.get("index_name")
+        return frame
+
+
+class ColumnarStore:
+    """
+    Compact on-disk history: int64 epoch-ms timestamps plus one flat
+    array per field (prices as PRICE_DTYPE), described by meta.json.
+
+    Writes append new rows in place and overwrite re-sent tail rows in
+    place, then publish the new row count by atomically replacing
+    meta.json. Anything else (backfilled gaps, changed fields) is written
+    as a new file generation, so readers holding old maps are never cut
+    short. Writers (threads or processes) take an exclusive lock on the
+    series, and bytes past the published row count are discarded before
+    appending, so an interrupted write never shifts later rows.
+    """
+
+    def __init__(self, root=COLUMNAR_DIR, price_dtype=PRICE_DTYPE):
+        self.root = root
+        self.price_dtype = np.dtype(price_dtype).name
+        self._open = {}   # key -> ColumnarSeries, reused while meta is unchanged
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, _safe_name(key))
+
+    def meta(self, key):
+        try:
+            with open(os.path.join(self.path(key), "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def age(self, key):
+        """Seconds since the series was last written, or None if absent."""
+        try:
+            return time.time() - os.path.getmtime(os.path.join(self.path(key), "meta.json"))
+        except OSError:
+            return None
+
+    def open(self, key):
+        """Memory-mapped view of the latest published version, or None."""
+        meta = self.meta(key)
+        if meta is None:
+            return None
+        with self._lock:
+            series = self._open.get(key)
+            if series is None or series.meta != meta:
+                series = self._open[key] = ColumnarSeries(self.path(key), meta)
+            return series
+
+    def _dtype(self, field):
+        return "int64" if field in INTEGER_FIELDS else self.price_dtype
+
+    def _column(self, frame, field, dtype):
+        missing = 0 if np.dtype(dtype).kind in "iu" else np.nan
+        return np.ascontiguousarray(frame[field].to_numpy(dtype=np.float64, na_value=missing).astype(dtype))
+
+    def _publish(self, root, meta):
+        tmp = os.path.join(root, f"meta.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(root, "meta.json"))
+
+    def _append(self, path, rows, values):
+        """Write `values` right after the first `rows` published rows, dropping anything beyond them."""
+        with open(path, "r+b") as f:
+            f.truncate(rows * values.itemsize)
+            f.seek(rows * values.itemsize)
+            values.tofile(f)
+
+    def _rewrite(self, key, frame, previous):
+        root = self.path(key)
+        generation = previous["generation"] + 1 if previous else 0
+        fields = {str(field): self._dtype(str(field)) for field in frame.columns}
+        epoch_ms(frame.index).astype("int64").tofile(os.path.join(root, f"index.{generation}.bin"))
+        for field, dtype in fields.items():
+            self._column(frame, field, dtype).tofile(os.path.join(root, f"{_safe_name(field)}.{generation}.bin"))
+        tz = pd.DatetimeIndex(frame.index).tz
+        self._publish(root, {
+            "generation": generation,
+            "rows": len(frame),
+            "fields": fields,
+            "tz": str(tz) if tz is not None else None,
+            "index_name": frame.index.name,
+        })
+        if previous:
+            # Readers still mapping the old files keep them alive (POSIX)
+            for name in os.listdir(root):
+                if name.endswith(f".{previous['generation']}.bin"):
+                    try:
+                        os.remove(os.path.join(root, name))
+                    except OSError:
+                        pass
+
+    def write(self, key, frame):
+        """Merge a time-indexed frame into the stored series; returns the stored row count."""
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        os.makedirs(self.path(key), exist_ok=True)
+        with self._lock, file_lock(os.path.join(self.path(key), "write.lock")):
+            previous = self.meta(key)
+            same_fields = previous is not None and set(previous["fields"]) == {str(c) for c in frame.columns}
+            if previous is None or previous["rows"] == 0 or not same_fields or frame.empty:
+                if frame.empty and previous is not None:
+                    self._publish(self.path(key), previous)  # synced, nothing new
+                    return previous["rows"]
+                self._rewrite(key, frame, previous)
+                return len(frame)
+
+            stored = ColumnarSeries(self.path(key), previous)
+            stamps = epoch_ms(frame.index)
+            positions = np.searchsorted(stored.index, stamps)
+            inside = positions < stored.rows
+            matched = inside & (stored.index[np.minimum(positions, stored.rows - 1)] == stamps)
+            if np.any(inside & ~matched):
+                # New timestamps inside the stored range: merge into a new generation
+                merged = stored.to_frame()
+                merged = pd.concat([merged, frame.tz_convert(merged.index.tz) if stored.tz else frame])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                merged.index.name = previous.get("index_name")
+                self._rewrite(key, merged, previous)
+                return len(merged)
+
+            root = self.path(key)
+            generation = previous["generation"]
+            tail = ~inside
+            for field, dtype in previous["fields"].items():
+                values = self._column(frame, field, dtype)
+                path = os.path.join(root, f"{_safe_name(field)}.{generation}.bin")
+                if np.any(matched):
+                    # Re-sent bars (e.g. the last, partial one): overwrite in place
+                    mapped = np.memmap(path, dtype=dtype, mode="r+", shape=(stored.rows,))
+                    mapped[positions[matched]] = values[matched]
+                    mapped.flush()
+                    del mapped
+                if np.any(tail):
+                    self._append(path, stored.rows, values[tail])
+            if np.any(tail):
+                self._append(os.path.join(root, f"index.{generation}.bin"), stored.rows, stamps[tail].astype("int64"))
+            rows = stored.rows + int(tail.sum())
+            self._publish(root, {**previous, "rows": rows})
+            return rows
+
+
+columnar_store = ColumnarStore()
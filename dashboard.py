@@ -0,0 +1,20 @@
+import streamlit as st
+import plotly.express as px
+
+from data_layer import load_stock_history, fetch_financial_news
+
+# Streamlit UI reading the data layer directly: streamlit run dashboard.py
+def render():
+    st.title('Financial Analysis Dashboard')
+    stock_symbol = st.text_input("Enter Stock Symbol:")
+    if stock_symbol:
+        stock_data = load_stock_history(stock_symbol.strip())
+        st.write(stock_data)
+        fig = px.line(stock_data, x=stock_data.index, y='Close', title=f'{stock_symbol} Closing Prices')
+        st.plotly_chart(fig)
+        if st.button("Get Financial News"):
+            news = fetch_financial_news()
+            st.write(news)
+
+if __name__ == '__main__':
+    render()
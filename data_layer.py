@@ -0,0 +1,448 @@
+# Data access shared by the API entry points (api.py, asgi.py) and the
+# dashboard. Imports no web framework or UI library; yfinance, FAISS and
+# the HTML parser are loaded on first use.
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from cache import HistoryCache
+import metrics
+from metrics import span, upstream
+from sync import COLUMNAR_INTERVALS, sync_alpha_vantage, sync_yahoo, sync_yahoo_columnar
+from columnar import to_epoch_ms
+from alpha_vantage_client import get_client as alpha_vantage_client
+import wire
+import indicators
+import portfolio
+from multi_stock import fetch_history, price_matrix
+from news import NewsFeed
+from prefetch import INDICATOR_PERIOD, Prefetcher, load_indicators, watchlist_symbols
+from bars import RESOLUTIONS as LIVE_INTERVALS, BarEngine, make_feed
+from screener import FIELDS as SCREEN_FIELDS, SCREEN_LIMIT, SCREEN_MAX_LIMIT, get_screener, parse_conditions, parse_sort
+
+# Load environment variables
+load_dotenv()
+ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Headlines and generated reports are embedded into a persistent vector
+# index, opened on first use (loading FAISS and the index is not free)
+_search_index = None
+_search_index_lock = threading.Lock()
+
+def get_search_index():
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            from search_index import SemanticIndex
+            _search_index = SemanticIndex()
+        return _search_index
+
+def flush_search_index():
+    """Seal unsaved vectors to disk, if the index was ever opened."""
+    if _search_index is not None:
+        _search_index.flush()
+
+def index_headlines(entries):
+    """NewsFeed callback: embed each refresh's new headlines, grouped by source."""
+    by_source = {}
+    for headline, url in entries:
+        by_source.setdefault(url, []).append(headline)
+    try:
+        index = get_search_index()
+        for url, headlines in by_source.items():
+            index.add_headlines(headlines, source=url)
+    except Exception as e:
+        print(f"Failed to index headlines: {e}")
+
+# Headlines are polled in the background and served from memory
+news_feed = NewsFeed(on_new=index_headlines)
+# Watchlist symbols are refreshed ahead of requests (see prefetch.py)
+prefetcher = Prefetcher(watchlist_symbols())
+# Live trades aggregated into 1m/5m/1h/1d bars (LIVE_FEED=simulated|poll);
+# symbols requested with /stock?since= are added to the feed
+bar_engine = BarEngine()
+live_feed = make_feed(bar_engine, symbols=watchlist_symbols())
+
+
+def start_background():
+    """Start the prefetcher and live feed threads (no-op once running); news starts on first use."""
+    prefetcher.start()
+    if live_feed is not None:
+        live_feed.start()
+
+# Fetch stock data
+def download_stock_history(symbol):
+    """Download last month's price history from Yahoo Finance (uncached)."""
+    import yfinance as yf
+
+    stock = yf.Ticker(symbol)
+    with upstream('yfinance'):
+        return stock.history(period='1mo')
+
+# Memory LRU + on-disk store in front of Yahoo Finance
+history_cache = HistoryCache(download_stock_history)
+metrics.register_cache('stock_history', history_cache.stats)
+
+def fetch_stock_data(symbol):
+    """Fetch stock data from Yahoo Finance."""
+    try:
+        symbol = symbol.strip()  # Remove unwanted spaces
+        with span('load_history'):
+            data = history_cache.get(symbol)
+
+        if data.empty:
+            return {"error": "No data found. Check ticker symbol."}, 404
+
+        # Convert index (datetime) to string for JSON serialization
+        with span('to_dict'):
+            data = data.copy()  # never mutate the cached frame
+            data.index = data.index.astype(str)
+            return data.to_dict()
+    
+    except Exception as e:
+        return {"error": f"Error fetching data: {str(e)}"}, 500
+
+# Ranges accepted by /stock?period=. Anything but the default month is
+# sliced from the incrementally synced full history (sync.sync_yahoo).
+STOCK_PERIODS = {
+    '1mo': None,
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+    '20y': pd.DateOffset(years=20),
+    'max': None,
+}
+
+def load_stock_history(symbol, period='1mo'):
+    """Price history for a symbol over one of STOCK_PERIODS."""
+    if period == '1mo':
+        return history_cache.get(symbol)
+    data = sync_yahoo(symbol)
+    if period == 'max' or data.empty:
+        return data
+    return data[data.index >= data.index.max() - STOCK_PERIODS[period]]
+
+def fetch_stock_range_payload(symbol, fmt='columns', start=None, end=None, interval='1d'):
+    """
+    A start/end range (inclusive; bare dates in exchange time) sliced from
+    the memory-mapped columnar store: returns (body, media_type, status).
+    The 'columns' format is encoded straight from the mapped arrays.
+    """
+    if interval not in COLUMNAR_INTERVALS:
+        error = {"error": f"Unknown interval '{interval}'. Use one of: {', '.join(COLUMNAR_INTERVALS)}"}
+        return wire.encode_json(error), 'application/json', 400
+    try:
+        with span('load_history'):
+            series = sync_yahoo_columnar(symbol.strip(), interval)
+    except Exception as e:
+        return wire.encode_json({"error": f"Error fetching data: {str(e)}"}), 'application/json', 500
+
+    if series is None or not len(series):
+        return wire.encode_json({"error": "No data found. Check ticker symbol."}), 'application/json', 404
+
+    try:
+        start_ms = to_epoch_ms(start, series.tz)
+        end_ms = to_epoch_ms(end, series.tz, end=True)
+    except ValueError as e:
+        return wire.encode_json({"error": f"Invalid start/end: {str(e)}"}), 'application/json', 400
+
+    try:
+        with span('encode'):
+            if fmt == 'columns':
+                body, media_type = wire.encode_json(series.to_columns(start_ms, end_ms)), wire.MEDIA_TYPES[fmt]
+            else:
+                body, media_type = wire.encode(series.to_frame(start_ms, end_ms), fmt)
+    except ValueError as e:
+        return wire.encode_json({"error": str(e)}), 'application/json', 400
+    return body, media_type, 200
+
+def live_bars_payload(symbol, interval='1m', since=0):
+    """
+    Live bars changed after version `since` (0 for all kept bars), with
+    incremental indicators: returns (body, media_type, status).
+    """
+    if live_feed is None:
+        return wire.encode_json({"error": "Live bars are off. Set LIVE_FEED=simulated or poll."}), 'application/json', 404
+    if interval not in LIVE_INTERVALS:
+        error = {"error": f"Unknown live interval '{interval}'. Use one of: {', '.join(LIVE_INTERVALS)}"}
+        return wire.encode_json(error), 'application/json', 400
+    symbol = symbol.strip().upper()
+    live_feed.subscribe(symbol)
+    with span('live_delta'):
+        payload = bar_engine.delta(symbol, interval, since)
+    if payload is None:
+        # Subscribed, no trades yet: an empty delta the client can poll from
+        payload = {"symbol": symbol, "interval": interval, "version": 0, "since": since,
+                   "index": [], "columns": {}, "indicators": {}, "quote": None}
+    return wire.encode_json(payload), 'application/json', 200
+
+def fetch_stock_payload(symbol, fmt='records', period='1mo', start=None, end=None, interval='1d', since=None):
+    """Stock data encoded in a wire format: returns (body, media_type, status)."""
+    if since is not None:
+        return live_bars_payload(symbol, interval, since)
+    if fmt not in wire.FORMATS:
+        error = {"error": f"Unknown format '{fmt}'. Use one of: {', '.join(wire.FORMATS)}"}
+        return wire.encode_json(error), 'application/json', 400
+    if start or end or interval != '1d':
+        return fetch_stock_range_payload(symbol, fmt, start, end, interval)
+    if period not in STOCK_PERIODS:
+        error = {"error": f"Unknown period '{period}'. Use one of: {', '.join(STOCK_PERIODS)}"}
+        return wire.encode_json(error), 'application/json', 400
+    try:
+        with span('load_history'):
+            data = load_stock_history(symbol.strip(), period)
+    except Exception as e:
+        return wire.encode_json({"error": f"Error fetching data: {str(e)}"}), 'application/json', 500
+
+    if data.empty:
+        return wire.encode_json({"error": "No data found. Check ticker symbol."}), 'application/json', 404
+
+    try:
+        with span('encode'):
+            body, media_type = wire.encode(data, fmt)
+    except ValueError as e:
+        return wire.encode_json({"error": str(e)}), 'application/json', 400
+    return body, media_type, 200
+
+# /stocks/stream: symbols are fetched concurrently and each result is sent
+# as soon as it is ready, as an NDJSON line or a server-sent event
+STREAM_WORKERS = int(os.getenv("STREAM_WORKERS", "16"))
+STREAM_MAX_SYMBOLS = int(os.getenv("STREAM_MAX_SYMBOLS", "500"))
+STREAM_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+
+def parse_symbols(symbols):
+    """Comma-separated symbols, upper-cased and deduplicated in order."""
+    return list(dict.fromkeys(s.strip().upper() for s in (symbols or '').split(',') if s.strip()))
+
+def stream_request_error(symbols, mode='ndjson', period='1mo', interval='1d'):
+    """Up-front validation for /stocks/stream: (error payload, status) or None."""
+    if not symbols:
+        return {"error": "At least one stock symbol is required"}, 400
+    if len(symbols) > STREAM_MAX_SYMBOLS:
+        return {"error": f"At most {STREAM_MAX_SYMBOLS} symbols per stream"}, 400
+    if mode not in STREAM_MEDIA_TYPES:
+        return {"error": f"Unknown mode '{mode}'. Use one of: {', '.join(STREAM_MEDIA_TYPES)}"}, 400
+    if period not in STOCK_PERIODS:
+        return {"error": f"Unknown period '{period}'. Use one of: {', '.join(STOCK_PERIODS)}"}, 400
+    if interval not in COLUMNAR_INTERVALS:
+        return {"error": f"Unknown interval '{interval}'. Use one of: {', '.join(COLUMNAR_INTERVALS)}"}, 400
+    return None
+
+def stream_record(symbol, body, status):
+    """
+    One symbol's result as JSON bytes: its /stock 'columns' payload is
+    embedded as is under "data", or its error message under "error".
+    """
+    head = b'{"symbol":' + wire.encode_json(symbol) + b',"status":' + str(status).encode()
+    if status == 200:
+        return head + b',"data":' + body + b'}'
+    return head + b',"error":' + wire.encode_json(json.loads(body).get("error")) + b'}'
+
+def stream_frame(record, mode='ndjson', event='stock'):
+    """Frame a JSON record as an NDJSON line or a server-sent event."""
+    if mode == 'sse':
+        return b'event: ' + event.encode() + b'\ndata: ' + record + b'\n\n'
+    return record + b'\n'
+
+def stream_summary(count, errors, started):
+    """Final record: symbol and error counts plus total seconds."""
+    return wire.encode_json({"done": True, "symbols": count, "errors": errors,
+                             "seconds": round(time.perf_counter() - started, 3)})
+
+def stream_stock_payloads(symbols, mode='ndjson', period='1mo', start=None, end=None, interval='1d'):
+    """
+    Generator of framed /stocks/stream records in completion order, then a
+    'done' summary. Symbols are fetched on a thread pool; a failing symbol
+    becomes an inline error record and does not end the stream.
+    """
+    started = time.perf_counter()
+    errors = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, min(STREAM_WORKERS, len(symbols))),
+                              thread_name_prefix='stock-stream')
+    try:
+        futures = {pool.submit(fetch_stock_payload, symbol, 'columns', period, start, end, interval): symbol
+                   for symbol in symbols}
+        for future in as_completed(futures):
+            try:
+                body, _, status = future.result()
+            except Exception as e:
+                body, status = wire.encode_json({"error": f"Error fetching data: {str(e)}"}), 500
+            errors += status != 200
+            yield stream_frame(stream_record(futures[future], body, status), mode)
+        yield stream_frame(stream_summary(len(symbols), errors, started), mode, event='done')
+    finally:
+        # Client gone mid-stream: drop the symbols not started yet
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def fetch_indicators_payload(symbols, names=None, period='1y'):
+    """Indicators for many symbols in one vectorized pass: returns (body, media_type, status)."""
+    symbols = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+    names = [n.strip().lower() for n in names.split(',') if n.strip()] if names else None
+    if not symbols:
+        return wire.encode_json({"error": "At least one stock symbol is required"}), 'application/json', 400
+
+    unknown = [n for n in names or [] if n not in indicators.INDICATORS]
+    if unknown:
+        error = {"error": f"Unknown indicator(s): {', '.join(unknown)}. Use: {', '.join(indicators.INDICATORS)}"}
+        return wire.encode_json(error), 'application/json', 400
+
+    # Watchlist symbols are usually prefetched: serve the stored copy
+    if period == INDICATOR_PERIOD:
+        results = load_indicators(symbols, names)
+        if results:
+            return wire.encode_json(indicators.to_columns(results)), 'application/json', 200
+
+    try:
+        prices = price_matrix(fetch_history(symbols, period=period))
+    except Exception as e:
+        return wire.encode_json({"error": f"Error fetching data: {str(e)}"}), 'application/json', 500
+
+    if prices.empty:
+        error = {"error": "No data found. Check ticker symbols.", "failed": prices.attrs.get('failed', {})}
+        return wire.encode_json(error), 'application/json', 404
+
+    with span('compute_indicators'):
+        results = indicators.compute_indicators(prices, names)
+    payload = indicators.to_columns(results)
+    payload['failed'] = prices.attrs.get('failed', {})
+    return wire.encode_json(payload), 'application/json', 200
+
+def portfolio_payload(symbols, weights=None, period='5y', benchmark=portfolio.BENCHMARK, optimize=None,
+                      matrix=False):
+    """
+    Risk analytics for a weighted basket from one batched download: returns
+    (body, media_type, status). Holdings with no data are listed under
+    'missing' and left out, which is refused (422) when they were given an
+    explicit weight; holdings dropped for short history ('dropped') have
+    the remaining weights renormalized to sum to one. A benchmark without
+    data is reported in 'benchmark_error' and beta is null.
+    """
+    symbols = parse_symbols(symbols)
+    if not symbols:
+        return wire.encode_json({"error": "At least one stock symbol is required"}), 'application/json', 400
+    if len(symbols) > portfolio.PORTFOLIO_MAX_SYMBOLS:
+        error = {"error": f"At most {portfolio.PORTFOLIO_MAX_SYMBOLS} symbols per request"}
+        return wire.encode_json(error), 'application/json', 400
+    if optimize and optimize not in portfolio.OPTIMIZERS:
+        error = {"error": f"Unknown optimizer '{optimize}'. Use one of: {', '.join(portfolio.OPTIMIZERS)}"}
+        return wire.encode_json(error), 'application/json', 400
+    if weights:
+        try:
+            values = [float(w) for w in weights.split(',')]
+        except ValueError:
+            return wire.encode_json({"error": "Weights must be numbers"}), 'application/json', 400
+        if len(values) != len(symbols):
+            error = {"error": "Give one weight per symbol (in the same order)"}
+            return wire.encode_json(error), 'application/json', 400
+        weights = dict(zip(symbols, values))
+    benchmark = (benchmark or '').strip().upper() or None
+
+    try:
+        prices = price_matrix(fetch_history(symbols + ([benchmark] if benchmark else []), period=period))
+    except Exception as e:
+        return wire.encode_json({"error": f"Error fetching data: {str(e)}"}), 'application/json', 500
+
+    # Download errors by symbol (timeouts included); symbols with no data at all are just missing
+    failed = prices.attrs.get('failed', {})
+    available = {s for s in prices if prices[s].notna().any()}
+    missing = [s for s in symbols if s not in available]
+    if missing and len(missing) == len(symbols):
+        return wire.encode_json({"error": "No data found. Check ticker symbols."}), 'application/json', 404
+    if missing and weights and any(weights[s] for s in missing):
+        error = {"error": f"No price data for weighted holding(s): {', '.join(missing)}", "missing": missing,
+                 "failed": failed}
+        return wire.encode_json(error), 'application/json', 422
+
+    # The benchmark is only a portfolio member when it was also requested as one
+    bench_prices = prices[benchmark] if benchmark in available else None
+    prices = prices[[s for s in symbols if s in available]]
+
+    try:
+        with span('portfolio_risk'):
+            result = portfolio.analyze(prices, weights, bench_prices, optimize or None)
+    except (ValueError, np.linalg.LinAlgError) as e:
+        return wire.encode_json({"error": str(e)}), 'application/json', 422
+    payload = portfolio.to_payload(result, include_matrix=matrix)
+    payload['missing'] = missing
+    payload['failed'] = failed
+    payload['benchmark'] = benchmark if bench_prices is not None else None
+    payload['benchmark_error'] = None
+    if benchmark and bench_prices is None:
+        payload['benchmark_error'] = f"No price data for benchmark '{benchmark}'"
+    return wire.encode_json(payload), 'application/json', 200
+
+# Fetch Alpha Vantage data
+def download_alpha_vantage_daily(symbol, outputsize='compact'):
+    """One daily page through the shared, rate-limited Alpha Vantage client."""
+    return alpha_vantage_client().daily(symbol, outputsize)
+
+def fetch_alpha_vantage_data(symbol):
+    """Daily series (newest first), fetching only bars newer than the stored ones."""
+    data = sync_alpha_vantage(symbol, download_alpha_vantage_daily)
+    return data.sort_index(ascending=False)
+
+# Fetch financial news
+def fetch_financial_news():
+    """Latest headlines from the background news cache."""
+    news_feed.start()
+    headlines, age = news_feed.latest()
+    return headlines
+
+def fetch_news_payload(limit=5):
+    news_feed.start()
+    headlines, age = news_feed.latest(limit)
+    return {'latest_news': headlines, 'age_seconds': age}
+
+# Fundamentals screener over the bulk-refreshed snapshot (python screener.py --refresh)
+def screen_payload(where=None, sort=None, limit=SCREEN_LIMIT, fields=None):
+    """Symbols matching compound filters, sorted; never calls upstream. Returns (payload, status)."""
+    try:
+        conditions = parse_conditions(where)
+        keys = parse_sort(sort)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    unknown = [f for f in fields or [] if f not in SCREEN_FIELDS]
+    if unknown:
+        return {"error": f"Unknown field(s): {', '.join(unknown)}. Use: {', '.join(SCREEN_FIELDS)}"}, 400
+
+    screener = get_screener(prefetched=prefetcher.symbols)
+    if screener is None:
+        return {"error": "No fundamentals snapshot yet. Run: python screener.py --refresh"}, 503
+    with span('screen'):
+        total, results = screener.screen(conditions, keys, max(1, min(limit, SCREEN_MAX_LIMIT)), fields)
+    return {'count': total, 'universe': len(screener), 'as_of': screener.as_of, 'results': results}, 200
+
+# Semantic search
+SEARCH_KINDS = ('headline', 'report')
+
+def search_payload(query, k=10, kind=None):
+    """Top-k headlines / report sections for a free-text query, or (error, status)."""
+    query = (query or '').strip()
+    if not query:
+        return {"error": "Query parameter 'q' is required"}, 400
+    if kind and kind not in SEARCH_KINDS:
+        return {"error": f"Unknown kind '{kind}'. Use one of: {', '.join(SEARCH_KINDS)}"}, 400
+    k = max(1, min(k, 100))
+    return {'query': query, 'results': get_search_index().search(query, k, kind or None)}, 200
+
+def index_report_payload(document):
+    """Index the sections of a generated Markdown report."""
+    if not isinstance(document, dict):
+        return {"error": "Body must be a JSON object with a 'report' field"}, 400
+    report = document.get('report')
+    if not isinstance(report, str) or not report.strip():
+        return {"error": "Field 'report' is required"}, 400
+    index = get_search_index()
+    added = index.add_report(report, source=document.get('source'))
+    return {'indexed_sections': added, 'documents': len(index)}, 200
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from indicators import compute_indicators
+
+# Points per plotted series; roughly one per horizontal pixel of a wide chart
+CHART_POINTS = 2000
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of the (x, y) series. The first and last points are
+    always kept; x must be increasing and y finite.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # threshold - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Twice the triangle area between the last kept point, each
+        # candidate in this bucket and the next bucket's centroid
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_frame(data, column="Close", threshold=CHART_POINTS):
+    """Rows of a time-indexed frame chosen by LTTB on one column, for plotting."""
+    data = data[data[column].notna()]
+    if len(data) <= threshold:
+        return data
+    x = pd.DatetimeIndex(data.index).asi8 if isinstance(data.index, pd.DatetimeIndex) else np.arange(len(data))
+    return data.iloc[lttb_indices(x, data[column].to_numpy(), threshold)]
+
+
+def chart_frame(data, overlays=(), column="Close", threshold=CHART_POINTS):
+    """
+    Price column plus indicator overlays (computed on the full series),
+    downsampled to at most `threshold` rows for plotting.
+    """
+    chart = data[[column]].copy()
+    if overlays:
+        for name, values in compute_indicators(data[column], list(overlays)).items():
+            chart[name] = values.iloc[:, 0]
+    return downsample_frame(chart, column, threshold)
@@ -1,22 +1,33 @@
+import logging
+
 import requests
-from load import ALPHA_VANTAGE_API_KEY
+
+from alpha_vantage_client import BACKGROUND, AlphaVantageError, download_daily
+from sync import sync_alpha_vantage
+
+logger = logging.getLogger(__name__)
+
+def download_daily_series(symbol, outputsize="compact"):
+    """Download one TIME_SERIES_DAILY page from Alpha Vantage as a DataFrame."""
+    # Batch refresh: dashboard and API calls on the shared client go first
+    return download_daily(symbol, outputsize, priority=BACKGROUND)
 
 def fetch_stock_data(symbol):
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}"
-    print(f"Fetching data from: {url}")  # Debugging
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if "Time Series (Daily)" in data:
-            return data["Time Series (Daily)"]
-        else:
-            print("Invalid API response:", data)  # Debugging
-            return None
-    else:
-        print("Failed to fetch stock data.")
+    """Daily series keyed by date (newest first), synced incrementally."""
+    try:
+        frame = sync_alpha_vantage(symbol, download_daily_series)
+    except (AlphaVantageError, requests.RequestException) as e:
+        logger.warning("Alpha Vantage fetch failed for %s: %s: %s", symbol, type(e).__name__, e)
         return None
 
+    series = {}
+    for date, row in frame.iloc[::-1].iterrows():
+        series[date.strftime("%Y-%m-%d")] = {
+            column: str(int(value)) if column.endswith("volume") else f"{value:.4f}"
+            for column, value in row.items()
+        }
+    return series
+
 if __name__ == "__main__":
     symbol = "AAPL"  # Test with Apple stock
     stock_data = fetch_stock_data(symbol)
@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Trading days covered by each forecast time frame
+HORIZONS = {"Quarterly": 63, "Annual": 252, "5-Year Outlook": 1260}
+TRADING_DAYS = 252
+
+# Sector ETFs used as the price history behind an industry forecast
+INDUSTRY_PROXIES = {
+    "Technology": "XLK",
+    "Healthcare": "XLV",
+    "Manufacturing": "XLI",
+    "Finance": "XLF",
+    "Retail": "XRT",
+}
+
+DEFAULT_PATHS = int(os.getenv("FORECAST_PATHS", "100000"))
+DEFAULT_SEED = int(os.getenv("FORECAST_SEED", "42"))
+PERCENTILES = (5, 25, 50, 75, 95)
+CONFIDENCE = 0.95
+# Upper bound on random draws held in memory per chunk (~16 MB of float64)
+CHUNK_ELEMENTS = 2_000_000
+# Annualized 95% CVaR thresholds (as fractions) for the Low/Moderate/High buckets
+RISK_THRESHOLDS = ((0.15, "Low"), (0.30, "Moderate"))
+
+
+def log_returns(prices):
+    """Daily log returns of a price series, NaNs dropped."""
+    prices = pd.Series(prices, dtype=np.float64).dropna()
+    return np.diff(np.log(prices.to_numpy()))
+
+
+def estimate_parameters(prices):
+    """Daily drift and volatility of log returns."""
+    returns = log_returns(prices)
+    if len(returns) < 2:
+        raise ValueError("At least three prices are needed to estimate drift and volatility")
+    return returns.mean(), returns.std(ddof=1)
+
+
+def _chunk_sizes(n_paths, steps, method):
+    per_chunk = CHUNK_ELEMENTS if method == "gbm" else max(1, CHUNK_ELEMENTS // steps)
+    sizes = [per_chunk] * (n_paths // per_chunk)
+    if n_paths % per_chunk:
+        sizes.append(n_paths % per_chunk)
+    return sizes
+
+
+def _simulate_chunk(method, n_paths, steps, mu, sigma, returns, seed):
+    """Terminal log returns for one chunk of paths."""
+    rng = np.random.default_rng(seed)
+    if method == "gbm":
+        # Sum of `steps` i.i.d. normal log returns, drawn in closed form
+        return rng.normal(mu * steps, sigma * np.sqrt(steps), n_paths)
+    # Bootstrap: resample historical daily log returns with replacement
+    picks = rng.integers(0, len(returns), size=(n_paths, steps), dtype=np.int32)
+    return returns[picks].sum(axis=1)
+
+
+def simulate(prices, horizon_days, n_paths=DEFAULT_PATHS, method="gbm", seed=DEFAULT_SEED, workers=None):
+    """
+    Simulate simple returns over `horizon_days` trading days.
+    method is 'gbm' (geometric Brownian motion with estimated drift and
+    volatility) or 'bootstrap' (resampled historical returns). Paths are
+    drawn in bounded chunks, each with its own child seed, so results are
+    identical with or without a process pool (`workers`).
+    """
+    if method not in ("gbm", "bootstrap"):
+        raise ValueError("method must be 'gbm' or 'bootstrap'")
+
+    returns = log_returns(prices)
+    mu, sigma = estimate_parameters(prices)
+    sizes = _chunk_sizes(n_paths, horizon_days, method)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(method, size, horizon_days, mu, sigma, returns, child) for size, child in zip(sizes, seeds)]
+
+    if workers and workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        chunks = [_simulate_chunk(*a) for a in args]
+    return np.expm1(np.concatenate(chunks))
+
+
+def value_at_risk(returns, confidence=CONFIDENCE):
+    """Historical VaR and CVaR (expected shortfall) as positive loss fractions."""
+    cutoff = np.quantile(returns, 1.0 - confidence)
+    tail = returns[returns <= cutoff]
+    return -cutoff, -tail.mean()
+
+
+def risk_level(cvar, horizon_days):
+    """Bucket a horizon CVaR into Low/Moderate/High after annualizing it."""
+    annual_cvar = cvar * np.sqrt(TRADING_DAYS / horizon_days)
+    for threshold, label in RISK_THRESHOLDS:
+        if annual_cvar < threshold:
+            return label
+    return "High"
+
+
+def summarize(returns, horizon_days, confidence=CONFIDENCE):
+    var, cvar = value_at_risk(returns, confidence)
+    bands = np.percentile(returns, PERCENTILES)
+    return {
+        "Expected Return (%)": round(float(returns.mean()) * 100, 2),
+        "Percentiles (%)": {f"P{p}": round(float(b) * 100, 2) for p, b in zip(PERCENTILES, bands)},
+        f"VaR {confidence:.0%} (%)": round(float(var) * 100, 2),
+        f"CVaR {confidence:.0%} (%)": round(float(cvar) * 100, 2),
+        "Risk Level": risk_level(cvar, horizon_days),
+    }
+
+
+def run_forecast(prices, n_paths=DEFAULT_PATHS, method="gbm", seed=DEFAULT_SEED, workers=None):
+    """Monte Carlo summary for every time frame in HORIZONS."""
+    mu, sigma = estimate_parameters(prices)
+    results = {
+        "Method": method,
+        "Paths": n_paths,
+        "Annual Drift (%)": round(float(mu) * TRADING_DAYS * 100, 2),
+        "Annual Volatility (%)": round(float(sigma * np.sqrt(TRADING_DAYS)) * 100, 2),
+        "Horizons": {},
+    }
+    for time_frame, days in HORIZONS.items():
+        returns = simulate(prices, days, n_paths=n_paths, method=method, seed=seed, workers=workers)
+        results["Horizons"][time_frame] = summarize(returns, days)
+    return results
+
+
+def industry_prices(industry, column="Close"):
+    """Daily closes of the sector ETF that stands in for an industry."""
+    from sync import sync_yahoo
+
+    proxy = INDUSTRY_PROXIES.get(industry)
+    if proxy is None:
+        raise ValueError(f"No proxy ticker for industry '{industry}'")
+    return sync_yahoo(proxy)[column]
+
+
+def horizon_summary(results, time_frame, source="N/A"):
+    """
+    Headline numbers for one time frame out of run_forecast() results;
+    `source` names the ticker whose history was simulated.
+    """
+    if time_frame not in HORIZONS:
+        raise ValueError(f"Unknown time frame '{time_frame}'. Use one of: {', '.join(HORIZONS)}")
+    summary = dict(results["Horizons"][time_frame])
+    summary["Proxy"] = source
+    for key in ("Method", "Paths", "Annual Drift (%)", "Annual Volatility (%)", "Horizons"):
+        summary[key] = results[key]
+    return summary
+
+
+def industry_forecast(industry, time_frame, prices=None, **kwargs):
+    """
+    Forecast summary behind generate_forecast: headline numbers for the
+    chosen time frame plus the bands for every horizon.
+    """
+    if time_frame not in HORIZONS:
+        raise ValueError(f"Unknown time frame '{time_frame}'. Use one of: {', '.join(HORIZONS)}")
+    if prices is None:
+        prices = industry_prices(industry)
+    return horizon_summary(run_forecast(prices, **kwargs), time_frame, INDUSTRY_PROXIES.get(industry, "N/A"))
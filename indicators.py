@@ -0,0 +1,222 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Every function here takes a time x ticker price block (one column per
+# ticker) and computes the indicator for all tickers in one vectorized
+# pass over the underlying 2-D array; there is no loop over symbols.
+
+TRADING_DAYS = 252
+# Rows per matrix product in the blocked EWM recurrence
+EWM_BLOCK = 16
+
+
+def _block(prices):
+    if isinstance(prices, pd.Series):
+        prices = prices.to_frame()
+    return prices.astype(np.float64, copy=False)
+
+
+def _frame(like, values):
+    return pd.DataFrame(values, index=like.index, columns=like.columns)
+
+
+def _rolling_moments(values, window, ddof=0, with_std=True):
+    """
+    Rolling mean and standard deviation of every column from cumulative sums.
+    A window containing NaN yields NaN, as with pandas min_periods=window.
+    """
+    n, k = values.shape
+    mean = np.full_like(values, np.nan)
+    std = np.full_like(values, np.nan) if with_std else None
+    if window > n:
+        return mean, std
+
+    gaps = np.flatnonzero(np.isnan(values).any(axis=0))
+    # Center each column first so the running sums don't lose precision
+    center = values[0].copy()
+    x = values - center
+    if len(gaps):
+        missing = np.isnan(values[:, gaps])
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            center[gaps] = np.nan_to_num(np.nanmean(values[:, gaps], axis=0))
+        x[:, gaps] = np.where(missing, 0.0, values[:, gaps] - center[gaps])
+
+    sums = np.zeros((n + 1, k))
+    np.cumsum(x, axis=0, out=sums[1:])
+    s1 = sums[window:] - sums[:-window]
+    m = s1 / window
+    mean[window - 1:] = m + center
+
+    if with_std:
+        np.multiply(x, x, out=x)
+        np.cumsum(x, axis=0, out=sums[1:])
+        s2 = sums[window:] - sums[:-window]
+        std[window - 1:] = np.sqrt(np.maximum((s2 - s1 * m) / (window - ddof), 0.0))
+
+    if len(gaps):
+        counts = np.zeros((n + 1, len(gaps)), dtype=np.int32)
+        np.cumsum(~missing, axis=0, out=counts[1:])
+        partial = np.ones_like(missing)
+        partial[window - 1:] = (counts[window:] - counts[:-window]) < window
+        for result in (mean, std) if with_std else (mean,):
+            sub = result[:, gaps]
+            sub[partial] = np.nan
+            result[:, gaps] = sub
+    return mean, std
+
+
+def _ewm(values, alpha, min_periods=0):
+    """
+    Exponential moving average (pandas adjust=False) of every column.
+    The recurrence is evaluated EWM_BLOCK rows at a time as a matrix
+    product, so the Python loop runs over row blocks, never over tickers.
+    Columns containing NaNs go through pandas itself (ignore_na=False):
+    a gap carries the last average and the weight of that average keeps
+    decaying across it, which the fixed-coefficient blocks cannot express.
+    """
+    n = len(values)
+    out = np.empty_like(values)
+    if n == 0:
+        return out
+
+    gaps = np.flatnonzero(np.isnan(values).any(axis=0))
+    if len(gaps):
+        out[:, gaps] = pd.DataFrame(values[:, gaps]).ewm(alpha=alpha, adjust=False,
+                                                           min_periods=min_periods).mean().to_numpy()
+        dense = np.setdiff1d(np.arange(values.shape[1]), gaps)
+        if len(dense):
+            out[:, dense] = _ewm(values[:, dense], alpha, min_periods)
+        return out
+
+    beta = 1.0 - alpha
+    b = min(EWM_BLOCK, n)
+    lags = np.subtract.outer(np.arange(b), np.arange(b))
+    decay = np.where(lags >= 0, alpha * beta ** np.clip(lags, 0, None), 0.0)
+    carry = beta ** np.arange(1, b + 1)
+
+    prev = values[0]  # seeds y[0] = x[0]
+    for start in range(0, n, b):
+        block = values[start:start + b]
+        m = len(block)
+        out[start:start + m] = decay[:m, :m] @ block + np.outer(carry[:m], prev)
+        prev = out[start + m - 1]
+
+    if min_periods > 1:
+        out[:min_periods - 1] = np.nan
+    return out
+
+
+def sma(prices, window=20):
+    """Simple moving average."""
+    prices = _block(prices)
+    mean, _ = _rolling_moments(prices.to_numpy(), window, with_std=False)
+    return _frame(prices, mean)
+
+
+def ema(prices, span=20):
+    """Exponential moving average."""
+    prices = _block(prices)
+    return _frame(prices, _ewm(prices.to_numpy(), 2.0 / (span + 1), min_periods=span))
+
+
+def rsi(prices, window=14):
+    """Relative Strength Index with Wilder smoothing."""
+    prices = _block(prices)
+    delta = np.diff(prices.to_numpy(), axis=0)
+    gain = _ewm(np.maximum(delta, 0.0), 1.0 / window, window)
+    loss = _ewm(np.maximum(-delta, 0.0), 1.0 / window, window)
+    values = np.full(prices.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values[1:] = 100.0 - 100.0 / (1.0 + gain / loss)
+    return _frame(prices, values)
+
+
+def macd(prices, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram."""
+    prices = _block(prices)
+    values = prices.to_numpy()
+    line = _ewm(values, 2.0 / (fast + 1)) - _ewm(values, 2.0 / (slow + 1))
+    signal_line = _ewm(line, 2.0 / (signal + 1))
+    return {
+        "macd": _frame(prices, line),
+        "macd_signal": _frame(prices, signal_line),
+        "macd_hist": _frame(prices, line - signal_line),
+    }
+
+
+def bollinger(prices, window=20, num_std=2.0):
+    """Bollinger bands around a simple moving average."""
+    prices = _block(prices)
+    mid, std = _rolling_moments(prices.to_numpy(), window)
+    return {
+        "bb_mid": _frame(prices, mid),
+        "bb_upper": _frame(prices, mid + num_std * std),
+        "bb_lower": _frame(prices, mid - num_std * std),
+    }
+
+
+def volatility(prices, window=20, annualize=True):
+    """Rolling standard deviation of log returns."""
+    prices = _block(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(prices.to_numpy()), axis=0)
+    vol = np.full(prices.shape, np.nan)
+    vol[1:] = _rolling_moments(returns, window, ddof=1)[1]
+    if annualize:
+        vol *= np.sqrt(TRADING_DAYS)
+    return _frame(prices, vol)
+
+
+def drawdown(prices):
+    """Fractional distance below the running peak."""
+    prices = _block(prices)
+    values = prices.to_numpy()
+    return _frame(prices, values / np.fmax.accumulate(values, axis=0) - 1.0)
+
+
+# Indicator name -> function returning {output name: time x ticker frame}
+INDICATORS = {
+    "sma": lambda p: {"sma": sma(p)},
+    "ema": lambda p: {"ema": ema(p)},
+    "rsi": lambda p: {"rsi": rsi(p)},
+    "macd": macd,
+    "bollinger": bollinger,
+    "volatility": lambda p: {"volatility": volatility(p)},
+    "drawdown": lambda p: {"drawdown": drawdown(p)},
+}
+
+
+def compute_indicators(prices, names=None):
+    """
+    Compute several indicators over a time x ticker price block.
+    Returns {output name: frame}, e.g. {"sma": ..., "bb_upper": ...}.
+    """
+    names = list(INDICATORS) if not names else names
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicator(s): {', '.join(unknown)}. Use: {', '.join(INDICATORS)}")
+
+    prices = _block(prices)
+    results = {}
+    for name in names:
+        results.update(INDICATORS[name](prices))
+    return results
+
+
+def to_columns(results):
+    """Column-array payload: shared epoch-ms index, then output -> ticker -> values."""
+    if not results:
+        return {"index": [], "indicators": {}}
+    index = pd.DatetimeIndex(next(iter(results.values())).index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return {
+        "index": index.as_unit("ms").asi8,
+        "indicators": {
+            output: {str(ticker): frame[ticker].to_numpy() for ticker in frame.columns}
+            for output, frame in results.items()
+        },
+    }
@@ -0,0 +1,197 @@
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus a few adds under a lock."""
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class GaugeCallback:
+    """Gauges read at scrape time from `fn()` -> {label values tuple: value}."""
+
+    def __init__(self, name, help, labelnames, fn):
+        self.name, self.help, self.labelnames, self.fn = name, help, tuple(labelnames), fn
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            values = self.fn()
+        except Exception:
+            return lines
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(values.items())]
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+UPSTREAM_LATENCY = registry.register(Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to upstream data sources.", ["upstream"]))
+UPSTREAM_ERRORS = registry.register(Counter(
+    "upstream_errors_total", "Failed calls to upstream data sources.", ["upstream"]))
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Handler latency per route.", ["route", "method"]))
+RESPONSES = registry.register(Counter(
+    "http_responses_total", "Responses per route and status code.", ["route", "status"]))
+RESPONSE_SIZE = registry.register(Histogram(
+    "http_response_size_bytes", "Response body size per route.", ["route"], SIZE_BUCKETS))
+SPAN_LATENCY = registry.register(Histogram(
+    "span_duration_seconds", "Time spent in named steps inside handlers.", ["span"]))
+
+# Spans of the current request, when tracing was asked for (None otherwise)
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class span:
+    """
+    Time a block (context manager) or function (decorator) as a named step.
+    Always feeds span_duration_seconds; with `upstream=` it feeds the
+    upstream latency/error metrics instead. Steps also join the current
+    request's trace when one is active.
+    """
+
+    __slots__ = ("name", "upstream", "_start")
+
+    def __init__(self, name, upstream=False):
+        self.name = name
+        self.upstream = upstream
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        if self.upstream:
+            UPSTREAM_LATENCY.observe(elapsed, self.name)
+            if exc_type is not None:
+                UPSTREAM_ERRORS.inc(self.name)
+        else:
+            SPAN_LATENCY.observe(elapsed, self.name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.append((self.name, elapsed))
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(self.name, self.upstream):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def upstream(name):
+    """span() for a call to an external data source (yfinance, alpha_vantage, news)."""
+    return span(name, upstream=True)
+
+
+def start_trace():
+    """Begin collecting spans for this request; returns a token for end_trace."""
+    return _trace.set([])
+
+
+def end_trace(token):
+    """Stop collecting and return the spans as a Server-Timing header value."""
+    trace = _trace.get() or []
+    _trace.reset(token)
+    return ", ".join(f"{name.replace(' ', '_')};dur={elapsed * 1000:.2f}" for name, elapsed in trace)
+
+
+def observe_request(route, method, status, seconds, size=None):
+    REQUEST_LATENCY.observe(seconds, route, method)
+    RESPONSES.inc(route, str(status))
+    if size is not None:
+        RESPONSE_SIZE.observe(size, route)
+
+
+def register_cache(name, stats):
+    """Expose a cache's stats() counters and hit ratio as gauges."""
+    registry.register(GaugeCallback(
+        f"{name}_cache", f"{name} cache counters (stats()).", ["stat"],
+        lambda: {(k,): v for k, v in stats().items() if isinstance(v, (int, float))},
+    ))
@@ -1,8 +1,136 @@
-import sys  
-import yfinance as yf  
+import logging
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-# Force UTF-8 encoding  
-sys.stdout.reconfigure(encoding='utf-8')  
+import pandas as pd
 
-# Now use emojis safely  
-print("\u2705 Historical Stock Data:")  
+from metrics import upstream
+
+logger = logging.getLogger(__name__)
+
+# Concurrency limits for multi-ticker fetches
+MAX_WORKERS = 8         # concurrent upstream requests
+REQUEST_TIMEOUT = 30    # seconds per upstream request
+RETRIES = 1             # extra attempts for a ticker that failed or timed out
+
+
+def _gather(calls, max_workers, timeout):
+    """
+    Run {key: (fn, args)} on a bounded pool; returns ({key: result}, {key: error}).
+    Each call gets `timeout` seconds from when a worker starts it, and calls
+    still queued when every wave could have finished are given up too. A call
+    that overruns is reported as TimeoutError and left to finish in the
+    background, so one hung request never blocks the caller.
+    """
+    started = {}
+
+    def run(key, fn, args):
+        started[key] = time.monotonic()
+        return fn(*args)
+
+    results, errors = {}, {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {pool.submit(run, key, fn, args): key for key, (fn, args) in calls.items()}
+        deadline = time.monotonic() + timeout * math.ceil(len(calls) / max_workers)
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    errors[futures[future]] = e
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                start = started.get(key)
+                if (start is not None and now - start > timeout) or (start is None and now > deadline):
+                    future.cancel()
+                    pending.discard(future)
+                    errors[key] = TimeoutError(f"no response within {timeout}s")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, errors
+
+
+@upstream("yfinance")
+def _download_single(symbol, period, interval, timeout):
+    import yfinance as yf
+
+    data = yf.Ticker(symbol).history(period=period, interval=interval, auto_adjust=False, timeout=timeout)
+    return pd.concat({symbol: data}, axis=1)
+
+
+def fetch_history(symbols, period="1mo", interval="1d", max_workers=MAX_WORKERS,
+                  timeout=REQUEST_TIMEOUT, retries=RETRIES):
+    """
+    Fetch price history for many tickers concurrently: one Yahoo request per
+    ticker on a bounded thread pool, each with its own `timeout`, and tickers
+    that fail or time out retried `retries` more times. Returns one DataFrame
+    aligned on date with (ticker, field) columns; tickers with no data are
+    left out, and those that failed are in `data.attrs["failed"]`
+    ({ticker: error message}).
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if not symbols:
+        return pd.DataFrame()
+
+    frames, errors = [], {}
+    pending = symbols
+    for _ in range(retries + 1):
+        calls = {symbol: (_download_single, (symbol, period, interval, timeout)) for symbol in pending}
+        results, errors = _gather(calls, max_workers, timeout)
+        frames.extend(results.values())
+        pending = list(errors)
+        if not pending:
+            break
+    failed = {symbol: f"{type(e).__name__}: {e}" for symbol, e in errors.items()}
+    for symbol, error in failed.items():
+        logger.warning("Failed to fetch %s: %s", symbol, error)
+
+    data = pd.concat(frames, axis=1).sort_index() if frames else pd.DataFrame()
+    if not data.empty:
+        data = data.dropna(axis=1, how="all")
+        present = [s for s in symbols if s in data.columns.get_level_values(0)]
+        data = data[present]
+    data.attrs["failed"] = failed
+    return data
+
+
+def price_matrix(data, field="Close"):
+    """Time x ticker block of a single field from fetch_history output."""
+    if data.empty:
+        matrix = pd.DataFrame()
+    else:
+        matrix = data.xs(field, axis=1, level=1)
+    matrix.attrs = dict(data.attrs)
+    return matrix
+
+
+@upstream("yfinance")
+def _fetch_info(symbol):
+    import yfinance as yf
+
+    return yf.Ticker(symbol).info
+
+
+def fetch_info(symbols, max_workers=MAX_WORKERS, timeout=REQUEST_TIMEOUT):
+    """
+    Fetch `Ticker.info` for many tickers concurrently; failures map to {}.
+    yfinance takes no timeout for `.info`, so each lookup is given up after
+    `timeout` seconds here instead.
+    """
+    results, errors = _gather({symbol: (_fetch_info, (symbol,)) for symbol in symbols}, max_workers, timeout)
+    return {symbol: results.get(symbol, {}) for symbol in symbols}
+
+
+if __name__ == "__main__":
+    # Force UTF-8 encoding
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    # Now use emojis safely
+    print("\u2705 Historical Stock Data:")
+    print(price_matrix(fetch_history(sys.argv[1:] or ["AAPL", "MSFT", "GOOGL"])))
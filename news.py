@@ -0,0 +1,187 @@
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from metrics import upstream
+
+logger = logging.getLogger(__name__)
+
+# bs4 is imported on first parse; lxml is only checked for here
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# News sources (comma-separated URLs) and refresh settings
+NEWS_SOURCES = [u.strip() for u in os.getenv("NEWS_SOURCES", "https://www.financialnews.com/latest").split(",") if u.strip()]
+REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "300"))  # seconds
+HISTORY_SIZE = int(os.getenv("NEWS_HISTORY_SIZE", "500"))
+REQUEST_TIMEOUT = 10
+# Longest a cold-start caller waits for the background thread's first refresh
+FIRST_REFRESH_TIMEOUT = 2 * REQUEST_TIMEOUT
+HEADLINE_TAGS = ("h2",)
+
+
+def parse_headlines(html, tags=HEADLINE_TAGS, limit=None):
+    """Extract headline text, building the tree only for the headline tags."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer(list(tags)))
+    headlines = [" ".join(item.get_text().split()) for item in soup.find_all(list(tags))]
+    headlines = [h for h in headlines if h]
+    return headlines[:limit] if limit else headlines
+
+
+class NewsSource:
+    """One polled page plus the validators needed for conditional GETs."""
+
+    def __init__(self, url, tags=HEADLINE_TAGS):
+        self.url = url
+        self.tags = tags
+        self.etag = None
+        self.last_modified = None
+        self.headlines = []
+        self.fetched_at = None   # last successful poll (200 or 304)
+        self.error = None
+        self.error_at = None     # when `error` was recorded
+
+    def poll(self, session):
+        """Fetch the page unless unchanged; returns True if headlines changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        try:
+            with upstream("news"):
+                response = session.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT)
+                if response.status_code != 304:
+                    response.raise_for_status()
+            if response.status_code == 304:
+                self.fetched_at, self.error = time.time(), None
+                return False
+            headlines = parse_headlines(response.text, self.tags)
+        except Exception as e:
+            # Network, HTTP or parser failure: recorded on this source only.
+            # The validators are kept as they were, so the page is parsed again next time.
+            self.error, self.error_at = f"{type(e).__name__}: {e}", time.time()
+            return False
+
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.headlines = headlines
+        self.fetched_at, self.error = time.time(), None
+        return True
+
+    def status(self):
+        return {
+            "url": self.url,
+            "headlines": len(self.headlines),
+            "age_seconds": round(time.time() - self.fetched_at, 1) if self.fetched_at else None,
+            "error": self.error,
+            "error_at": self.error_at,
+        }
+
+
+class NewsFeed:
+    """
+    Polls every source on a fixed interval from a background thread and
+    serves the latest headlines from memory, together with their age.
+    Also keeps a deduplicated rolling history of everything seen;
+    `on_new(entries)` is called with each refresh's unseen
+    (headline, source url) pairs.
+    """
+
+    def __init__(self, sources=NEWS_SOURCES, interval=REFRESH_INTERVAL, history_size=HISTORY_SIZE, session=None,
+                 on_new=None):
+        self.sources = [s if isinstance(s, NewsSource) else NewsSource(s) for s in sources]
+        self.interval = interval
+        self.history_size = history_size
+        self.session = session or requests.Session()
+        self.on_new = on_new
+        self._history = OrderedDict()  # normalized headline -> (headline, source url, first seen)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()  # set once the first refresh has finished
+        self._thread = None
+        self.refreshed_at = None
+
+    def refresh(self):
+        """Poll all sources once (concurrently) and merge new headlines."""
+        with ThreadPoolExecutor(max_workers=max(1, len(self.sources))) as pool:
+            list(pool.map(lambda source: source.poll(self.session), self.sources))
+
+        now = time.time()
+        new = []
+        with self._lock:
+            for source in self.sources:
+                for headline in source.headlines:
+                    key = " ".join(headline.lower().split())
+                    if key not in self._history:
+                        self._history[key] = (headline, source.url, now)
+                        new.append((headline, source.url))
+            while len(self._history) > self.history_size:
+                self._history.popitem(last=False)
+            self.refreshed_at = now
+        self._ready.set()
+
+        if new and self.on_new is not None:
+            self.on_new(new)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # e.g. an on_new callback failing; keep polling
+                logger.exception("News refresh failed")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the background refresher (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=REQUEST_TIMEOUT)
+
+    def latest(self, limit=5):
+        """Newest headlines across sources, plus their age in seconds."""
+        if self.refreshed_at is None:
+            if self._thread is not None and self._thread.is_alive():
+                # Cold start: the refresher is already polling, wait for it instead of polling twice
+                self._ready.wait(FIRST_REFRESH_TIMEOUT)
+            else:
+                self.refresh()
+        if self.refreshed_at is None:
+            return [], None
+        headlines = []
+        for source in self.sources:
+            headlines.extend(source.headlines)
+        headlines = list(dict.fromkeys(headlines))[:limit]
+        return headlines, round(time.time() - self.refreshed_at, 1)
+
+    def history(self, limit=50):
+        """Most recent unique headlines first."""
+        limit = max(1, limit)
+        with self._lock:
+            items = list(self._history.values())[-limit:][::-1]
+        return [{"headline": h, "source": url, "first_seen": seen} for h, url, seen in items]
+
+    def status(self):
+        return {
+            "refreshed_at": self.refreshed_at,
+            "interval_seconds": self.interval,
+            "history_size": len(self._history),
+            "sources": [source.status() for source in self.sources],
+        }
@@ -0,0 +1,189 @@
+import os
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from forecast import CONFIDENCE, TRADING_DAYS
+
+# Index the portfolio's beta is measured against
+BENCHMARK = os.getenv("PORTFOLIO_BENCHMARK", "SPY")
+PORTFOLIO_MAX_SYMBOLS = 500
+# Assets with less history than this fraction of the window are left out
+MIN_COVERAGE = 0.8
+# Weighting schemes accepted by analyze(optimize=...)
+OPTIMIZERS = ("min_variance", "risk_parity")
+# Newton iterations for risk parity (converges in ~10)
+RISK_PARITY_ITERATIONS = 50
+RISK_PARITY_TOLERANCE = 1e-10
+
+
+def aligned_returns(prices, min_coverage=MIN_COVERAGE):
+    """
+    Daily simple returns of a time x asset price block, on the dates every
+    kept asset traded. Returns (returns frame, dropped asset names).
+    """
+    prices = pd.DataFrame(prices, dtype=np.float64).sort_index()
+    coverage = prices.notna().mean()
+    dropped = list(coverage.index[coverage < min_coverage])
+    prices = prices.drop(columns=dropped)
+    returns = prices.pct_change(fill_method=None).iloc[1:]
+    return returns.dropna(), dropped
+
+
+def shrunk_covariance(returns):
+    """
+    Ledoit-Wolf covariance: the sample covariance shrunk towards a scaled
+    identity by the intensity that minimizes expected squared error.
+    Returns (covariance, shrinkage in [0, 1]).
+    """
+    x = returns - returns.mean(axis=0)
+    n, k = x.shape
+    sample = x.T @ x / n
+    mu = np.trace(sample) / k
+    target_distance = ((sample - mu * np.eye(k)) ** 2).sum()
+    # Variance of the sample covariance, from the per-row outer products
+    row_norms = (x * x).sum(axis=1)
+    spread = ((row_norms ** 2).sum() / n - (sample ** 2).sum()) / n
+    shrinkage = float(min(spread, target_distance) / target_distance) if target_distance > 0 else 1.0
+    return shrinkage * mu * np.eye(k) + (1.0 - shrinkage) * sample, shrinkage
+
+
+def correlation(covariance):
+    std = np.sqrt(np.diag(covariance))
+    return covariance / np.outer(std, std)
+
+
+def min_variance_weights(covariance):
+    """Fully invested minimum-variance weights (closed form; may go short)."""
+    ones = np.ones(len(covariance))
+    raw = np.linalg.solve(covariance, ones)
+    return raw / raw.sum()
+
+
+def risk_parity_weights(covariance, budget=None):
+    """
+    Long-only weights whose risk contributions match `budget` (equal by
+    default): Newton's method on the convex form min ½yᵀΣy − bᵀlog(y),
+    normalized to sum to one.
+    """
+    k = len(covariance)
+    budget = np.full(k, 1.0 / k) if budget is None else np.asarray(budget, dtype=np.float64)
+    y = 1.0 / np.sqrt(np.diag(covariance))
+    y *= np.sqrt(budget.sum() / (y @ covariance @ y))
+    for _ in range(RISK_PARITY_ITERATIONS):
+        gradient = covariance @ y - budget / y
+        if np.abs(gradient).max() < RISK_PARITY_TOLERANCE:
+            break
+        step = np.linalg.solve(covariance + np.diag(budget / y ** 2), gradient)
+        # Halve the step until y stays positive
+        scale = 1.0
+        while np.any(y - scale * step <= 0):
+            scale /= 2
+        y = y - scale * step
+    return y / y.sum()
+
+
+def risk_contributions(weights, covariance):
+    """Each asset's share of portfolio variance (sums to one)."""
+    marginal = covariance @ weights
+    return weights * marginal / (weights @ marginal)
+
+
+def value_at_risk(portfolio_returns, confidence=CONFIDENCE):
+    """One-day historical and parametric (normal) VaR plus historical CVaR, as positive losses."""
+    cutoff = np.quantile(portfolio_returns, 1.0 - confidence)
+    cvar = -portfolio_returns[portfolio_returns <= cutoff].mean()
+    z = NormalDist().inv_cdf(confidence)
+    parametric = z * portfolio_returns.std(ddof=1) - portfolio_returns.mean()
+    return float(-cutoff), float(cvar), float(parametric)
+
+
+def betas(returns, benchmark_returns):
+    """Beta of every column of `returns` (n x k) against one benchmark series."""
+    b = benchmark_returns - benchmark_returns.mean()
+    x = returns - returns.mean(axis=0)
+    return (x.T @ b) / (b @ b)
+
+
+def _percent(value):
+    return None if value is None or value != value else round(float(value) * 100, 3)
+
+
+def analyze(prices, weights=None, benchmark=None, optimize=None, confidence=CONFIDENCE):
+    """
+    Risk summary for a portfolio from its time x asset price block.
+
+    weights   - {asset: weight}, default equal weight; renormalized over the
+                assets kept, so weight on dropped (short-history) assets is
+                spread pro rata over the rest
+    benchmark - price series for beta (optional)
+    optimize  - also report 'min_variance' or 'risk_parity' weights
+    """
+    if optimize is not None and optimize not in OPTIMIZERS:
+        raise ValueError(f"Unknown optimizer '{optimize}'. Use one of: {', '.join(OPTIMIZERS)}")
+    frame, dropped = aligned_returns(prices)
+    if benchmark is not None:
+        bench = pd.Series(benchmark, dtype=np.float64).pct_change(fill_method=None)
+        frame = frame.join(bench.rename("__benchmark__"), how="inner").dropna()
+        bench_returns = frame.pop("__benchmark__").to_numpy()
+    if frame.shape[1] == 0 or len(frame) < 2:
+        raise ValueError("Not enough overlapping price history")
+
+    assets = [str(c) for c in frame.columns]
+    returns = frame.to_numpy()
+    covariance, shrinkage = shrunk_covariance(returns)
+
+    if weights:
+        w = np.array([float(weights.get(a, 0.0)) for a in assets])
+        if not w.sum():
+            raise ValueError("Weights must not sum to zero")
+    else:
+        w = np.ones(len(assets))
+    w = w / w.sum()
+
+    portfolio_returns = returns @ w
+    var, cvar, parametric = value_at_risk(portfolio_returns, confidence)
+    volatility = np.sqrt(w @ covariance @ w * TRADING_DAYS)
+    asset_betas = betas(returns, bench_returns) if benchmark is not None else None
+
+    result = {
+        "assets": assets,
+        "dropped": dropped,
+        "observations": len(frame),
+        "start": str(frame.index[0].date()) if hasattr(frame.index[0], "date") else str(frame.index[0]),
+        "end": str(frame.index[-1].date()) if hasattr(frame.index[-1], "date") else str(frame.index[-1]),
+        "shrinkage": round(shrinkage, 4),
+        "portfolio": {
+            "Expected Return (%)": _percent(portfolio_returns.mean() * TRADING_DAYS),
+            "Volatility (%)": _percent(volatility),
+            f"Historical VaR {confidence:.0%} 1d (%)": _percent(var),
+            f"Historical CVaR {confidence:.0%} 1d (%)": _percent(cvar),
+            f"Parametric VaR {confidence:.0%} 1d (%)": _percent(parametric),
+            "Beta": round(float(asset_betas @ w), 3) if asset_betas is not None else None,
+        },
+        "weights": {"current": w},
+        "risk_contributions": {"current": risk_contributions(w, covariance)},
+        "volatility": np.sqrt(np.diag(covariance) * TRADING_DAYS),
+        "beta": asset_betas,
+        "covariance": covariance,
+    }
+    if optimize is not None:
+        optimal = min_variance_weights(covariance) if optimize == "min_variance" else risk_parity_weights(covariance)
+        result["weights"][optimize] = optimal
+        result["risk_contributions"][optimize] = risk_contributions(optimal, covariance)
+        result["portfolio"][f"{optimize.replace('_', ' ').title()} Volatility (%)"] = _percent(np.sqrt(optimal @ covariance @ optimal * TRADING_DAYS))
+    return result
+
+
+def to_payload(result, include_matrix=False):
+    """JSON-ready form of analyze(): per-asset arrays, correlation only on request."""
+    payload = {key: result[key] for key in ("assets", "dropped", "observations", "start", "end", "shrinkage",
+                                             "portfolio")}
+    payload["weights"] = {name: np.round(w, 6) for name, w in result["weights"].items()}
+    payload["risk_contributions"] = {name: np.round(rc, 6) for name, rc in result["risk_contributions"].items()}
+    payload["volatility"] = np.round(result["volatility"], 6)
+    payload["beta"] = np.round(result["beta"], 4) if result["beta"] is not None else None
+    if include_matrix:
+        payload["correlation"] = np.round(correlation(result["covariance"]), 4)
+    return payload
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cache import CACHE_DIR, DiskStore
+from indicators import INDICATORS, compute_indicators
+from multi_stock import fetch_info
+from sync import SYNC_MIN_INTERVAL, sync_yahoo
+
+# Watchlists: a JSON file {"name": ["AAPL", ...]} and/or a comma-separated env list
+WATCHLISTS_FILE = os.getenv("WATCHLISTS_FILE", "watchlists.json")
+WATCHLIST = os.getenv("WATCHLIST", "")
+# Refresh a little more often than the sync window so API reads never go upstream
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", str(SYNC_MIN_INTERVAL * 0.8)))  # seconds
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+# "process" (local worker pool) or "celery" (filesystem broker, no Redis needed)
+PREFETCH_BACKEND = os.getenv("PREFETCH_BACKEND", "process")
+# Window the stored indicators are computed over (the /indicators default)
+INDICATOR_PERIOD = "1y"
+
+# Same store HistoryCache reads for the default one-month /stock view
+month_store = DiskStore(CACHE_DIR)
+fundamentals_store = DiskStore(os.path.join(CACHE_DIR, "fundamentals"))
+indicators_store = DiskStore(os.path.join(CACHE_DIR, "indicators"))
+
+
+def load_watchlists(path=WATCHLISTS_FILE, env=WATCHLIST):
+    """Configured watchlists as {name: [symbols]}."""
+    watchlists = {}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            watchlists.update(json.load(f))
+    symbols = [s.strip() for s in env.split(",") if s.strip()]
+    if symbols:
+        watchlists.setdefault("default", []).extend(symbols)
+    return {name: [s.strip().upper() for s in symbols] for name, symbols in watchlists.items()}
+
+
+def watchlist_symbols(watchlists=None):
+    """Unique symbols across all watchlists, in first-seen order."""
+    watchlists = load_watchlists() if watchlists is None else watchlists
+    return list(dict.fromkeys(s for symbols in watchlists.values() for s in symbols))
+
+
+def _scalar_fields(info):
+    return {k: v for k, v in info.items() if isinstance(v, (bool, int, float, str))}
+
+
+def refresh_symbol(symbol):
+    """
+    Worker task: sync prices, recompute indicators and fetch fundamentals
+    for one symbol, writing each to its store. Returns a status dict.
+    """
+    symbol = symbol.strip().upper()
+    started = time.time()
+    errors = {}
+
+    try:
+        history = sync_yahoo(symbol, min_interval=0)
+        if history.empty:
+            raise ValueError("No price history")
+        last = history.index.max()
+        month_store.save(symbol, history[history.index >= last - pd.DateOffset(months=1)])
+
+        closes = history.loc[history.index >= last - pd.DateOffset(years=1), ["Close"]]
+        closes.columns = [symbol]
+        columns = {}
+        for name in INDICATORS:
+            for output, frame in compute_indicators(closes, [name]).items():
+                columns[f"{name}:{output}"] = frame[symbol]
+        indicators_store.save(symbol, pd.DataFrame(columns))
+    except Exception as e:
+        errors["prices"] = str(e)
+
+    info = _scalar_fields(fetch_info([symbol]).get(symbol) or {})
+    if info:
+        fundamentals_store.save(symbol, pd.DataFrame([info], index=[symbol]))
+    else:
+        errors["fundamentals"] = "No fundamentals returned"
+
+    return {"symbol": symbol, "errors": errors, "seconds": round(time.time() - started, 2)}
+
+
+def load_indicators(symbols, names=None, max_age=PREFETCH_INTERVAL * 2):
+    """
+    Prefetched indicators as {output: frame (dates x symbols)}, or None
+    unless every symbol has a stored copy younger than `max_age`.
+    """
+    frames = {}
+    for symbol in symbols:
+        age = indicators_store.age(symbol)
+        data = indicators_store.load(symbol) if age is not None and age < max_age else None
+        if data is None:
+            return None
+        frames[symbol] = data
+
+    results = {}
+    for column in next(iter(frames.values())).columns:
+        name, output = column.split(":", 1)
+        if not names or name in names:
+            results[output] = pd.concat({symbol: data[column] for symbol, data in frames.items()}, axis=1)
+    return results
+
+
+def load_fundamentals(symbols):
+    """Stored fundamentals, one row per symbol (missing symbols skipped)."""
+    rows = [fundamentals_store.load(s.strip().upper()) for s in symbols]
+    rows = [row for row in rows if row is not None]
+    return pd.concat(rows) if rows else pd.DataFrame()
+
+
+def make_celery_app(root=os.path.join(CACHE_DIR, "celery")):
+    """Celery app on a filesystem broker and result backend (single machine, no Redis)."""
+    from celery import Celery
+
+    queue_dir = os.path.join(root, "queue")
+    processed_dir = os.path.join(root, "processed")
+    control_dir = os.path.join(root, "control")
+    results_dir = os.path.join(root, "results")
+    for path in (queue_dir, processed_dir, control_dir, results_dir):
+        os.makedirs(path, exist_ok=True)
+
+    app = Celery("prefetch", broker="filesystem://", backend=f"file://{os.path.abspath(results_dir)}")
+    app.conf.broker_transport_options = {
+        "data_folder_in": queue_dir,
+        "data_folder_out": queue_dir,
+        "processed_folder": processed_dir,
+        "control_folder": control_dir,
+    }
+    app.conf.result_expires = 3600
+    app.task(name="prefetch.refresh_symbol")(refresh_symbol)
+    return app
+
+
+# Workers: PREFETCH_BACKEND=celery celery -A prefetch:celery_app worker
+celery_app = make_celery_app() if PREFETCH_BACKEND == "celery" else None
+
+
+def _celery():
+    global celery_app
+    if celery_app is None:
+        celery_app = make_celery_app()
+    return celery_app
+
+
+class Prefetcher:
+    """
+    Keeps watchlist symbols warm: a background thread queues a refresh for
+    every symbol whose stored data is older than `interval`, on a local
+    process pool or on Celery workers.
+    """
+
+    def __init__(self, symbols, interval=PREFETCH_INTERVAL, backend=PREFETCH_BACKEND, workers=PREFETCH_WORKERS):
+        if backend not in ("process", "celery"):
+            raise ValueError("backend must be 'process' or 'celery'")
+        self.symbols = [s.strip().upper() for s in symbols]
+        self.interval = interval
+        self.backend = backend
+        self.workers = workers
+        self._pool = None
+        self._pending = {}    # symbol -> Future / AsyncResult
+        self._last = {}       # symbol -> last completed status
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _submit(self, symbol):
+        if self.backend == "celery":
+            return _celery().tasks["prefetch.refresh_symbol"].delay(symbol)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(refresh_symbol, symbol)
+
+    def _collect(self):
+        for symbol, handle in list(self._pending.items()):
+            done = handle.ready() if self.backend == "celery" else handle.done()
+            if not done:
+                continue
+            del self._pending[symbol]
+            try:
+                status = handle.get() if self.backend == "celery" else handle.result()
+            except Exception as e:
+                status = {"symbol": symbol, "errors": {"task": str(e)}}
+            status["finished_at"] = time.time()
+            self._last[symbol] = status
+
+    def age(self, symbol):
+        """Seconds since the symbol's prices were last refreshed (None if never)."""
+        return month_store.age(symbol)
+
+    def tick(self):
+        """Collect finished refreshes and queue every stale symbol not already queued."""
+        with self._lock:
+            self._collect()
+            for symbol in self.symbols:
+                age = self.age(symbol)
+                if symbol not in self._pending and (age is None or age >= self.interval):
+                    self._pending[symbol] = self._submit(symbol)
+            return len(self._pending)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Prefetch tick failed: {e}")
+            self._stop.wait(min(self.interval / 4, 30))
+
+    def start(self):
+        """Start the scheduler thread (no-op if already running or nothing to watch)."""
+        with self._lock:
+            if not self.symbols or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="prefetch-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def queue_depth(self):
+        with self._lock:
+            self._collect()
+            return len(self._pending)
+
+    def status(self):
+        """Queue depth plus per-symbol staleness of each store."""
+        depth = self.queue_depth()
+        symbols = {}
+        for symbol in self.symbols:
+            ages = {
+                "prices": month_store.age(symbol),
+                "indicators": indicators_store.age(symbol),
+                "fundamentals": fundamentals_store.age(symbol),
+            }
+            last = self._last.get(symbol, {})
+            symbols[symbol] = {
+                **{f"{k}_age_seconds": round(v, 1) if v is not None else None for k, v in ages.items()},
+                "stale": ages["prices"] is None or ages["prices"] >= self.interval,
+                "queued": symbol in self._pending,
+                "errors": last.get("errors", {}),
+            }
+        return {"backend": self.backend, "interval_seconds": self.interval, "queue_depth": depth, "symbols": symbols}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prefetch watchlist prices, indicators and fundamentals.")
+    parser.add_argument("symbols", nargs="*", help="Symbols (default: configured watchlists)")
+    parser.add_argument("--once", action="store_true", help="Refresh every symbol once and exit")
+    parser.add_argument("--backend", choices=["process", "celery"], default=PREFETCH_BACKEND)
+    parser.add_argument("--workers", type=int, default=PREFETCH_WORKERS)
+    parser.add_argument("--interval", type=float, default=PREFETCH_INTERVAL)
+    args = parser.parse_args(argv)
+
+    prefetcher = Prefetcher(args.symbols or watchlist_symbols(), args.interval, args.backend, args.workers)
+    if not prefetcher.symbols:
+        parser.error("No symbols given and no watchlists configured")
+    try:
+        if args.once:
+            prefetcher.interval = 0
+            prefetcher.tick()
+            while prefetcher.queue_depth():
+                time.sleep(0.5)
+            print(json.dumps(prefetcher.status(), indent=2))
+            return
+        prefetcher.start()
+        while True:
+            time.sleep(prefetcher.interval)
+            print(json.dumps({s: v["prices_age_seconds"] for s, v in prefetcher.status()["symbols"].items()}))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        prefetcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+import argparse
+import html
+import itertools
+import os
+import re
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+from forecast import INDUSTRY_PROXIES, horizon_summary, industry_forecast, industry_prices, run_forecast
+
+INDUSTRIES = ["Technology", "Healthcare", "Manufacturing", "Finance", "Retail"]
+METRICS = ["Revenue Growth", "Profit Margins", "Cash Flow", "Market Cap", "P/E Ratio"]
+DEFAULT_METRICS = ["Revenue Growth", "Profit Margins"]
+INVESTMENT_GOALS = ["Short-term Gains", "Long-term Stability", "Risk Management"]
+TIME_FRAMES = ["Quarterly", "Annual", "5-Year Outlook"]
+
+#########################
+# FORECAST INPUTS       #
+#########################
+
+def analyze_industry(industry):
+    """
+    Returns industry-specific insights.
+    """
+    industry_insights = {
+        "Technology": "High innovation, rapid change, and potential volatility characterize the tech sector.",
+        "Healthcare": "Steady growth, regulatory oversight, and high demand for services define the healthcare industry.",
+        "Manufacturing": "Capital-intensive with cyclical demand, manufacturing trends are influenced by global supply chains.",
+        "Finance": "Highly sensitive to interest rates and economic cycles, the finance sector is dynamic and regulated.",
+        "Retail": "Driven by consumer spending and market trends, the retail sector faces both growth opportunities and challenges."
+    }
+    return industry_insights.get(industry, "No insights available.")
+
+
+def analyze_metrics(metrics):
+    """
+    Provides a summary analysis for each selected financial metric.
+    """
+    metric_summaries = {
+        "Revenue Growth": "Measures how quickly a company's sales are growing.",
+        "Profit Margins": "Indicates profitability relative to revenue.",
+        "Cash Flow": "Reflects liquidity and the company's ability to fund operations.",
+        "Market Cap": "Represents the company's overall market value.",
+        "P/E Ratio": "Evaluates the company's share price relative to its earnings."
+    }
+    results = {}
+    for m in metrics:
+        results[m] = metric_summaries.get(m, "No data available.")
+    return results
+
+
+def generate_forecast(industry, metrics, market_condition, investment_goal, time_frame, prices=None, simulation=None):
+    """
+    Generates a detailed forecast report using the provided inputs.
+    Growth rate and risk level come from a Monte Carlo simulation over the
+    industry's price history (see forecast.industry_forecast); batch callers
+    pass a precomputed `simulation` summary instead.
+    """
+    if simulation is None:
+        try:
+            simulation = industry_forecast(industry, time_frame, prices=prices)
+        except Exception as e:
+            simulation = {"Error": f"Forecast unavailable: {str(e)}"}
+
+    forecast_data = {
+        "Industry": industry,
+        "Analyzed Metrics": metrics,
+        "Market Condition": market_condition,
+        "Investment Goal": investment_goal,
+        "Time Frame": time_frame,
+        "Forecast Growth Rate (%)": simulation.get("Expected Return (%)", "N/A"),
+        "Risk Level": simulation.get("Risk Level", "N/A"),
+        "Forecast Range (%)": simulation.get("Percentiles (%)", "N/A"),
+        "VaR 95% (%)": simulation.get("VaR 95% (%)", "N/A"),
+        "CVaR 95% (%)": simulation.get("CVaR 95% (%)", "N/A"),
+        "Market Trend Analysis": f"In the {industry} sector, current trends show moderate growth driven by key factors including innovation and regulatory shifts.",
+        "Company Financial Projection": f"Based on selected metrics, the company's financials project stable revenue growth with improving profit margins over the {time_frame.lower()} period.",
+        "Investment Strategy Recommendations": f"To achieve {investment_goal.lower()}, a diversified approach is recommended that leverages sector-specific strengths in {industry}.",
+        "Model Critique": "The report provides coherent insights with clear financial terminology. However, integration with real-time data and further prompt refinement would enhance actionable recommendations."
+    }
+    return forecast_data
+
+#########################
+# TEMPLATES             #
+#########################
+
+# Compiled once at import; rendering is a single substitute() call
+TEMPLATES = {
+    "detailed": Template("""
+# AI-Generated Financial Forecasting and Analysis Report
+
+**Industry Focus:** $industry  
+**Investment Goal:** $investment_goal  
+**Time Frame:** $time_frame  
+
+---
+
+## Selected Metrics Analysis:
+$metrics
+
+
+---
+
+## Forecast Results:
+- **Forecast Growth Rate (%):** $growth_rate%  
+- **Risk Level:** $risk_level  
+- **95% VaR / CVaR (%):** $var / $cvar  
+- **Market Condition:** $market_condition  
+
+### Detailed Analysis:
+- **Market Trend Analysis:**  
+  $market_trend
+
+- **Company Financial Projection:**  
+  $financial_projection
+
+- **Investment Strategy Recommendations:**  
+  $strategy
+
+---
+
+## Model Critique:
+$critique
+
+---
+"""),
+    "summary": Template("""
+# Financial Analysis Report
+
+**Industry:** $industry  
+**Investment Goal:** $investment_goal  
+**Time Frame:** $time_frame  
+
+---
+
+## Selected Metrics Analysis:
+$metrics
+
+
+## Forecast Results:
+- **Forecast Growth Rate (%):** $growth_rate%  
+- **Risk Level:** $risk_level  
+- **95% VaR / CVaR (%):** $var / $cvar  
+- **Market Condition:** $market_condition
+
+---
+"""),
+}
+
+
+def render_report(forecast_result, metric_analysis, template="detailed"):
+    """Render a Markdown report from generate_forecast() output."""
+    fields = {
+        "industry": forecast_result.get("Industry", "N/A"),
+        "investment_goal": forecast_result.get("Investment Goal", "N/A"),
+        "time_frame": forecast_result.get("Time Frame", "N/A"),
+        "metrics": "\n".join(f"- **{metric}:** {description}" for metric, description in metric_analysis.items()),
+        "growth_rate": forecast_result.get("Forecast Growth Rate (%)", "N/A"),
+        "risk_level": forecast_result.get("Risk Level", "N/A"),
+        "var": forecast_result.get("VaR 95% (%)", "N/A"),
+        "cvar": forecast_result.get("CVaR 95% (%)", "N/A"),
+        "market_condition": forecast_result.get("Market Condition", "N/A"),
+        "market_trend": forecast_result.get("Market Trend Analysis", "N/A"),
+        "financial_projection": forecast_result.get("Company Financial Projection", "N/A"),
+        "strategy": forecast_result.get("Investment Strategy Recommendations", "N/A"),
+        "critique": forecast_result.get("Model Critique", "N/A"),
+    }
+    return TEMPLATES[template].substitute(fields)
+
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def markdown_to_html(markdown, title="Financial Analysis Report"):
+    """Convert the small Markdown subset used by the report templates to HTML."""
+    body = []
+    in_list = False
+    for line in markdown.splitlines():
+        text = _BOLD.sub(r"<strong>\1</strong>", html.escape(line.strip()))
+        if line.startswith("- "):
+            if not in_list:
+                body.append("<ul>")
+                in_list = True
+            body.append(f"<li>{text[2:]}")
+            continue
+        if in_list and (not line.startswith("  ") or not text):
+            body.append("</ul>")
+            in_list = False
+        if not text:
+            continue
+        if line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            body.append(f"<h{level}>{text.lstrip('#').strip()}</h{level}>")
+        elif line.strip() == "---":
+            body.append("<hr>")
+        else:
+            body.append(f"<p>{text}</p>" if not in_list else f"<br>{text}")
+    if in_list:
+        body.append("</ul>")
+    return f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n<body>\n" + "\n".join(body) + "\n</body></html>\n"
+
+#########################
+# BATCH GENERATION      #
+#########################
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9]+", "-", value).strip("-").lower()
+
+
+def synthetic_prices(key, days=2520):
+    """Deterministic random-walk closes, for offline runs and benchmarks."""
+    rng = np.random.default_rng(zlib.crc32(key.encode()))
+    returns = rng.normal(0.0003, 0.015, days)
+    return pd.Series(100 * np.exp(np.cumsum(returns)), index=pd.bdate_range(end="2024-12-31", periods=days))
+
+
+def load_prices(key):
+    """Closes for a ticker, or for an industry's proxy ETF if `key` is an industry."""
+    if key in INDUSTRY_PROXIES:
+        return industry_prices(key)
+    from sync import sync_yahoo
+
+    return sync_yahoo(key)["Close"]
+
+
+def _render_batch(key, industries, goals, time_frames, metrics, market_condition, fmt, synthetic, n_paths, seed):
+    """
+    Worker task: simulate one price history once, then render every
+    industry x goal x time frame report that uses it.
+    """
+    try:
+        prices = synthetic_prices(key) if synthetic else load_prices(key)
+        results = run_forecast(prices, n_paths=n_paths, seed=seed)
+        source = INDUSTRY_PROXIES.get(key, key)
+    except Exception as e:
+        results, error = None, {"Error": f"Forecast unavailable: {str(e)}"}
+
+    metric_analysis = analyze_metrics(metrics)
+    reports = []
+    for industry, goal, time_frame in itertools.product(industries, goals, time_frames):
+        simulation = horizon_summary(results, time_frame, source) if results is not None else error
+        forecast_result = generate_forecast(industry, metrics, market_condition, goal, time_frame, simulation=simulation)
+        report = render_report(forecast_result, metric_analysis)
+        parts = (industry, goal, time_frame) if key == industry else (key, industry, goal, time_frame)
+        name = "_".join(_slug(part) for part in parts)
+        if fmt == "html":
+            reports.append((f"{name}.html", markdown_to_html(report)))
+        else:
+            reports.append((f"{name}.md", report))
+    return reports
+
+
+def generate_reports(symbols=None, industries=INDUSTRIES, goals=INVESTMENT_GOALS, time_frames=TIME_FRAMES,
+                     metrics=DEFAULT_METRICS, market_condition="", fmt="markdown", workers=None,
+                     synthetic=False, n_paths=20000, seed=42):
+    """
+    Yield (file name, content) for every symbol x industry x goal x time
+    frame report, streaming each batch as soon as a worker finishes it.
+    Without symbols, each industry is forecast from its own proxy ETF.
+    """
+    if symbols:
+        tasks = [(symbol, industries) for symbol in symbols]
+    else:
+        tasks = [(industry, [industry]) for industry in industries]
+    args = [(key, task_industries, goals, time_frames, metrics, market_condition, fmt, synthetic, n_paths, seed)
+            for key, task_industries in tasks]
+
+    if workers == 1:
+        for a in args:
+            yield from _render_batch(*a)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_batch, *a) for a in args]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def write_reports(reports, out):
+    """Stream reports into a directory, or into a zip archive if `out` ends in .zip."""
+    count = 0
+    if out.endswith(".zip"):
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in reports:
+                archive.writestr(name, content)
+                count += 1
+    else:
+        os.makedirs(out, exist_ok=True)
+        for name, content in reports:
+            with open(os.path.join(out, name), "w", encoding="utf-8") as f:
+                f.write(content)
+            count += 1
+    return count
+
+
+def _indexed(reports, index):
+    """Pass reports through, adding each one's sections to `index`."""
+    for name, content in reports:
+        index.add_report(content, source=name)
+        yield name, content
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate forecasting reports in bulk.")
+    parser.add_argument("--symbols", nargs="*", help="Tickers to forecast (default: each industry's proxy ETF)")
+    parser.add_argument("--industries", nargs="*", default=INDUSTRIES)
+    parser.add_argument("--goals", nargs="*", default=INVESTMENT_GOALS)
+    parser.add_argument("--time-frames", nargs="*", default=TIME_FRAMES)
+    parser.add_argument("--metrics", nargs="*", default=DEFAULT_METRICS)
+    parser.add_argument("--market-condition", default="")
+    parser.add_argument("--format", choices=["markdown", "html"], default="markdown")
+    parser.add_argument("--out", default="report_output", help="Output directory, or a .zip path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--paths", type=int, default=20000, help="Monte Carlo paths per forecast")
+    parser.add_argument("--synthetic", action="store_true", help="Use synthetic prices instead of fetching history")
+    parser.add_argument("--benchmark", action="store_true", help="Discard output and report reports/second")
+    parser.add_argument("--index", metavar="DIR", help="Also add report sections to the semantic search index in DIR")
+    args = parser.parse_args(argv)
+    if args.index and args.format != "markdown":
+        parser.error("--index requires --format markdown")
+
+    reports = generate_reports(
+        symbols=args.symbols, industries=args.industries, goals=args.goals, time_frames=args.time_frames,
+        metrics=args.metrics, market_condition=args.market_condition, fmt=args.format,
+        workers=args.workers, synthetic=args.synthetic, n_paths=args.paths,
+    )
+
+    if args.index:
+        from search_index import SemanticIndex
+
+        index = SemanticIndex(args.index)
+        reports = _indexed(reports, index)
+
+    start = time.perf_counter()
+    if args.benchmark:
+        count = sum(1 for _ in reports)
+    else:
+        count = write_reports(reports, args.out)
+    elapsed = time.perf_counter() - start
+    print(f"{count} reports in {elapsed:.2f}s ({count / elapsed:.1f} reports/s)")
+    if args.index:
+        index.flush()
+        print(f"Search index: {index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, DiskStore
+from multi_stock import fetch_history, fetch_info, price_matrix
+
+# Universe to screen: one symbol per line (default: configured watchlists)
+SCREEN_UNIVERSE_FILE = os.getenv("SCREEN_UNIVERSE_FILE", "universe.txt")
+SCREEN_LIMIT = 50
+SCREEN_MAX_LIMIT = 1000
+
+# Screenable fields: name -> (label, Ticker.info key); volume and last close
+# come from the latest daily bar instead
+FIELDS = {
+    "market_cap": ("Market Cap", "marketCap"),
+    "pe": ("P/E Ratio", "trailingPE"),
+    "high_52w": ("52-Week High", "fiftyTwoWeekHigh"),
+    "low_52w": ("52-Week Low", "fiftyTwoWeekLow"),
+    "dividend_yield": ("Dividend Yield", "dividendYield"),
+    "volume": ("Volume", None),
+    "last_close": ("Last Close Price", None),
+}
+SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+# The whole universe is one file, rewritten on each bulk refresh
+snapshot_store = DiskStore(os.path.join(CACHE_DIR, "screener"))
+SNAPSHOT_KEY = "universe"
+
+_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|<|>|=)\s*(-?[0-9.]+(?:e-?\d+)?)\s*([KMBT]?)\s*$", re.IGNORECASE)
+
+
+def load_universe(path=SCREEN_UNIVERSE_FILE):
+    """Symbols from the universe file, falling back to the watchlists."""
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            symbols = [line.split("#")[0].strip().upper() for line in f]
+        return list(dict.fromkeys(s for s in symbols if s))
+    from prefetch import watchlist_symbols
+    return watchlist_symbols()
+
+
+def fetch_fundamentals(symbols):
+    """
+    The screener fields for each symbol, one row per symbol: info fields
+    fetched concurrently, volume and last close from one batched download.
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    info = fetch_info(symbols)
+    history = fetch_history(symbols, period="5d")
+    closes = price_matrix(history, "Close")
+    volumes = price_matrix(history, "Volume")
+    return _snapshot_frame({
+        symbol: _row(info.get(symbol) or {}, _last(volumes.get(symbol)), _last(closes.get(symbol)))
+        for symbol in symbols
+    })
+
+
+def prefetched_fundamentals(symbols):
+    """
+    Screener rows from the prefetcher's per-symbol stores (see prefetch.py):
+    stored info fields plus volume and close of the last stored daily bar.
+    """
+    from prefetch import load_fundamentals, month_store
+
+    info = load_fundamentals(symbols)
+    rows = {}
+    for symbol in info.index:
+        bars = month_store.load(symbol)
+        bars = bars if bars is not None else pd.DataFrame()
+        rows[symbol] = _row(info.loc[symbol].to_dict(), _last(bars.get("Volume")), _last(bars.get("Close")))
+    return _snapshot_frame(rows)
+
+
+def _last(values):
+    if values is None:
+        return np.nan
+    values = values.dropna()
+    return float(values.iloc[-1]) if not values.empty else np.nan
+
+
+def _row(info, volume, last_close):
+    row = {name: info.get(key) for name, (_, key) in FIELDS.items() if key}
+    row["volume"] = volume
+    row["last_close"] = last_close
+    return row
+
+
+def _snapshot_frame(rows):
+    data = pd.DataFrame.from_dict(rows, orient="index", columns=list(FIELDS))
+    data = data.apply(pd.to_numeric, errors="coerce").astype("float64")
+    data.index.name = "symbol"
+    return data
+
+
+def refresh_snapshot(symbols=None):
+    """Fetch the whole universe in bulk and replace the stored snapshot."""
+    data = fetch_fundamentals(load_universe() if symbols is None else symbols)
+    data = data[data.notna().any(axis=1)]
+    snapshot_store.save(SNAPSHOT_KEY, data)
+    return data
+
+
+def parse_conditions(text):
+    """'pe<20, market_cap>10B' (comma or 'and' separated) -> [(field, op, value)]."""
+    conditions = []
+    for part in re.split(r",|\band\b", text or "", flags=re.IGNORECASE):
+        if not part.strip():
+            continue
+        match = _CONDITION.match(part)
+        if not match:
+            raise ValueError(f"Cannot parse condition '{part.strip()}'. Use e.g. pe<20, market_cap>10B")
+        field, op, value, suffix = match.groups()
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}'. Use one of: {', '.join(FIELDS)}")
+        conditions.append((field, op, float(value) * SUFFIXES.get(suffix.upper(), 1)))
+    return conditions
+
+
+def parse_sort(text):
+    """'-dividend_yield,pe' -> [(field, descending)]."""
+    keys = []
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        field = part.lstrip("+-")
+        if field not in FIELDS:
+            raise ValueError(f"Unknown sort field '{field}'. Use one of: {', '.join(FIELDS)}")
+        keys.append((field, part.startswith("-")))
+    return keys
+
+
+class Screener:
+    """
+    In-memory snapshot with one column array and one sorted index per
+    numeric field. A range condition is two binary searches on a sorted
+    field; a single-key sort walks that field's precomputed order. Missing
+    values never match a condition and sort last.
+    """
+
+    def __init__(self, data, as_of=None):
+        self.as_of = as_of
+        self.symbols = data.index.to_numpy(dtype=object)
+        self.columns = {}
+        self.order = {}       # field -> row ids sorted ascending, missing values last
+        self.order_desc = {}  # field -> row ids sorted descending, missing values last
+        self.sorted = {}      # field -> present values in ascending order
+        self.rank = {}        # field -> sort key of each row (equal values share it; missing last)
+        for field in FIELDS:
+            values = data[field].to_numpy(dtype="float64") if field in data else np.full(len(data), np.nan)
+            order = np.argsort(values, kind="stable")  # NaN sorts last
+            present = int(np.count_nonzero(~np.isnan(values)))
+            self.columns[field], self.order[field] = values, order
+            self.order_desc[field] = np.concatenate([np.argsort(-values, kind="stable")[:present], order[present:]])
+            self.sorted[field] = values[order[:present]]
+            rank = np.searchsorted(self.sorted[field], values, side="left")
+            rank[np.isnan(values)] = present
+            self.rank[field] = rank
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _rows(self, field, op, value):
+        """Row ids matching one condition, via binary search on the sorted field."""
+        ordered = self.sorted[field]
+        if op == "!=":
+            lo = np.searchsorted(ordered, value, side="left")
+            hi = np.searchsorted(ordered, value, side="right")
+            return np.concatenate([self.order[field][:lo], self.order[field][hi:len(ordered)]])
+        lo, hi = {
+            "<": (0, np.searchsorted(ordered, value, side="left")),
+            "<=": (0, np.searchsorted(ordered, value, side="right")),
+            ">": (np.searchsorted(ordered, value, side="right"), len(ordered)),
+            ">=": (np.searchsorted(ordered, value, side="left"), len(ordered)),
+            "=": (np.searchsorted(ordered, value, side="left"), np.searchsorted(ordered, value, side="right")),
+        }[op]
+        return self.order[field][lo:hi]
+
+    def screen(self, conditions=(), sort=(), limit=SCREEN_LIMIT, fields=None):
+        """Rows matching every condition, sorted; returns (total matches, result records)."""
+        mask = np.ones(len(self), dtype=bool)
+        for field, op, value in conditions:
+            matched = np.zeros(len(self), dtype=bool)
+            matched[self._rows(field, op, value)] = True
+            mask &= matched
+
+        if not sort:
+            rows = np.flatnonzero(mask)
+        elif len(sort) == 1:
+            field, descending = sort[0]
+            rows = (self.order_desc if descending else self.order)[field]
+            rows = rows[mask[rows]]
+        else:
+            rows = np.flatnonzero(mask)
+            # lexsort's last key is the primary one; missing values rank last either way
+            keys = []
+            for field, descending in reversed(sort):
+                rank = self.rank[field][rows]
+                if descending:
+                    present = len(self.sorted[field])
+                    rank = np.where(rank < present, -rank, present)
+                keys.append(rank)
+            rows = rows[np.lexsort(keys)]
+
+        total = len(rows)
+        rows = rows[:limit]
+        fields = list(fields or FIELDS)
+        records = []
+        for row in rows:
+            record = {"symbol": self.symbols[row]}
+            for field in fields:
+                value = self.columns[field][row]
+                record[field] = None if value != value else float(value)
+            records.append(record)
+        return total, records
+
+
+_screener = None
+_screener_version = None
+_screener_lock = threading.Lock()
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def get_screener(prefetched=()):
+    """
+    The stored snapshot as a Screener, with the rows of `prefetched`
+    symbols taken from the prefetcher's stores where those are newer.
+    Rebuilt whenever a refresh or a prefetch rewrote either.
+    """
+    global _screener, _screener_version
+    from prefetch import fundamentals_store
+
+    mtime = _mtime(snapshot_store.path(SNAPSHOT_KEY))
+    fresher = {}
+    for symbol in prefetched:
+        stamp = _mtime(fundamentals_store.path(symbol))
+        if stamp is not None and (mtime is None or stamp > mtime):
+            fresher[symbol] = stamp
+    if mtime is None and not fresher:
+        return None
+
+    version = (mtime, tuple(sorted(fresher.items())))
+    with _screener_lock:
+        if _screener is None or version != _screener_version:
+            data = snapshot_store.load(SNAPSHOT_KEY) if mtime is not None else None
+            if fresher:
+                rows = prefetched_fundamentals(list(fresher))
+                data = rows if data is None else pd.concat([data.drop(rows.index, errors="ignore"), rows])
+            if data is None:
+                return None
+            as_of = mtime if mtime is not None else min(fresher.values())
+            _screener, _screener_version = Screener(data, as_of=as_of), version
+        return _screener
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh or query the fundamentals screener snapshot.")
+    parser.add_argument("symbols", nargs="*", help="Symbols to refresh (default: the universe file or watchlists)")
+    parser.add_argument("--refresh", action="store_true", help="Fetch fundamentals for the universe in bulk")
+    parser.add_argument("--where", default="", help="e.g. 'pe<20, market_cap>10B'")
+    parser.add_argument("--sort", default="", help="e.g. '-dividend_yield'")
+    parser.add_argument("--limit", type=int, default=SCREEN_LIMIT)
+    args = parser.parse_args(argv)
+
+    if args.refresh:
+        data = refresh_snapshot(args.symbols or None)
+        print(f"Stored fundamentals for {len(data)} symbols")
+
+    screener = get_screener()
+    if screener is None:
+        parser.error("No snapshot yet: run with --refresh first")
+    total, records = screener.screen(parse_conditions(args.where), parse_sort(args.sort), args.limit)
+    frame = pd.DataFrame(records).set_index("symbol") if records else pd.DataFrame()
+    frame.columns = [FIELDS[c][0] for c in frame.columns]
+    print(f"{total} of {len(screener)} symbols match")
+    print(frame)
+
+
+if __name__ == "__main__":
+    main()
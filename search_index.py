@@ -0,0 +1,314 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from cache import file_lock
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Index location and layout (override through the environment)
+INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".search_index"))
+EMBEDDING_DIM = int(os.getenv("SEARCH_EMBEDDING_DIM", "256"))
+# Vectors per sealed, memory-mapped segment file
+SEGMENT_SIZE = int(os.getenv("SEARCH_SEGMENT_SIZE", "50000"))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SECTION = re.compile(r"^#{2,3} ", re.MULTILINE)
+
+
+class HashingEmbedder:
+    """
+    Local, deterministic embedding: signed feature hashing of words and
+    word bigrams into a fixed number of dimensions, L2-normalized.
+    Needs no model download and gives the same vector in every process.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed(self, texts):
+        cells, weights = [], []
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            base = row * self.dim
+            for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(token.encode())
+                cells.append(base + h % self.dim)
+                weights.append(1.0 if h & 0x80000000 else -1.0)
+
+        vectors = np.bincount(cells, weights, minlength=len(texts) * self.dim)
+        vectors = vectors.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class LangChainEmbedder:
+    """Adapter for any LangChain `Embeddings` object (e.g. a hosted model)."""
+
+    def __init__(self, embeddings, dim):
+        self.embeddings = embeddings
+        self.dim = dim
+
+    def embed(self, texts):
+        vectors = np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def split_report(report):
+    """Split a Markdown report into its '##'/'###' sections."""
+    sections = [s.strip() for s in _SECTION.split(report)]
+    return [s for s in sections if s]
+
+
+def _doc_key(kind, text):
+    return hashlib.blake2b(f"{kind}\x00{text}".encode(), digest_size=8).digest()
+
+
+class SemanticIndex:
+    """
+    Persistent vector index over headlines and report sections.
+
+    Documents are appended to docs.jsonl (doc id = line number). Their
+    vectors go into an in-memory FAISS segment that is sealed to disk every
+    SEGMENT_SIZE documents; sealed segments are opened memory-mapped, so
+    RAM use stays flat as the index grows. Vectors not yet sealed are
+    re-embedded from docs.jsonl on startup.
+
+    Several processes may share one index directory: appends and seals
+    happen under an exclusive file lock, after catching up with whatever
+    the other processes wrote, so ids stay unique and segments contiguous.
+    """
+
+    def __init__(self, root=INDEX_DIR, embedder=None, segment_size=SEGMENT_SIZE):
+        if faiss is None:
+            raise ImportError("SemanticIndex requires faiss (pip install faiss-cpu)")
+        self.root = root
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.segment_size = segment_size
+        self._docs_path = os.path.join(root, "docs.jsonl")
+        self._lock_path = os.path.join(root, "write.lock")
+        self._offsets = []       # byte offset of each doc in docs.jsonl
+        self._docs_end = 0       # bytes of docs.jsonl read so far
+        self._seen = set()       # (kind, text) digests, for deduplication
+        self._segments = []      # sealed, memory-mapped FAISS indexes
+        self._sealed = 0         # ids below this are in sealed segments
+        self._active = self._new_segment()
+        self._lock = threading.RLock()
+        os.makedirs(root, exist_ok=True)
+        with self._lock, file_lock(self._lock_path):
+            self._sync()
+
+    def _new_segment(self):
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+
+    def _segment_path(self, first_id):
+        return os.path.join(self.root, f"segment-{first_id:010d}.faiss")
+
+    def _sync(self):
+        """Catch up with segments and documents written by any process (file lock held)."""
+        # Sealed segments are contiguous: each one starts where the last ended
+        while os.path.exists(self._segment_path(self._sealed)):
+            segment = faiss.read_index(self._segment_path(self._sealed),
+                                       faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            self._segments.append(segment)
+            self._sealed += segment.ntotal
+        if self._active.ntotal:
+            # Another process sealed vectors this one still held in memory
+            self._active.remove_ids(faiss.IDSelectorRange(0, self._sealed))
+
+        pending = []
+        if os.path.exists(self._docs_path):
+            with open(self._docs_path, "rb") as f:
+                f.seek(self._docs_end)
+                data = f.read()
+            # A line cut short by a crashed writer is left for later
+            data = data[:data.rfind(b"\n") + 1]
+            offset = self._docs_end
+            for line in data.splitlines(keepends=True):
+                doc = json.loads(line)
+                self._offsets.append(offset)
+                self._seen.add(_doc_key(doc["kind"], doc["text"]))
+                pending.append(doc["text"])
+                offset += len(line)
+            self._docs_end = offset
+
+        # Embed documents whose vectors are neither sealed nor in memory
+        first = len(self._offsets) - len(pending)
+        held = self._sealed + self._active.ntotal
+        pending, first = pending[max(0, held - first):], max(first, held)
+        for start in range(0, len(pending), self.segment_size):
+            batch = pending[start:start + self.segment_size]
+            ids = np.arange(first + start, first + start + len(batch), dtype=np.int64)
+            self._active.add_with_ids(self.embedder.embed(batch), ids)
+            if self._active.ntotal >= self.segment_size:
+                self._seal()
+
+    def _seal(self):
+        """Write the in-memory segment as the next sealed one (file lock held, synced)."""
+        if self._active.ntotal == 0:
+            return
+        path = self._segment_path(self._sealed)
+        faiss.write_index(self._active, f"{path}.{os.getpid()}.tmp")
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+        self._segments.append(faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY))
+        self._sealed += self._active.ntotal
+        self._active = self._new_segment()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def add(self, texts, kind, source=None):
+        """Embed and store new documents; duplicates are skipped. Returns the count added."""
+        with self._lock, file_lock(self._lock_path):
+            self._sync()
+            new = []
+            for text in texts:
+                text = text.strip()
+                key = _doc_key(kind, text)
+                if text and key not in self._seen:
+                    self._seen.add(key)
+                    new.append(text)
+            if not new:
+                return 0
+
+            first_id = len(self._offsets)
+            now = time.time()
+            lines = [json.dumps({"id": first_id + i, "kind": kind, "text": text, "source": source, "ts": now}).encode() + b"\n"
+                     for i, text in enumerate(new)]
+            with open(self._docs_path, "ab") as f:
+                offset = f.tell()
+                f.write(b"".join(lines))
+            for line in lines:
+                self._offsets.append(offset)
+                offset += len(line)
+            self._docs_end = offset
+
+            ids = np.arange(first_id, first_id + len(new), dtype=np.int64)
+            self._active.add_with_ids(self.embedder.embed(new), ids)
+            if self._active.ntotal >= self.segment_size:
+                self._seal()
+            return len(new)
+
+    def add_headlines(self, headlines, source=None):
+        return self.add(headlines, "headline", source)
+
+    def add_report(self, report, source=None):
+        return self.add(split_report(report), "report", source)
+
+    def flush(self):
+        """Seal the in-memory segment to disk and reopen it memory-mapped."""
+        with self._lock, file_lock(self._lock_path):
+            self._sync()
+            self._seal()
+
+    def _read_docs(self, ids):
+        docs = {}
+        with open(self._docs_path, "rb") as f:
+            for doc_id in sorted(ids):
+                f.seek(self._offsets[doc_id])
+                docs[doc_id] = json.loads(f.readline())
+        return docs
+
+    def search(self, query, k=10, kind=None):
+        """Top-k matching documents by cosine similarity, optionally of one kind."""
+        with self._lock:
+            try:
+                grown = os.path.getsize(self._docs_path) != self._docs_end
+            except OSError:
+                grown = False
+            if grown:
+                # Another process added documents
+                with file_lock(self._lock_path):
+                    self._sync()
+            segments = [s for s in self._segments + [self._active] if s.ntotal]
+            if not segments or k <= 0:
+                return []
+            vector = self.embedder.embed([query])
+            fetch = k if kind is None else k * 5
+
+            scores, ids = [], []
+            for segment in segments:
+                D, I = segment.search(vector, min(fetch, segment.ntotal))
+                scores.append(D[0])
+                ids.append(I[0])
+        scores = np.concatenate(scores)
+        ids = np.concatenate(ids)
+        order = np.argsort(-scores)[:fetch]
+
+        docs = self._read_docs([int(ids[i]) for i in order if ids[i] >= 0])
+        results = []
+        for i in order:
+            doc = docs.get(int(ids[i]))
+            # Non-positive similarity means no shared terms: not a match
+            if doc is None or scores[i] <= 0 or (kind is not None and doc["kind"] != kind):
+                continue
+            doc["score"] = round(float(scores[i]), 4)
+            results.append(doc)
+            if len(results) == k:
+                break
+        return results
+
+    def stats(self):
+        return {
+            "documents": len(self._offsets),
+            "sealed_segments": len(self._segments),
+            "unsealed_vectors": self._active.ntotal,
+            "dim": self.dim,
+        }
+
+
+def benchmark(n_docs=1_000_000, batch=10_000, queries=200, root=None, seed=0):
+    """Insert throughput and query latency on synthetic headlines."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"w{i}" for i in range(20_000)])
+    cleanup = root is None
+    root = root or tempfile.mkdtemp(prefix="search-bench-")
+    try:
+        index = SemanticIndex(root)
+        start = time.perf_counter()
+        for first in range(0, n_docs, batch):
+            size = min(batch, n_docs - first)
+            words = vocabulary[rng.integers(0, len(vocabulary), size=(size, 10))]
+            index.add([f"{first + i} " + " ".join(row) for i, row in enumerate(words)], "headline")
+        insert_seconds = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(queries):
+            query = " ".join(vocabulary[rng.integers(0, len(vocabulary), 5)])
+            t = time.perf_counter()
+            index.search(query, k=10)
+            latencies.append(time.perf_counter() - t)
+        latencies = np.array(latencies) * 1000
+        return {
+            "documents": len(index),
+            "insert_docs_per_second": round(n_docs / insert_seconds, 1),
+            "query_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+            "query_ms_p95": round(float(np.percentile(latencies, 95)), 2),
+        }
+    finally:
+        if cleanup:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the semantic headline/report index.")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.docs, queries=args.queries), indent=2))
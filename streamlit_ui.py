@@ -1,21 +1,133 @@
+import json
+
 import streamlit as st
 import requests
 import plotly.express as px
 import pandas as pd
-import random
+
+import wire
+from downsample import chart_frame
+from reports import (INDUSTRIES, METRICS, DEFAULT_METRICS, INVESTMENT_GOALS, TIME_FRAMES,
+                     analyze_industry, analyze_metrics, generate_forecast, render_report)
 
 # --------------------------------------------------
 # CONFIGURATION & CONSTANTS
 # --------------------------------------------------
 # Flask API URL for stock data and news (ensure your Flask API is running)
 API_BASE_URL = "http://localhost:5000"
+# Fastest /stock wire format this client can decode (Arrow IPC if pyarrow is installed)
+STOCK_FORMAT = wire.available_formats()[0]
+# Chart overlays -> indicator names understood by indicators.compute_indicators
+CHART_OVERLAYS = {"SMA (20)": "sma", "EMA (20)": "ema", "Bollinger Bands (20, 2)": "bollinger"}
+# History ranges offered in the sidebar (must be accepted by /stock?period=)
+STOCK_PERIODS = ["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "20y", "max"]
+# Live bar resolutions polled as deltas from /stock?since= (API needs LIVE_FEED set)
+LIVE_INTERVALS = ["1m", "5m", "1h", "1d"]
+LIVE_REFRESH = 2  # seconds between polls
+LIVE_BARS = 500   # bars kept in the live chart
+# Symbols pre-filled in the watchlist view (streamed from /stocks/stream)
+WATCHLIST_DEFAULT = "AAPL, MSFT, GOOGL, AMZN, META, NVDA, TSLA, JPM"
+# Basket pre-filled in the portfolio risk view (/portfolio/risk)
+PORTFOLIO_DEFAULT = "AAPL, MSFT, GOOGL, AMZN, JPM, XOM"
+PORTFOLIO_OPTIMIZERS = {"None": None, "Minimum variance": "min_variance", "Risk parity": "risk_parity"}
+# Correlation heatmaps above this many assets are unreadable
+PORTFOLIO_HEATMAP_MAX = 60
+# Seconds before a cached API response is fetched again
+STOCK_CACHE_TTL = 300
+NEWS_CACHE_TTL = 60
 
 st.set_page_config(page_title="Financial Analysis Dashboard", layout="wide")
 
 # --------------------------------------------------
-# TAB LAYOUT: Stock Analysis & Financial Forecasting
+# API CLIENT (cached across reruns)
+# --------------------------------------------------
+@st.cache_resource
+def api_session():
+    """One pooled HTTP session shared by every rerun and widget interaction."""
+    return requests.Session()
+
+@st.cache_data(ttl=STOCK_CACHE_TTL, show_spinner=False)
+def fetch_stock_frame(symbol, period):
+    """Stock history from the API, cached per (symbol, period). Failures are not cached."""
+    response = api_session().get(f"{API_BASE_URL}/stock", params={"symbol": symbol, "period": period, "format": STOCK_FORMAT}, timeout=60)
+    response.raise_for_status()
+    return wire.decode(response.content, STOCK_FORMAT)
+
+@st.cache_data(ttl=NEWS_CACHE_TTL, show_spinner=False)
+def fetch_news():
+    response = api_session().get(f"{API_BASE_URL}/news", timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+def fetch_live_delta(symbol, interval, since):
+    """Live bars changed since `since` (0: everything the API keeps)."""
+    response = api_session().get(f"{API_BASE_URL}/stock", params={"symbol": symbol, "interval": interval, "since": since}, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+def merge_live_delta(frame, delta):
+    """Upsert a delta into the chart frame; changed bars are always a contiguous tail."""
+    if not delta["index"]:
+        return frame
+    index = pd.to_datetime(delta["index"], unit="ms", utc=True).tz_convert(delta["tz"])
+    update = pd.DataFrame({**delta["columns"], **delta["indicators"]}, index=index, dtype="float64")
+    if frame is not None:
+        update = pd.concat([frame.iloc[:frame.index.searchsorted(index[0])], update])
+    return update.iloc[-LIVE_BARS:]
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_chart(symbol, interval):
+    """Reruns on its own every LIVE_REFRESH seconds, fetching only the bars that changed."""
+    state = st.session_state.setdefault(f"live:{symbol}:{interval}", {"since": 0, "frame": None})
+    try:
+        delta = fetch_live_delta(symbol, interval, state["since"])
+    except requests.RequestException:
+        st.warning("Live bars unavailable. Start the API with LIVE_FEED=simulated or poll.")
+        return
+    state["frame"] = merge_live_delta(state["frame"], delta)
+    state["since"] = delta["version"]
+
+    live = state["frame"]
+    if live is None or live.empty:
+        st.info("Waiting for trades...")
+        return
+    fig = px.line(live, x=live.index, y=["Close", "ema", "bb_upper", "bb_lower"], title=f"{symbol} Live {interval} Bars")
+    st.plotly_chart(fig, use_container_width=True)
+    quote = delta.get("quote")
+    st.caption(f"{len(live)} bars · last {live['Close'].iloc[-1]:.2f}"
+               + (f" · bid {quote['bid']:.2f} / ask {quote['ask']:.2f}" if quote else ""))
+
+def stream_watchlist(symbols, period):
+    """Yield /stocks/stream records as the API sends them (fastest symbols first)."""
+    params = {"symbols": ",".join(symbols), "period": period}
+    with api_session().get(f"{API_BASE_URL}/stocks/stream", params=params, stream=True, timeout=300) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+def watchlist_row(record):
+    """Table row for one streamed symbol: last close and change over the range, or its error."""
+    row = {"Symbol": record["symbol"], "Last Close": None, "Change %": None, "Bars": 0, "Error": record.get("error")}
+    if record["status"] == 200:
+        closes = [c for c in record["data"]["columns"].get("Close", []) if c is not None]
+        if closes:
+            row.update({"Last Close": round(closes[-1], 2), "Change %": round(100 * (closes[-1] / closes[0] - 1), 2),
+                        "Bars": len(closes)})
+    return row
+
+@st.cache_data(ttl=STOCK_CACHE_TTL, show_spinner=False)
+def fetch_portfolio_risk(symbols, weights, period, benchmark, optimize, matrix):
+    """Portfolio risk analytics from the API, cached per request. Returns (payload, status)."""
+    params = {"symbols": symbols, "weights": weights, "period": period, "benchmark": benchmark,
+              "optimize": optimize, "matrix": int(matrix)}
+    response = api_session().get(f"{API_BASE_URL}/portfolio/risk", params=params, timeout=300)
+    return response.json(), response.status_code
+
+# --------------------------------------------------
+# TAB LAYOUT: Stock Analysis, Watchlist, Portfolio Risk & Financial Forecasting
 # --------------------------------------------------
-tabs = st.tabs(["Stock Analysis & News", "Financial Forecasting Report"])
+tabs = st.tabs(["Stock Analysis & News", "Watchlist", "Portfolio Risk", "Financial Forecasting Report"])
 
 # --------------------------------------------------
 # TAB 1: Stock Analysis & News
@@ -25,34 +137,52 @@ with tabs[0]:
     
     # Sidebar: Stock Analysis input
     st.sidebar.header("Stock Analysis")
-    stock_symbol = st.sidebar.text_input("Enter Stock Symbol (e.g., AAPL, TSLA)", "")
+    stock_symbol = st.sidebar.text_input("Enter Stock Symbol (e.g., AAPL, TSLA)", "").strip().upper()
+    stock_period = st.sidebar.selectbox("History Range", STOCK_PERIODS)
     
     if stock_symbol:
         with st.spinner("Fetching stock data..."):
-            response = requests.get(f"{API_BASE_URL}/stock", params={"symbol": stock_symbol})
-            if response.status_code == 200:
-                stock_data = pd.DataFrame(response.json())
+            try:
+                stock_data = fetch_stock_frame(stock_symbol, stock_period)
+            except requests.RequestException:
+                stock_data = None
+            if stock_data is not None:
                 if not stock_data.empty:
                     st.subheader(f"Stock Data for {stock_symbol}")
                     st.dataframe(stock_data)
                     
-                    # Plot closing prices
-                    fig = px.line(stock_data, x=stock_data.index, y="Close", title=f"{stock_symbol} Closing Prices")
+                    # Plot closing prices with optional indicator overlays; indicators
+                    # use the full series, the chart gets at most CHART_POINTS points
+                    overlays = st.multiselect("Chart Overlays", list(CHART_OVERLAYS))
+                    chart_data = chart_frame(stock_data, [CHART_OVERLAYS[o] for o in overlays])
+                    fig = px.line(chart_data, x=chart_data.index, y=list(chart_data.columns), title=f"{stock_symbol} Closing Prices")
                     st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.error("No data available for the given stock symbol.")
             else:
                 st.error("Failed to fetch stock data. Please check the symbol and try again.")
+
+    # Live intraday bars, updated in place from deltas
+    live_enabled = st.sidebar.checkbox("Live intraday bars")
+    live_interval = st.sidebar.selectbox("Bar Interval", LIVE_INTERVALS, disabled=not live_enabled)
+    if stock_symbol and live_enabled:
+        live_chart(stock_symbol, live_interval)
     
     # Sidebar: Financial News
     st.sidebar.header("Latest Financial News")
     if st.sidebar.button("Get News"):
         with st.spinner("Fetching latest news..."):
-            news_response = requests.get(f"{API_BASE_URL}/news")
-            if news_response.status_code == 200:
-                news = news_response.json().get("latest_news", [])
+            try:
+                news_payload = fetch_news()
+            except requests.RequestException:
+                news_payload = None
+            if news_payload is not None:
+                news = news_payload.get("latest_news", [])
+                news_age = news_payload.get("age_seconds")
                 if news:
                     st.subheader("📰 Latest Financial News")
+                    if news_age is not None:
+                        st.caption(f"Updated {news_age:.0f}s ago")
                     for idx, headline in enumerate(news, start=1):
                         st.write(f"{idx}. {headline}")
                 else:
@@ -64,83 +194,105 @@ with tabs[0]:
     st.sidebar.info("Built with ❤️ using Streamlit & Flask")
 
 # --------------------------------------------------
-# TAB 2: Financial Forecasting Report
+# TAB 2: Watchlist (rows appear as each symbol arrives)
 # --------------------------------------------------
 with tabs[1]:
+    st.title("Watchlist")
+    watchlist_input = st.text_area("Symbols (comma-separated)", WATCHLIST_DEFAULT)
+    watchlist_period = st.selectbox("History Range", STOCK_PERIODS, key="watchlist_period")
+
+    if st.button("Load Watchlist"):
+        watchlist = list(dict.fromkeys(s.strip().upper() for s in watchlist_input.split(",") if s.strip()))
+    else:
+        watchlist = []
+
+    if watchlist:
+        progress = st.progress(0.0)
+        table = st.empty()
+        rows = []
+        try:
+            for record in stream_watchlist(watchlist, watchlist_period):
+                if record.get("done"):
+                    st.caption(f"{record['symbols']} symbols in {record['seconds']:.2f}s ({record['errors']} failed)")
+                    continue
+                rows.append(watchlist_row(record))
+                progress.progress(len(rows) / len(watchlist), text=f"{len(rows)}/{len(watchlist)} symbols")
+                table.dataframe(pd.DataFrame(rows).set_index("Symbol"), use_container_width=True)
+        except requests.RequestException:
+            st.error("Failed to stream watchlist data.")
+
+# --------------------------------------------------
+# TAB 3: Portfolio Risk
+# --------------------------------------------------
+with tabs[2]:
+    st.title("Portfolio Risk")
+    portfolio_input = st.text_area("Holdings (comma-separated)", PORTFOLIO_DEFAULT)
+    portfolio_weights = st.text_input("Weights (same order, blank for equal weight)", "")
+    col1, col2, col3 = st.columns(3)
+    portfolio_period = col1.selectbox("History Range", STOCK_PERIODS, index=STOCK_PERIODS.index("5y"), key="portfolio_period")
+    portfolio_benchmark = col2.text_input("Benchmark", "SPY").strip().upper()
+    portfolio_optimizer = col3.selectbox("Suggested Weights", list(PORTFOLIO_OPTIMIZERS))
+
+    if st.button("Analyze Portfolio"):
+        holdings = ",".join(dict.fromkeys(s.strip().upper() for s in portfolio_input.split(",") if s.strip()))
+        show_matrix = len(holdings.split(",")) <= PORTFOLIO_HEATMAP_MAX
+        try:
+            with st.spinner("Computing portfolio risk..."):
+                risk, status = fetch_portfolio_risk(holdings, portfolio_weights.strip() or None, portfolio_period,
+                                                    portfolio_benchmark, PORTFOLIO_OPTIMIZERS[portfolio_optimizer],
+                                                    show_matrix)
+        except (requests.RequestException, ValueError):
+            risk, status = {"error": "Failed to fetch portfolio risk."}, None
+
+        if status != 200:
+            st.error(risk.get("error", "Failed to fetch portfolio risk."))
+        else:
+            if risk.get("missing"):
+                st.warning(f"No price data for: {', '.join(risk['missing'])} (left out)")
+            if risk.get("benchmark_error"):
+                st.warning(risk["benchmark_error"] + " (beta not computed)")
+            st.caption(f"{risk['observations']} trading days, {risk['start']} to {risk['end']} · "
+                       f"covariance shrinkage {risk['shrinkage']:.1%}"
+                       + (f" · dropped (short history): {', '.join(risk['dropped'])}" if risk["dropped"] else ""))
+            summary = [(label, value) for label, value in risk["portfolio"].items() if value is not None]
+            for column, (label, value) in zip(st.columns(len(summary)), summary):
+                column.metric(label, value)
+
+            assets = pd.DataFrame({"Volatility (%)": [round(100 * v, 2) for v in risk["volatility"]]}, index=risk["assets"])
+            if risk["beta"] is not None:
+                assets[f"Beta vs {risk['benchmark']}"] = risk["beta"]
+            for name in risk["weights"]:
+                label = name.replace("_", " ").title()
+                assets[f"{label} Weight (%)"] = [round(100 * w, 2) for w in risk["weights"][name]]
+                assets[f"{label} Risk Share (%)"] = [round(100 * rc, 2) for rc in risk["risk_contributions"][name]]
+            st.dataframe(assets, use_container_width=True)
+
+            if risk.get("correlation") is not None:
+                fig = px.imshow(pd.DataFrame(risk["correlation"], index=risk["assets"], columns=risk["assets"]),
+                                zmin=-1, zmax=1, color_continuous_scale="RdBu_r", title="Correlation (shrunk)")
+                st.plotly_chart(fig, use_container_width=True)
+
+# --------------------------------------------------
+# TAB 4: Financial Forecasting Report
+# --------------------------------------------------
+with tabs[3]:
     st.title("Financial Analysis & Forecasting Report")
     
     # Input: Industry Focus
-    industry_options = ["Technology", "Healthcare", "Manufacturing", "Finance", "Retail"]
-    industry_focus = st.selectbox("Industry Focus", industry_options)
+    industry_focus = st.selectbox("Industry Focus", INDUSTRIES)
     
     # Input: Financial Metrics to Analyze
-    metrics_options = ["Revenue Growth", "Profit Margins", "Cash Flow", "Market Cap", "P/E Ratio"]
-    selected_metrics = st.multiselect("Financial Metrics to Analyze", metrics_options, 
-                                      default=["Revenue Growth", "Profit Margins"])
+    selected_metrics = st.multiselect("Financial Metrics to Analyze", METRICS, default=DEFAULT_METRICS)
     
     # Input: Market Conditions
     market_condition = st.text_input("Market Conditions (e.g., Inflation Rate, Interest Rate, Geopolitical Factors)")
     
     # Input: Investment Goals
-    investment_goals = ["Short-term Gains", "Long-term Stability", "Risk Management"]
-    investment_goal = st.selectbox("Investment Goals", investment_goals)
+    investment_goal = st.selectbox("Investment Goals", INVESTMENT_GOALS)
     
     # Input: Time Frame
-    time_frame_options = ["Quarterly", "Annual", "5-Year Outlook"]
-    time_frame = st.selectbox("Time Frame", time_frame_options)
+    time_frame = st.selectbox("Time Frame", TIME_FRAMES)
     
-    # --------------------------------------------------
-    # BACKEND LOGIC FOR FORECASTING
-    # --------------------------------------------------
-    def generate_forecast(industry, metrics, market_condition, investment_goal, time_frame):
-        """
-        Generates a detailed mock forecast report using the provided inputs.
-        Replace this placeholder logic with real generative AI interactions if needed.
-        """
-        forecast_data = {
-            "Industry": industry,
-            "Analyzed Metrics": metrics,
-            "Market Condition": market_condition,
-            "Investment Goal": investment_goal,
-            "Time Frame": time_frame,
-            "Forecast Growth Rate (%)": round(random.uniform(3.0, 15.0), 2),
-            "Risk Level": random.choice(["Low", "Moderate", "High"]),
-            "Market Trend Analysis": f"In the {industry} sector, current trends show moderate growth driven by key factors including innovation and regulatory shifts.",
-            "Company Financial Projection": f"Based on selected metrics, the company's financials project stable revenue growth with improving profit margins over the {time_frame.lower()} period.",
-            "Investment Strategy Recommendations": f"To achieve {investment_goal.lower()}, a diversified approach is recommended that leverages sector-specific strengths in {industry}.",
-            "Model Critique": "The report provides coherent insights with clear financial terminology. However, integration with real-time data and further prompt refinement would enhance actionable recommendations."
-        }
-        return forecast_data
-
-    def analyze_industry(industry):
-        """
-        Returns industry-specific insights.
-        """
-        industry_insights = {
-            "Technology": "High innovation, rapid change, and potential volatility characterize the tech sector.",
-            "Healthcare": "Steady growth, regulatory oversight, and high demand for services define the healthcare industry.",
-            "Manufacturing": "Capital-intensive with cyclical demand, manufacturing trends are influenced by global supply chains.",
-            "Finance": "Highly sensitive to interest rates and economic cycles, the finance sector is dynamic and regulated.",
-            "Retail": "Driven by consumer spending and market trends, the retail sector faces both growth opportunities and challenges."
-        }
-        return industry_insights.get(industry, "No insights available.")
-
-    def analyze_metrics(metrics):
-        """
-        Provides a summary analysis for each selected financial metric.
-        """
-        metric_summaries = {
-            "Revenue Growth": "Measures how quickly a company's sales are growing.",
-            "Profit Margins": "Indicates profitability relative to revenue.",
-            "Cash Flow": "Reflects liquidity and the company's ability to fund operations.",
-            "Market Cap": "Represents the company's overall market value.",
-            "P/E Ratio": "Evaluates the company's share price relative to its earnings."
-        }
-        results = {}
-        for m in metrics:
-            results[m] = metric_summaries.get(m, "No data available.")
-        return results
-
     # --------------------------------------------------
     # FINANCIAL FORECASTING: GENERATE REPORT
     # --------------------------------------------------
@@ -156,53 +308,21 @@ with tabs[1]:
             time_frame=time_frame
         )
         
-        # Build the formatted report as a Markdown string
-        report = f"""
-# AI-Generated Financial Forecasting and Analysis Report
+        # Render the formatted report from the shared template
+        report = render_report(forecast_result, metric_analysis)
 
-**Industry Focus:** {forecast_result.get("Industry", "N/A")}  
-**Investment Goal:** {forecast_result.get("Investment Goal", "N/A")}  
-**Time Frame:** {forecast_result.get("Time Frame", "N/A")}  
-
----
-
-## Selected Metrics Analysis:
-"""
-        for metric, description in metric_analysis.items():
-            report += f"- **{metric}:** {description}\n"
-    
-        report += f"""
-
----
-
-## Forecast Results:
-- **Forecast Growth Rate (%):** {forecast_result.get("Forecast Growth Rate (%)", "N/A")}%  
-- **Risk Level:** {forecast_result.get("Risk Level", "N/A")}  
-- **Market Condition:** {forecast_result.get("Market Condition", "N/A")}  
-
-### Detailed Analysis:
-- **Market Trend Analysis:**  
-  {forecast_result.get("Market Trend Analysis", "N/A")}
-  
-- **Company Financial Projection:**  
-  {forecast_result.get("Company Financial Projection", "N/A")}
-  
-- **Investment Strategy Recommendations:**  
-  {forecast_result.get("Investment Strategy Recommendations", "N/A")}
-
----
-
-## Model Critique:
-{forecast_result.get("Model Critique", "N/A")}
-
----
-"""
         # Display the generated report
         st.subheader("Financial Analysis Report")
         st.markdown(report)
         
         # Download button for the report as a Markdown file
         st.download_button(label="Download Report", data=report, file_name="financial_analysis_report.md", mime="text/markdown")
+
+        # Add the report to the API's search index (best effort)
+        try:
+            api_session().post(f"{API_BASE_URL}/search/reports", json={"report": report, "source": f"{industry_focus} / {time_frame}"}, timeout=10)
+        except requests.RequestException:
+            pass
     
     # --------------------------------------------------
     # Display Refined Prompts for Financial Analysis
@@ -0,0 +1,196 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from cache import CACHE_DIR, DiskStore
+from columnar import columnar_store, epoch_ms
+from metrics import upstream
+
+# Alpha Vantage's compact output holds the latest 100 bars; keep a margin
+# so a compact refresh always overlaps what we already store.
+COMPACT_BARS = 100
+COMPACT_MARGIN = 5
+# Skip the upstream call entirely if the stored series was synced this recently
+SYNC_MIN_INTERVAL = float(os.getenv("SYNC_MIN_INTERVAL", "300"))  # seconds
+# Relative change in a re-sent, already complete close that means the source
+# re-based its adjusted history (dividend or split); above float32 rounding
+RESTATE_TOLERANCE = 1e-6
+
+# Intraday intervals kept in the columnar store, with the longest window
+# Yahoo serves for each (used for the first pull or after a long gap;
+# a day short, since requests start at midnight of the first date)
+INTRADAY_PERIODS = {
+    '1m': pd.Timedelta(days=6),
+    '2m': pd.Timedelta(days=59),
+    '5m': pd.Timedelta(days=59),
+    '15m': pd.Timedelta(days=59),
+    '30m': pd.Timedelta(days=59),
+    '60m': pd.Timedelta(days=729),
+    '1h': pd.Timedelta(days=729),
+}
+COLUMNAR_INTERVALS = ('1d',) + tuple(INTRADAY_PERIODS)
+
+# Full daily series, one file per ticker and per source
+alpha_vantage_store = DiskStore(os.path.join(CACHE_DIR, "alpha_vantage"))
+yahoo_store = DiskStore(os.path.join(CACHE_DIR, "yahoo"))
+
+
+def last_bar(store, symbol):
+    """Timestamp of the newest bar stored for a symbol, or None."""
+    data = store.load(symbol)
+    if data is None or data.empty:
+        return None
+    return data.index.max()
+
+
+def merge_bars(existing, new):
+    """Append new bars to a stored series; newer values win on duplicate dates."""
+    if existing is None or existing.empty:
+        merged = new
+    elif new is None or new.empty:
+        merged = existing
+    else:
+        merged = pd.concat([existing, new])
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+
+def restated(existing, new, field="Close", tolerance=RESTATE_TOLERANCE):
+    """
+    True when bars present in both series disagree, i.e. the source has
+    re-adjusted its history since `existing` was stored. The last stored
+    bar is left out, since it may have been partial.
+    """
+    if existing is None or new is None or len(existing) < 2 or new.empty:
+        return False
+    common = existing.index[:-1].intersection(new.index)
+    if common.empty:
+        return False
+    old = existing.loc[common, field].to_numpy(dtype=np.float64)
+    fresh = new.loc[common, field].to_numpy(dtype=np.float64)
+    return not np.allclose(fresh, old, rtol=tolerance, atol=0.0, equal_nan=True)
+
+
+def missing_bars(last, now=None):
+    """Business days between the last stored bar and now."""
+    now = pd.Timestamp.now(tz=last.tz) if now is None else now
+    start = (last + timedelta(days=1)).normalize()
+    if start > now:
+        return 0
+    return len(pd.bdate_range(start, now.normalize()))
+
+
+def sync_alpha_vantage(symbol, download):
+    """
+    Bring the stored Alpha Vantage daily series for a symbol up to date.
+    `download(symbol, outputsize)` must return a DataFrame indexed by date.
+    Uses 'compact' when the gap is small and 'full' only on first load or
+    when the compact window does not reach back to the last stored bar.
+    """
+    symbol = symbol.strip().upper()
+    store = alpha_vantage_store
+    existing = store.load(symbol)
+
+    if existing is None or existing.empty:
+        merged = merge_bars(None, download(symbol, "full"))
+    else:
+        age = store.age(symbol)
+        if age is not None and age < SYNC_MIN_INTERVAL:
+            return existing
+
+        last = existing.index.max()
+        if missing_bars(last) >= COMPACT_BARS - COMPACT_MARGIN:
+            new = download(symbol, "full")
+        else:
+            new = download(symbol, "compact")
+            if not new.empty and new.index.min() > last:
+                # The compact window doesn't overlap our history: fill the hole
+                new = download(symbol, "full")
+        merged = merge_bars(existing, new)
+
+    if not merged.empty:
+        store.save(symbol, merged)
+    return merged
+
+
+def sync_yahoo(symbol, initial_period="max", min_interval=SYNC_MIN_INTERVAL):
+    """
+    Bring the stored Yahoo Finance daily history for a symbol up to date,
+    requesting only bars from the last two stored dates onward. Prices are
+    dividend/split adjusted, so if the re-sent complete bar no longer
+    matches, the whole history is fetched again instead of mixing bases.
+    A copy synced less than `min_interval` seconds ago is returned as is.
+    """
+    import yfinance as yf
+
+    symbol = symbol.strip().upper()
+    store = yahoo_store
+    existing = store.load(symbol)
+    stock = yf.Ticker(symbol)
+
+    if existing is None or existing.empty:
+        with upstream("yfinance"):
+            history = stock.history(period=initial_period)
+        merged = merge_bars(None, history)
+    else:
+        age = store.age(symbol)
+        if age is not None and age < min_interval:
+            return existing
+        # Re-request the last stored bar (it may have been partial) and the
+        # one before it, a complete bar to check the adjustment against
+        start = existing.index[-2] if len(existing) > 1 else existing.index[-1]
+        with upstream("yfinance"):
+            new = stock.history(start=start.strftime("%Y-%m-%d"))
+        if restated(existing, new):
+            with upstream("yfinance"):
+                history = stock.history(period=initial_period)
+            merged = merge_bars(None, history)
+        else:
+            merged = merge_bars(existing, new)
+
+    if not merged.empty:
+        store.save(symbol, merged)
+    return merged
+
+
+def columnar_key(symbol, interval='1d'):
+    return f"{symbol.strip().upper()}@{interval}"
+
+
+def sync_yahoo_columnar(symbol, interval='1d', min_interval=SYNC_MIN_INTERVAL):
+    """
+    Bring the memory-mapped columnar copy of a symbol's history up to date
+    and return it (columnar.ColumnarSeries). Daily bars come from
+    sync_yahoo; intraday bars accumulate here across syncs, beyond the
+    window Yahoo itself keeps. Only bars from the last stored one onward
+    are written, unless the daily history was re-adjusted.
+    """
+    if interval not in COLUMNAR_INTERVALS:
+        raise ValueError(f"Unknown interval '{interval}'. Use one of: {', '.join(COLUMNAR_INTERVALS)}")
+    key = columnar_key(symbol, interval)
+    age = columnar_store.age(key)
+    if age is not None and age < min_interval:
+        return columnar_store.open(key)
+
+    series = columnar_store.open(key)
+    last = int(series.index[-1]) if series is not None and len(series) else None
+    if interval == '1d':
+        new = sync_yahoo(symbol, min_interval=min_interval)
+        tail = series.to_frame(start=int(series.index[-2])) if last is not None and len(series) > 1 else None
+        if last is not None and not restated(tail, new):
+            new = new[epoch_ms(new.index) >= last]
+        # else the history was re-adjusted: every stored bar is overwritten
+    else:
+        import yfinance as yf
+
+        window = INTRADAY_PERIODS[interval]
+        now = pd.Timestamp.now(tz='UTC')
+        start = now - window if last is None else max(pd.Timestamp(last, unit='ms', tz='UTC'), now - window)
+        # Re-request the last stored bar's day too; re-sent bars overwrite in place
+        with upstream("yfinance"):
+            new = yf.Ticker(symbol.strip().upper()).history(start=start.strftime("%Y-%m-%d"), interval=interval)
+
+    columnar_store.write(key, new)
+    return columnar_store.open(key)
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+
+import alpha_vantage_client
+import bench
+from alpha_vantage_client import BACKGROUND, INTERACTIVE, AlphaVantageClient, QuotaExceeded, Throttled, check_payload
+
+# Verbatim Alpha Vantage responses (HTTP 200 bodies)
+MINUTE_NOTE = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+                       "and 500 calls per day. Please visit https://www.alphavantage.co/premium/ if you would like "
+                       "to target a higher API call frequency."}
+DAILY_LIMIT = {"Information": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day. "
+                              "Please subscribe to any of the premium plans at https://www.alphavantage.co/premium/ "
+                              "to instantly remove all daily rate limits."}
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, timeout=None):
+        return FakeResponse(self.payload)
+
+
+def test_minute_note_is_throttling():
+    with pytest.raises(Throttled):
+        check_payload(MINUTE_NOTE)
+
+
+def test_daily_limit_is_quota():
+    with pytest.raises(QuotaExceeded):
+        check_payload(DAILY_LIMIT)
+
+
+def test_minute_note_keeps_daily_quota():
+    client = AlphaVantageClient(api_key="test", session=FakeSession(MINUTE_NOTE), max_retries=0, workers=1)
+    with pytest.raises(Throttled):
+        client.query({"function": "TIME_SERIES_DAILY", "symbol": "AAPL"}, timeout=10)
+    assert client.day.tokens > 0
+
+
+def test_daily_limit_drains_daily_quota():
+    client = AlphaVantageClient(api_key="test", session=FakeSession(DAILY_LIMIT), max_retries=0, workers=1)
+    with pytest.raises(QuotaExceeded):
+        client.query({"function": "TIME_SERIES_DAILY", "symbol": "AAPL"}, timeout=10)
+    with pytest.raises(QuotaExceeded):
+        client.query({"function": "TIME_SERIES_DAILY", "symbol": "MSFT"}, timeout=10)
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    """bench.py's local Alpha Vantage endpoint, serving synthesized fixtures."""
+    monkeypatch.setattr(bench, "FIXTURES_DIR", str(tmp_path))
+    bench.synthesize_fixtures(symbols=["AAPL", "MSFT", "IBM", "JPM"], years=1)
+    handler = bench._UpstreamHandler
+    monkeypatch.setattr(handler, "scripted", [])
+    monkeypatch.setattr(handler, "queries", [])
+    monkeypatch.setattr(handler, "hold", None)
+    # Retry at once instead of after seconds of backoff
+    monkeypatch.setattr(alpha_vantage_client, "backoff", lambda attempt: 0.01)
+    server, url = bench.start_upstream()
+    yield handler, f"{url}/query"
+    server.shutdown()
+
+
+def test_minute_note_is_retried(upstream):
+    handler, url = upstream
+    handler.scripted.extend([MINUTE_NOTE, MINUTE_NOTE])
+    client = AlphaVantageClient(api_key="test", base_url=url, max_retries=3, workers=1)
+
+    frame = client.daily("AAPL")
+    assert len(frame) == 100 and frame.index.is_monotonic_increasing
+    assert len(handler.queries) == 3
+    stats = client.stats()
+    assert stats["retries"] == 2 and stats["throttled"] == 2 and stats["calls"] == 3
+
+
+def test_daily_limit_stops_further_calls(upstream):
+    handler, url = upstream
+    handler.scripted.append(DAILY_LIMIT)
+    client = AlphaVantageClient(api_key="test", base_url=url, max_retries=3, workers=1)
+
+    with pytest.raises(QuotaExceeded):
+        client.daily("AAPL")
+    # Not retried, and later calls fail locally without reaching upstream
+    with pytest.raises(QuotaExceeded):
+        client.daily("MSFT")
+    assert [q["symbol"] for q in handler.queries] == ["AAPL"]
+    assert client.stats()["retries"] == 0
+
+
+def test_interactive_calls_overtake_background(upstream):
+    handler, url = upstream
+    handler.hold = threading.Event()
+    client = AlphaVantageClient(api_key="test", base_url=url, workers=1)
+
+    # The only worker is busy with the first call while the rest queue up
+    first = client.submit({"function": "TIME_SERIES_DAILY", "symbol": "AAPL"}, BACKGROUND)
+    for _ in range(500):
+        if handler.queries:
+            break
+        threading.Event().wait(0.01)
+    background = [client.submit({"function": "TIME_SERIES_DAILY", "symbol": s}, BACKGROUND) for s in ("MSFT", "IBM")]
+    interactive = client.submit({"function": "TIME_SERIES_DAILY", "symbol": "JPM"}, INTERACTIVE)
+    handler.hold.set()
+
+    for future in [first, *background, interactive]:
+        future.result(timeout=10)
+    assert [q["symbol"] for q in handler.queries] == ["AAPL", "JPM", "MSFT", "IBM"]
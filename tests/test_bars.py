@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+from bars import BAR_FIELDS, BarEngine, IncrementalIndicators, SimulatedFeed, _Feed
+
+RULES = {"5m": "5min", "1h": "1h", "1d": "1D"}
+
+
+@pytest.fixture(scope="module")
+def ticks():
+    """About 60 hours of trades seconds apart, with a quiet stretch, across the March DST change."""
+    rng = np.random.default_rng(5)
+    start = pd.Timestamp("2026-03-06 09:30", tz="America/New_York").value // 1_000_000
+    steps = rng.integers(1_000, 20_000, 20_000)
+    steps[9_000] = 5 * 3_600_000
+    ts = start + np.cumsum(steps)
+    price = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(ts))))
+    size = rng.integers(1, 500, len(ts)).astype(float)
+    return ts, price, size
+
+
+@pytest.fixture(scope="module")
+def engine(ticks):
+    engine = BarEngine(history=100_000, tz="America/New_York")
+    ts, price, size = ticks
+    trades = [("AAPL", int(t), float(p), float(s)) for t, p, s in zip(ts, price, size)]
+    for i in range(0, len(trades), 1_000):
+        engine.on_trades(trades[i:i + 1_000])
+    return engine
+
+
+def frame_from_delta(payload):
+    index = pd.to_datetime(payload["index"], unit="ms", utc=True).tz_convert(payload["tz"])
+    return pd.DataFrame(payload["columns"], index=index)
+
+
+@pytest.mark.parametrize("interval", list(RULES))
+def test_bars_match_pandas_resample(engine, ticks, interval):
+    ts, price, size = ticks
+    trades = pd.DataFrame({"price": price, "size": size},
+                          index=pd.to_datetime(ts, unit="ms", utc=True).tz_convert("America/New_York"))
+    resampled = trades.resample(RULES[interval])
+    expected = pd.concat({
+        "Open": resampled["price"].first(), "High": resampled["price"].max(), "Low": resampled["price"].min(),
+        "Close": resampled["price"].last(), "Volume": resampled["size"].sum(), "Ticks": resampled["price"].count(),
+    }, axis=1)
+    expected = expected[expected["Ticks"] > 0]
+
+    bars = frame_from_delta(engine.delta("AAPL", interval))
+    assert list(bars.columns) == list(BAR_FIELDS)
+    assert len(bars) > 1
+    pd.testing.assert_frame_equal(bars, expected, check_freq=False, check_dtype=False, check_index_type=False,
+                                  check_names=False)
+
+
+@pytest.mark.parametrize("interval", ["5m", "1h"])
+def test_indicators_match_indicators_py(engine, interval):
+    payload = engine.delta("AAPL", interval)
+    closes = frame_from_delta(payload)[["Close"]]
+    expected = indicators.compute_indicators(closes)
+    for name in IncrementalIndicators.OUTPUTS:
+        got = np.array([np.nan if v is None else v for v in payload["indicators"][name]], dtype=float)
+        np.testing.assert_allclose(got, expected[name]["Close"].to_numpy(), rtol=1e-7, atol=1e-8, err_msg=name)
+
+
+def test_delta_since_returns_only_changes(engine):
+    full = engine.delta("AAPL", "5m")
+    again = engine.delta("AAPL", "5m", since=full["version"])
+    assert again["index"] == [] and again["version"] == full["version"]
+    assert engine.delta("MSFT", "5m") is None
+
+
+def test_feed_requires_poll():
+    with pytest.raises(TypeError):
+        _Feed(BarEngine())
+    feed = SimulatedFeed(BarEngine(), ["AAPL"])
+    feed.poll()
+    assert feed.engine.delta("AAPL", "1m")["quote"] is not None
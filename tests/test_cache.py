@@ -0,0 +1,108 @@
+import time
+
+import pandas as pd
+import pytest
+
+import cache
+from cache import DiskStore, HistoryCache, TTLCache
+
+
+class FakeClock:
+    """Stands in for the time module inside cache.py; advance() moves both clocks."""
+
+    def __init__(self):
+        self.offset = 0.0
+        self.start = time.time()
+
+    def advance(self, seconds):
+        self.offset += seconds
+
+    def monotonic(self):
+        return self.offset
+
+    def time(self):
+        return self.start + self.offset
+
+
+class FakeLoader:
+    def __init__(self):
+        self.calls = []
+        self.error = None
+
+    def __call__(self, symbol):
+        self.calls.append(symbol)
+        if self.error is not None:
+            raise self.error
+        return pd.DataFrame({"Close": [float(len(self.calls))]}, index=pd.DatetimeIndex(["2024-01-02"]))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def history(tmp_path, clock):
+    loader = FakeLoader()
+    return HistoryCache(loader, store=DiskStore(str(tmp_path), fmt="pickle"), ttl=60), loader
+
+
+def test_ttl_expiry(clock):
+    memory = TTLCache(maxsize=4, ttl=10)
+    memory.set("AAPL", 1)
+    memory.set("MSFT", 2, ttl=30)
+    clock.advance(9.9)
+    assert memory.get("AAPL") == 1
+    clock.advance(0.1)
+    assert memory.get("AAPL") is None and len(memory) == 1
+    clock.advance(19.9)
+    assert memory.get("MSFT") == 2
+
+
+def test_lru_eviction(clock):
+    memory = TTLCache(maxsize=2, ttl=10)
+    memory.set("AAPL", 1)
+    memory.set("MSFT", 2)
+    assert memory.get("AAPL") == 1  # now most recently used
+    memory.set("GOOGL", 3)
+    assert memory.get("MSFT") is None
+    assert memory.get("AAPL") == 1 and memory.get("GOOGL") == 3
+
+
+def test_memory_then_disk_then_upstream(history, clock):
+    cached, loader = history
+    assert cached.lookup("aapl")[1] == "upstream" and loader.calls == ["AAPL"]
+    assert cached.lookup("AAPL")[1] == "memory"
+
+    # A fresh process: empty memory, the disk copy is still within the TTL
+    cached.memory.clear()
+    clock.advance(30)
+    data, source = cached.lookup("AAPL")
+    assert source == "disk" and data["Close"].iloc[0] == 1.0
+    # Promoted to memory only for what is left of the disk copy's TTL
+    clock.advance(29)
+    assert cached.lookup("AAPL")[1] == "memory"
+    clock.advance(2)
+    data, source = cached.lookup("AAPL")
+    assert source == "upstream" and data["Close"].iloc[0] == 2.0
+    assert loader.calls == ["AAPL", "AAPL"]
+
+    stats = cached.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (2, 1, 2)
+
+
+def test_stale_copy_served_when_upstream_fails(history, clock):
+    cached, loader = history
+    cached.lookup("AAPL")
+    clock.advance(3600)
+    loader.error = ConnectionError("upstream down")
+
+    data, source = cached.lookup("AAPL")
+    assert source == "stale" and data["Close"].iloc[0] == 1.0
+    assert cached.stats()["stale_served"] == 1
+
+    # Without any stored copy the error surfaces
+    with pytest.raises(ConnectionError):
+        cached.lookup("MSFT")
@@ -0,0 +1,28 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from columnar import ColumnarStore
+
+
+def bars(start, periods, close):
+    index = pd.date_range(start, periods=periods, freq="D", tz="America/New_York")
+    return pd.DataFrame({"Close": np.full(periods, close, dtype=float), "Volume": np.arange(periods)}, index=index)
+
+
+def test_unpublished_append_is_discarded(tmp_path):
+    store = ColumnarStore(root=str(tmp_path))
+    store.write("AAPL", bars("2024-01-01", 5, 100.0))
+
+    # A writer that died after appending but before publishing meta.json
+    root, generation = store.path("AAPL"), store.meta("AAPL")["generation"]
+    with open(os.path.join(root, f"Close.{generation}.bin"), "ab") as f:
+        np.array([999.0], dtype=store.price_dtype).tofile(f)
+    with open(os.path.join(root, f"index.{generation}.bin"), "ab") as f:
+        np.array([0], dtype="int64").tofile(f)
+
+    assert store.write("AAPL", bars("2024-01-06", 3, 101.0)) == 8
+    frame = store.open("AAPL").to_frame()
+    assert list(frame["Close"]) == [100.0] * 5 + [101.0] * 3
+    assert frame.index.is_monotonic_increasing and len(frame) == 8
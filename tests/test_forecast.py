@@ -0,0 +1,53 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(7)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0004, 0.012, 750))))
+
+
+# Chunks small enough that the paths are spread over several pool workers
+@pytest.mark.parametrize("method, chunk", [("gbm", 1000), ("bootstrap", 63 * 1000)])
+def test_same_seed_same_paths_serial_and_pooled(prices, method, chunk, monkeypatch):
+    monkeypatch.setattr(forecast, "CHUNK_ELEMENTS", chunk)
+    serial = forecast.simulate(prices, 63, n_paths=5000, method=method, seed=3)
+    pooled = forecast.simulate(prices, 63, n_paths=5000, method=method, seed=3, workers=3)
+    assert len(forecast._chunk_sizes(5000, 63, method)) > 1
+    np.testing.assert_array_equal(serial, pooled)
+    np.testing.assert_array_equal(serial, forecast.simulate(prices, 63, n_paths=5000, method=method, seed=3))
+    assert not np.array_equal(serial, forecast.simulate(prices, 63, n_paths=5000, method=method, seed=4))
+
+
+def test_value_at_risk_on_known_returns():
+    returns = np.linspace(-0.5, 0.5, 100_001)
+    var, cvar = forecast.value_at_risk(returns, confidence=0.95)
+    assert var == pytest.approx(0.45, abs=1e-9)
+    assert cvar == pytest.approx(0.475, abs=1e-5)
+
+
+def test_gbm_var_and_cvar_match_the_lognormal(prices):
+    days, confidence = 252, 0.95
+    mu, sigma = forecast.estimate_parameters(prices)
+    m, s = mu * days, sigma * np.sqrt(days)
+    z = NormalDist().inv_cdf(1 - confidence)
+    expected_var = -np.expm1(m + s * z)
+    # E[1 - e^X | X below its 5% quantile] for X ~ N(m, s^2)
+    expected_cvar = 1 - np.exp(m + s * s / 2) * NormalDist().cdf(z - s) / (1 - confidence)
+
+    returns = forecast.simulate(prices, days, n_paths=400_000, seed=1)
+    var, cvar = forecast.value_at_risk(returns, confidence)
+    assert var == pytest.approx(expected_var, abs=0.005)
+    assert cvar == pytest.approx(expected_cvar, abs=0.005)
+    assert cvar > var
+
+    summary = forecast.summarize(returns, days, confidence)
+    bands = summary["Percentiles (%)"]
+    assert list(bands.values()) == sorted(bands.values())
+    assert summary["VaR 95% (%)"] == pytest.approx(-bands["P5"], abs=0.01)
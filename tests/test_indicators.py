@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2022-01-03", periods=400)
+    data = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (400, 6)), axis=0)), index=index,
+                        columns=["DENSE", "LATE", "GAP", "GAPS", "EARLYGAP", "DENSE2"])
+    data.iloc[:50, 1] = np.nan          # listed later
+    data.iloc[120:135, 2] = np.nan      # one halt
+    data.iloc[[30, 31, 200, 300, 301, 302], 3] = np.nan
+    data.iloc[5:9, 4] = np.nan          # gap inside the warm-up window
+    return data
+
+
+def reference(prices):
+    delta = prices.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    fast = prices.ewm(span=12, adjust=False).mean()
+    slow = prices.ewm(span=26, adjust=False).mean()
+    line = fast - slow
+    return {
+        "sma": prices.rolling(20).mean(),
+        "ema": prices.ewm(span=20, adjust=False, min_periods=20).mean(),
+        "rsi": 100 - 100 / (1 + gain / loss),
+        "macd": line,
+        "macd_signal": line.ewm(span=9, adjust=False).mean(),
+        "bb_upper": prices.rolling(20).mean() + 2 * prices.rolling(20).std(ddof=0),
+        "volatility": np.log(prices).diff().rolling(20).std() * np.sqrt(indicators.TRADING_DAYS),
+    }
+
+
+def test_matches_pandas_with_gaps(prices):
+    results = indicators.compute_indicators(prices)
+    for name, expected in reference(prices).items():
+        pd.testing.assert_frame_equal(results[name], expected, check_exact=False, rtol=1e-9, atol=1e-9,
+                                      obj=name)
+
+
+def test_dense_columns_unaffected_by_gap_columns(prices):
+    alone = indicators.compute_indicators(prices[["DENSE", "DENSE2"]], ["ema", "rsi"])
+    mixed = indicators.compute_indicators(prices, ["ema", "rsi"])
+    for name in ("ema", "rsi"):
+        pd.testing.assert_frame_equal(mixed[name][["DENSE", "DENSE2"]], alone[name])
@@ -0,0 +1,44 @@
+import time
+
+import pandas as pd
+
+import multi_stock
+
+
+def history(symbol):
+    index = pd.date_range("2024-01-01", periods=3, tz="America/New_York")
+    return pd.concat({symbol: pd.DataFrame({"Close": [1.0, 2.0, 3.0]}, index=index)}, axis=1)
+
+
+def test_slow_ticker_times_out_alone_and_failures_are_returned(monkeypatch):
+    attempts = {}
+
+    def download(symbol, period, interval, timeout):
+        attempts[symbol] = attempts.get(symbol, 0) + 1
+        if symbol == "SLOW":
+            time.sleep(3)
+        if symbol == "BAD" or (symbol == "FLAKY" and attempts[symbol] == 1):
+            raise ValueError(f"{symbol} failed")
+        return history(symbol)
+
+    monkeypatch.setattr(multi_stock, "_download_single", download)
+    symbols = ["SLOW", "BAD", "FLAKY"] + [f"T{i}" for i in range(20)]
+    start = time.monotonic()
+    data = multi_stock.fetch_history(symbols, timeout=0.5, max_workers=4)
+    elapsed = time.monotonic() - start
+
+    # One slow ticker costs its own timeout (twice, with the retry), not the whole batch's
+    assert elapsed < 2.5
+    assert list(data.columns.get_level_values(0).unique()) == ["FLAKY"] + [f"T{i}" for i in range(20)]
+    assert set(data.attrs["failed"]) == {"SLOW", "BAD"}
+    assert "TimeoutError" in data.attrs["failed"]["SLOW"]
+    assert attempts["SLOW"] == 2 and attempts["BAD"] == 2 and attempts["FLAKY"] == 2
+    assert multi_stock.price_matrix(data).attrs["failed"] == data.attrs["failed"]
+
+
+def test_fetch_info_gives_up_on_a_hung_lookup(monkeypatch):
+    monkeypatch.setattr(multi_stock, "_fetch_info", lambda symbol: time.sleep(3) if symbol == "SLOW" else {"s": symbol})
+    start = time.monotonic()
+    info = multi_stock.fetch_info(["A", "SLOW", "B"], timeout=0.5)
+    assert time.monotonic() - start < 1.5
+    assert info == {"A": {"s": "A"}, "SLOW": {}, "B": {"s": "B"}}
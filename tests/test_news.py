@@ -0,0 +1,134 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import news
+from news import NewsFeed
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Local news page: serves `page` with an ETag and answers 304 when it matches."""
+
+    page = ""
+    etag = '"v1"'
+    last_modified = "Sat, 17 Oct 2026 12:00:00 GMT"
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.page.encode()
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", self.last_modified)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def html(*headlines):
+    return "<html><body>" + "".join(f"<h2> {h} </h2><p>body</p>" for h in headlines) + "</body></html>"
+
+
+@pytest.fixture
+def source_url():
+    StandIn.page, StandIn.etag, StandIn.requests = html("Fed holds rates", "Oil climbs"), '"v1"', []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/latest"
+    server.shutdown()
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    parse = news.parse_headlines
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(news, "parse_headlines", counting)
+    return calls
+
+
+def test_not_modified_skips_parse_and_history_dedups(source_url, parses):
+    seen = []
+    feed = NewsFeed([source_url], on_new=seen.extend)
+
+    feed.refresh()
+    assert feed.latest()[0] == ["Fed holds rates", "Oil climbs"]
+    assert len(parses) == 1
+
+    # Unchanged page: conditional GET, 304, nothing re-parsed or re-announced
+    feed.refresh()
+    assert StandIn.requests[-1]["If-None-Match"] == '"v1"'
+    assert StandIn.requests[-1]["If-Modified-Since"] == StandIn.last_modified
+    assert len(parses) == 1 and len(seen) == 2
+
+    # Changed page: one repeated (differently spaced/cased) headline, one new
+    StandIn.page, StandIn.etag = html("FED  holds rates", "Stocks rally"), '"v2"'
+    feed.refresh()
+    assert len(parses) == 2
+    assert [h for h, _ in seen] == ["Fed holds rates", "Oil climbs", "Stocks rally"]
+    assert [item["headline"] for item in feed.history()] == ["Stocks rally", "Oil climbs", "Fed holds rates"]
+    assert len(feed.history(0)) == 1 and len(feed.history(-5)) == 1
+
+
+def test_cold_start_polls_once(source_url):
+    feed = NewsFeed([source_url], interval=3600)
+    feed.start()
+    try:
+        headlines, age = feed.latest()
+    finally:
+        feed.stop()
+    assert headlines == ["Fed holds rates", "Oil climbs"] and age is not None
+    assert len(StandIn.requests) == 1
+
+
+def test_parser_error_is_recorded_and_polling_continues(source_url, monkeypatch):
+    parse = news.parse_headlines
+
+    def broken(*args, **kwargs):
+        raise ValueError("unexpected markup")
+
+    monkeypatch.setattr(news, "parse_headlines", broken)
+    feed = NewsFeed([source_url])
+    feed.refresh()
+    status = feed.status()["sources"][0]
+    assert status["error"] == "ValueError: unexpected markup" and status["error_at"] is not None
+    assert feed.latest()[0] == []
+
+    # Fixed parser: the page is fetched in full again (no stale ETag) and parsed
+    monkeypatch.setattr(news, "parse_headlines", parse)
+    feed.refresh()
+    assert "If-None-Match" not in StandIn.requests[-1]
+    assert feed.latest()[0] == ["Fed holds rates", "Oil climbs"]
+    assert feed.status()["sources"][0]["error"] is None
+
+
+def test_background_loop_survives_failures(source_url):
+    calls = threading.Semaphore(0)
+
+    def on_new(entries):
+        calls.release()
+        raise RuntimeError("subscriber failed")
+
+    feed = NewsFeed([source_url], interval=0.01, on_new=on_new)
+    feed.start()
+    try:
+        assert calls.acquire(timeout=5)
+        # The refresher kept running and picks up the next change
+        StandIn.page, StandIn.etag = html("Stocks rally"), '"v2"'
+        assert calls.acquire(timeout=5)
+        assert feed._thread.is_alive()
+    finally:
+        feed.stop()
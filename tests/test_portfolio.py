@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import portfolio
+
+
+@pytest.fixture
+def covariance():
+    rng = np.random.default_rng(3)
+    a = rng.normal(size=(5, 5))
+    vols = np.array([0.1, 0.2, 0.15, 0.3, 0.25])
+    corr = a @ a.T
+    corr /= np.sqrt(np.outer(np.diag(corr), np.diag(corr)))
+    return corr * np.outer(vols, vols)
+
+
+def test_ledoit_wolf_hand_computed():
+    # Centered already; sample covariance diag(0.5, 2), target 1.25 I
+    returns = np.array([[1.0, 0.0], [-1.0, 0.0], [0.0, 2.0], [0.0, -2.0]])
+    covariance, shrinkage = portfolio.shrunk_covariance(returns)
+    # ||S - mu I||^2 = 1.125; (sum of squared row norms / n - ||S||^2) / n = (8.5 - 4.25) / 4
+    assert shrinkage == pytest.approx(1.0625 / 1.125)
+    np.testing.assert_allclose(covariance, np.diag([21.75 / 18, 23.25 / 18]))
+
+
+def test_ledoit_wolf_limits():
+    rng = np.random.default_rng(0)
+    # Plenty of observations of a few independent assets: nearly the sample covariance
+    returns = rng.normal(0, 1, (20_000, 3)) * [1.0, 2.0, 3.0]
+    covariance, shrinkage = portfolio.shrunk_covariance(returns)
+    assert shrinkage < 0.01
+    np.testing.assert_allclose(covariance, np.cov(returns.T, ddof=0), rtol=0.02, atol=0.02)
+    # Few observations of many identical assets: mostly the scaled identity
+    covariance, shrinkage = portfolio.shrunk_covariance(rng.normal(size=(10, 50)))
+    assert shrinkage > 0.5
+    assert np.abs(covariance - np.diag(np.diag(covariance))).max() < 0.5 * np.diag(covariance).min()
+
+
+def test_risk_parity_equalizes_contributions(covariance):
+    weights = portfolio.risk_parity_weights(covariance)
+    assert weights.sum() == pytest.approx(1.0) and np.all(weights > 0)
+    np.testing.assert_allclose(portfolio.risk_contributions(weights, covariance), 0.2, atol=1e-9)
+
+    budget = np.array([0.4, 0.3, 0.1, 0.1, 0.1])
+    weights = portfolio.risk_parity_weights(covariance, budget)
+    np.testing.assert_allclose(portfolio.risk_contributions(weights, covariance), budget, atol=1e-9)
+
+
+def test_min_variance(covariance):
+    weights = portfolio.min_variance_weights(covariance)
+    assert weights.sum() == pytest.approx(1.0)
+    # First-order condition: equal marginal variance for every asset
+    marginal = covariance @ weights
+    np.testing.assert_allclose(marginal, marginal.mean(), rtol=1e-9)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        other = rng.normal(size=5)
+        other /= other.sum()
+        assert weights @ covariance @ weights <= other @ covariance @ other + 1e-15
+
+
+def test_short_history_asset_dropped_and_weights_renormalized():
+    rng = np.random.default_rng(2)
+    index = pd.bdate_range("2024-01-01", periods=250)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (250, 3)), axis=0)), index=index,
+                          columns=["AAA", "BBB", "NEW"])
+    prices.iloc[:150, 2] = np.nan  # listed 60% of the way through
+
+    result = portfolio.analyze(prices, weights={"AAA": 0.5, "BBB": 0.3, "NEW": 0.2}, optimize="risk_parity")
+    assert result["assets"] == ["AAA", "BBB"] and result["dropped"] == ["NEW"]
+    # History is not cut to the new asset's listing date
+    assert result["observations"] == 249
+    np.testing.assert_allclose(result["weights"]["current"], [0.625, 0.375])
+    np.testing.assert_allclose(result["risk_contributions"]["risk_parity"], 0.5, atol=1e-9)
+
+    with pytest.raises(ValueError):
+        portfolio.analyze(prices, weights={"NEW": 1.0})
+    with pytest.raises(ValueError):
+        portfolio.analyze(prices, optimize="max_sharpe")
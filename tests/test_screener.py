@@ -0,0 +1,104 @@
+import operator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from screener import FIELDS, Screener, parse_conditions, parse_sort
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "=": operator.eq,
+       "!=": operator.ne}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(11)
+    n = 400
+    data = pd.DataFrame({
+        "market_cap": rng.choice([2e9, 5e9, 10e9, 50e9, 2e12], n),
+        "pe": rng.integers(5, 40, n).astype(float),
+        "high_52w": rng.uniform(50, 500, n).round(0),
+        "low_52w": rng.uniform(10, 50, n).round(0),
+        "dividend_yield": rng.choice([0.0, 0.01, 0.02, 0.035], n),
+        "volume": rng.integers(1, 5, n) * 1e6,
+        "last_close": rng.uniform(10, 500, n).round(1),
+    }, index=pd.Index([f"S{i:03d}" for i in range(n)], name="symbol"))
+    for field in data:
+        data.loc[rng.random(n) < 0.1, field] = np.nan
+    return data
+
+
+def reference(data, conditions, sort):
+    """Plain pandas: boolean masks, then a stable sort with missing values last."""
+    mask = pd.Series(True, index=data.index)
+    for field, op, value in conditions:
+        mask &= data[field].notna() & OPS[op](data[field], value)
+    matched = data[mask]
+    if sort:
+        matched = matched.sort_values([f for f, _ in sort], ascending=[not d for _, d in sort],
+                                      na_position="last", kind="stable")
+    return list(matched.index)
+
+
+def test_parse_conditions():
+    assert parse_conditions("pe<20, market_cap>10B") == [("pe", "<", 20.0), ("market_cap", ">", 10e9)]
+    assert parse_conditions(" volume >= 1.5m , dividend_yield!=0 ") == [("volume", ">=", 1.5e6),
+                                                                       ("dividend_yield", "!=", 0.0)]
+    assert parse_conditions("last_close = 2e2") == [("last_close", "=", 200.0)]
+    assert parse_conditions("market_cap<=1T") == [("market_cap", "<=", 1e12)]
+    assert parse_conditions("") == [] and parse_conditions(None) == []
+    for bad in ("pe<<20", "beta>1", "pe<20X", "pe"):
+        with pytest.raises(ValueError):
+            parse_conditions(bad)
+
+
+def test_parse_sort():
+    assert parse_sort("-dividend_yield, pe,+volume") == [("dividend_yield", True), ("pe", False), ("volume", False)]
+    assert parse_sort("") == [] and parse_sort(None) == []
+    with pytest.raises(ValueError):
+        parse_sort("-beta")
+
+
+@pytest.mark.parametrize("where, sort", [
+    ("", ""),
+    ("pe<20", ""),
+    ("market_cap>10B", "-market_cap"),
+    ("market_cap>=10B, pe<=25", "pe"),
+    ("dividend_yield!=0", "-dividend_yield"),
+    ("market_cap=50b", "-volume"),
+    ("volume>1.5M, last_close<250", "-dividend_yield,pe"),
+    ("pe>100", "pe"),
+    ("", "-market_cap,-pe,last_close"),
+    ("low_52w>20", "high_52w,-low_52w"),
+])
+def test_screen_matches_pandas(data, where, sort):
+    screener = Screener(data)
+    conditions, keys = parse_conditions(where), parse_sort(sort)
+    total, records = screener.screen(conditions, keys, limit=len(data))
+    expected = reference(data, conditions, keys)
+    assert total == len(expected)
+    symbols = [r["symbol"] for r in records]
+    if keys:
+        assert symbols == expected
+    else:
+        assert sorted(symbols) == sorted(expected)
+
+
+def test_limit_fields_and_missing_values(data):
+    screener = Screener(data)
+    total, records = screener.screen([], [("pe", True)], limit=5, fields=["pe"])
+    assert total == len(data) and len(records) == 5
+    assert set(records[0]) == {"symbol", "pe"}
+    # Missing values sort last and come back as None
+    total, records = screener.screen([], [("pe", False)], limit=len(data), fields=["pe"])
+    missing = int(data["pe"].isna().sum())
+    assert all(r["pe"] is None for r in records[-missing:])
+    assert all(r["pe"] is not None for r in records[:-missing])
+
+
+def test_missing_column_never_matches():
+    screener = Screener(pd.DataFrame({"pe": [10.0, 20.0]}, index=["A", "B"]))
+    assert screener.screen([("market_cap", ">", 0.0)])[0] == 0
+    assert screener.screen([("market_cap", "!=", 0.0)])[0] == 0
+    assert [r["symbol"] for r in screener.screen([], [("pe", True)])[1]] == ["B", "A"]
+    assert len(FIELDS) == len(screener.columns)
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+pytest.importorskip("faiss")
+
+from search_index import SemanticIndex
+
+
+def test_two_writers_share_ids_and_segments(tmp_path):
+    # Two instances on one directory stand in for two processes (API worker + report CLI)
+    api, cli = SemanticIndex(str(tmp_path), segment_size=4), SemanticIndex(str(tmp_path), segment_size=4)
+    for i in range(6):
+        api.add([f"federal reserve raises rates meeting {i}"], "headline")
+        cli.add([f"quarterly earnings beat estimates report {i}"], "report")
+    api.flush()
+    cli.flush()
+
+    with open(tmp_path / "docs.jsonl") as f:
+        ids = [json.loads(line)["id"] for line in f]
+    assert ids == list(range(12))
+
+    fresh = SemanticIndex(str(tmp_path), segment_size=4)
+    assert len(fresh) == 12 and fresh.stats()["unsealed_vectors"] == 0
+    assert {d["kind"] for d in fresh.search("federal reserve rates", k=6)} == {"headline"}
+    assert len(fresh.search("federal reserve rates", k=12, kind="headline")) == 6
+    assert len(fresh.search("quarterly earnings estimates", k=12, kind="report")) == 6
+    # Documents another instance added are found without restarting
+    assert len(api.search("quarterly earnings estimates", k=12, kind="report")) == 6
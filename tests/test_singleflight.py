@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    async def fetch(symbol):
+        runs.append(symbol)
+        await asyncio.sleep(0.05)
+        return {"symbol": symbol}
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("AAPL", fetch, "AAPL") for _ in range(20)))
+        # Once finished, the key is free again
+        again = await flight.do("AAPL", fetch, "AAPL")
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert runs == ["AAPL", "AAPL"]
+    assert all(result is results[0] for result in results) and results[0] == {"symbol": "AAPL"}
+    assert again == {"symbol": "AAPL"}
+    assert flight.stats() == {"calls": 21, "executions": 2, "coalesced": 19, "in_flight": 0}
+
+
+def test_every_caller_gets_the_exception():
+    flight = SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        raise LookupError("no such symbol")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("BAD", fetch) for _ in range(10)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert all(isinstance(result, LookupError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("K", fetch))
+        second = asyncio.ensure_future(flight.do("K", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 42
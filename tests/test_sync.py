@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance
+
+import sync
+from cache import DiskStore
+from columnar import ColumnarStore
+
+
+def daily(start, periods, close=100.0):
+    index = pd.bdate_range(start, periods=periods, tz="America/New_York", name="Date")
+    closes = close + np.arange(periods, dtype=float)
+    return pd.DataFrame({"Close": closes, "Volume": np.arange(periods, dtype=np.int64)}, index=index)
+
+
+class FakeTicker:
+    """Serves slices of `history` the way yfinance.Ticker.history does."""
+
+    history_frame = None
+    calls = []
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, period=None, start=None, interval="1d"):
+        FakeTicker.calls.append(period or start)
+        frame = FakeTicker.history_frame
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start, tz=frame.index.tz)]
+        return frame.copy()
+
+
+@pytest.fixture
+def yahoo(monkeypatch, tmp_path):
+    monkeypatch.setattr(sync, "yahoo_store", DiskStore(str(tmp_path / "yahoo")))
+    monkeypatch.setattr(sync, "columnar_store", ColumnarStore(root=str(tmp_path / "columnar")))
+    monkeypatch.setattr(yfinance, "Ticker", FakeTicker)
+    FakeTicker.calls = []
+    return FakeTicker
+
+
+def test_merge_bars_newer_values_win():
+    existing = daily("2024-01-01", 5)
+    new = daily("2024-01-05", 3, close=200.0)
+    merged = sync.merge_bars(existing, new)
+    assert len(merged) == 7 and merged.index.is_monotonic_increasing
+    assert merged["Close"].iloc[3] == 103.0 and merged["Close"].iloc[4] == 200.0
+    assert sync.merge_bars(None, new).equals(new)
+    assert sync.merge_bars(existing, new.iloc[:0]).equals(existing)
+
+
+def test_missing_bars_counts_business_days():
+    friday = pd.Timestamp("2024-01-05", tz="UTC")
+    assert sync.missing_bars(friday, now=pd.Timestamp("2024-01-05 18:00", tz="UTC")) == 0
+    assert sync.missing_bars(friday, now=pd.Timestamp("2024-01-07", tz="UTC")) == 0  # weekend
+    assert sync.missing_bars(friday, now=pd.Timestamp("2024-01-09", tz="UTC")) == 2
+
+
+def test_alpha_vantage_compact_full_and_gap(monkeypatch, tmp_path):
+    monkeypatch.setattr(sync, "alpha_vantage_store", DiskStore(str(tmp_path)))
+    today = pd.Timestamp.now().normalize()
+    server = daily(today - pd.tseries.offsets.BDay(299), 300)
+    server.index = server.index.tz_localize(None)
+    calls = []
+
+    def download(symbol, outputsize):
+        calls.append(outputsize)
+        return server if outputsize == "full" else server.iloc[-sync.COMPACT_BARS:]
+
+    assert len(sync.sync_alpha_vantage("ibm", download)) == 300 and calls == ["full"]
+
+    # Small gap: one compact call that overlaps the stored bars
+    sync.alpha_vantage_store.save("IBM", server.iloc[:-10])
+    monkeypatch.setattr(sync, "SYNC_MIN_INTERVAL", 0)
+    calls.clear()
+    assert sync.sync_alpha_vantage("IBM", download).equals(server) and calls == ["compact"]
+
+    # Gap wider than the compact window: straight to full
+    sync.alpha_vantage_store.save("IBM", server.iloc[:-150])
+    calls.clear()
+    assert sync.sync_alpha_vantage("IBM", download).equals(server) and calls == ["full"]
+
+
+def test_alpha_vantage_refetches_full_when_compact_does_not_overlap(monkeypatch, tmp_path):
+    monkeypatch.setattr(sync, "alpha_vantage_store", DiskStore(str(tmp_path)))
+    monkeypatch.setattr(sync, "SYNC_MIN_INTERVAL", 0)
+    monkeypatch.setattr(sync, "missing_bars", lambda last, now=None: 1)  # looks recent
+    server = daily("2020-01-01", 300).tz_localize(None)
+    sync.alpha_vantage_store.save("IBM", server.iloc[:100])
+    calls = []
+
+    def download(symbol, outputsize):
+        calls.append(outputsize)
+        return server if outputsize == "full" else server.iloc[-sync.COMPACT_BARS:]
+
+    assert sync.sync_alpha_vantage("IBM", download).equals(server)
+    assert calls == ["compact", "full"]
+
+
+def test_yahoo_appends_from_the_overlap(yahoo):
+    yahoo.history_frame = daily("2024-01-01", 20)
+    sync.yahoo_store.save("AAPL", yahoo.history_frame.iloc[:15])
+
+    merged = sync.sync_yahoo("aapl", min_interval=0)
+    pd.testing.assert_frame_equal(merged, yahoo.history_frame, check_freq=False)
+    # One incremental call starting at the second to last stored bar
+    assert yahoo.calls == [yahoo.history_frame.index[13].strftime("%Y-%m-%d")]
+
+
+def test_yahoo_refetches_history_after_a_dividend(yahoo):
+    before = daily("2024-01-01", 20)
+    sync.yahoo_store.save("AAPL", before.iloc[:15])
+    # Ex-dividend on bar 16: every earlier adjusted close moves down 2%
+    after = before.copy()
+    after.iloc[:16, 0] *= 0.98
+    yahoo.history_frame = after
+
+    merged = sync.sync_yahoo("AAPL", initial_period="max", min_interval=0)
+    pd.testing.assert_frame_equal(merged, after, check_freq=False)
+    assert yahoo.calls[-1] == "max" and len(yahoo.calls) == 2
+
+
+def test_restated_ignores_the_partial_last_bar():
+    stored = daily("2024-01-01", 5)
+    fresh = stored.copy()
+    fresh.iloc[-1, 0] += 1.0  # the stored last bar was mid-session
+    assert not sync.restated(stored, fresh)
+    fresh.iloc[-2, 0] += 1.0
+    assert sync.restated(stored, fresh)
+    assert not sync.restated(stored, fresh.iloc[:0])
+
+
+def test_columnar_daily_rewrites_after_a_split(yahoo):
+    before = daily("2024-01-01", 20)
+    yahoo.history_frame = before.iloc[:15]
+    sync.sync_yahoo_columnar("AAPL", "1d", min_interval=0)
+
+    # 2:1 split after the stored range: history is re-based to half
+    after = before.copy()
+    after.iloc[:15, 0] /= 2
+    yahoo.history_frame = after
+    frame = sync.sync_yahoo_columnar("AAPL", "1d", min_interval=0).to_frame()
+    assert len(frame) == 20
+    np.testing.assert_allclose(frame["Close"].to_numpy(), after["Close"].to_numpy(), rtol=1e-6)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import wire
+
+
+@pytest.fixture(params=["America/New_York", None])
+def frame(request):
+    index = pd.date_range("2024-01-02 09:30", periods=6, freq="D", tz=request.param, name="Date")
+    return pd.DataFrame({
+        "Open": [100.0, 101.5, np.nan, 103.25, 104.0, 105.125],
+        "Close": [100.5, np.nan, 102.0, 103.0, np.nan, 106.0],
+        "Volume": np.arange(1_000_000, 1_000_006, dtype=np.int64),
+    }, index=index)
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(wire, "orjson", None)
+    elif wire.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def roundtrip(frame, fmt):
+    body, media_type = wire.encode(frame, fmt)
+    assert media_type == wire.MEDIA_TYPES[fmt]
+    return wire.decode(body, fmt)
+
+
+def test_columns_roundtrip(frame, json_backend):
+    decoded = roundtrip(frame, "columns")
+    pd.testing.assert_frame_equal(decoded, frame, check_freq=False, check_index_type=False)
+    assert str(decoded.index.tz) == str(frame.index.tz)
+
+
+def test_records_roundtrip(frame, json_backend):
+    decoded = roundtrip(frame, "records")
+    # Legacy shape: the index travels as strings
+    assert list(decoded.index) == list(frame.index.astype(str))
+    decoded.index = pd.DatetimeIndex(pd.to_datetime(decoded.index), name="Date")
+    if frame.index.tz is not None:
+        decoded.index = decoded.index.tz_convert(frame.index.tz)
+    pd.testing.assert_frame_equal(decoded, frame, check_freq=False, check_index_type=False)
+
+
+def test_arrow_roundtrip(frame):
+    if wire.pa is None:
+        pytest.skip("pyarrow not installed")
+    decoded = roundtrip(frame, "arrow")
+    pd.testing.assert_frame_equal(decoded, frame, check_freq=False, check_index_type=False)
+    assert str(decoded.index.tz) == str(frame.index.tz)
+
+
+def test_unknown_format(frame):
+    with pytest.raises(ValueError):
+        wire.encode(frame, "xml")
+    with pytest.raises(ValueError):
+        wire.decode(b"", "xml")
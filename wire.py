@@ -0,0 +1,104 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Wire formats accepted by /stock?format=
+#   records - legacy dict-of-dicts from DataFrame.to_dict()
+#   columns - one shared timestamp array plus one value array per column
+#   arrow   - Arrow IPC stream, loadable without parsing on the client
+FORMATS = ("records", "columns", "arrow")
+MEDIA_TYPES = {
+    "records": "application/json",
+    "columns": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def available_formats():
+    """Formats this process can encode/decode, fastest first."""
+    formats = ["columns", "records"]
+    if pa is not None:
+        formats.insert(0, "arrow")
+    return formats
+
+
+def encode_json(obj):
+    """Serialize to JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_json_default).encode()
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return [None if isinstance(v, float) and v != v else v for v in value.tolist()]
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def to_columns(data):
+    """Column-array form of a time-indexed DataFrame."""
+    index = pd.DatetimeIndex(data.index)
+    tz = str(index.tz) if index.tz is not None else None
+    if tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return {
+        "index": index.as_unit("ms").asi8,  # epoch milliseconds
+        "tz": tz,
+        "columns": {str(name): data[name].to_numpy() for name in data.columns},
+    }
+
+
+def from_columns(payload):
+    index = pd.to_datetime(payload["index"], unit="ms")
+    if payload.get("tz"):
+        index = index.tz_localize("UTC").tz_convert(payload["tz"])
+    data = pd.DataFrame(payload["columns"], index=index)
+    data.index.name = "Date"
+    return data
+
+
+def encode(data, fmt):
+    """Encode a time-indexed DataFrame; returns (body, media_type)."""
+    if fmt == "records":
+        data = data.copy()
+        data.index = data.index.astype(str)
+        body = encode_json(data.to_dict())
+    elif fmt == "columns":
+        body = encode_json(to_columns(data))
+    elif fmt == "arrow":
+        if pa is None:
+            raise ValueError("Arrow format requires pyarrow")
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue().to_pybytes()
+    else:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    return body, MEDIA_TYPES[fmt]
+
+
+def decode(body, fmt):
+    """Rebuild the DataFrame sent by encode()."""
+    if fmt == "records":
+        return pd.DataFrame(json.loads(body))
+    if fmt == "columns":
+        payload = orjson.loads(body) if orjson is not None else json.loads(body)
+        return from_columns(payload)
+    if fmt == "arrow":
+        return pa.ipc.open_stream(io.BytesIO(body)).read_all().to_pandas()
+    raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}")